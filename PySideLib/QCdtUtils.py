@@ -1,5 +1,6 @@
 # coding: utf-8
 import sys
+import os
 import threading
 import multiprocessing.pool
 import pathlib
@@ -9,6 +10,14 @@ import io
 import collections
 import functools
 import contextlib
+import array
+import itertools
+import time
+import heapq
+import math
+import re
+import inspect
+import weakref
 
 from typing import (
     TypeVar,
@@ -22,6 +31,7 @@ from typing import (
     Dict,
     Tuple,
     Union,
+    Set,
 )
 
 from PySide2.QtCore import (
@@ -31,11 +41,16 @@ from PySide2.QtCore import (
     QCoreApplication,
     QMimeDatabase,
     QFileInfo,
+    Qt,
+    QSize,
+    QRect,
+    QPoint,
 )
 
 from PySide2.QtGui import (
     QImage,
     QIcon,
+    QPainter,
 )
 
 from PySide2.QtWidgets import (
@@ -95,7 +110,8 @@ class BatchImageLoader(QObject):
         self.__images = {}  # type: Dict[int, Optional[QImage]]
         self.__imagesLock = threading.Lock()
         self.__callbacks = {}  # type: Dict[str, List[Callable[[QImage], QImage]]]
-        self.__pool = multiprocessing.pool.ThreadPool()
+        self.__pool = _LazyThreadPool()
+        _closeOnDestroyed(self, self.__pool.close)
 
     def addFile(self, file_path):
         # type: (str) -> int
@@ -208,6 +224,1079 @@ class LruCache(Generic[TCacheKey, TCacheValue]):
         return removed
 
 
+class CostLruCache(Generic[TCacheKey, TCacheValue]):
+
+    def __init__(self, maxCost):
+        # type: (int) -> NoReturn
+        self.__maxCost = maxCost
+        self.__totalCost = 0
+        self.__itemsDic = collections.OrderedDict()  # type: Dict[TCacheKey, Tuple[TCacheValue, int]]
+
+    def __getitem__(self, item):
+        # type: (TCacheKey) -> TCacheValue
+        return self.__itemsDic[item][0]
+
+    def __setitem__(self, key, value):
+        # type: (TCacheKey, TCacheValue) -> NoReturn
+        self.set(key, value)
+
+    def __contains__(self, key):
+        # type: (TCacheKey) -> bool
+        return key in self.__itemsDic
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.__itemsDic)
+
+    def maxCost(self):
+        # type: () -> int
+        return self.__maxCost
+
+    def setMaxCost(self, maxCost):
+        # type: (int) -> List[Tuple[TCacheKey, TCacheValue]]
+        self.__maxCost = maxCost
+        return self.__trim()
+
+    def totalCost(self):
+        # type: () -> int
+        return self.__totalCost
+
+    def get(self, key, defaultValue=None):
+        # type: (TCacheKey, TCacheValue) -> TCacheValue
+        entry = self.__itemsDic.get(key)
+        if entry is None:
+            return defaultValue
+
+        self.__itemsDic.move_to_end(key)
+        return entry[0]
+
+    def set(self, key, value, cost=1):
+        # type: (TCacheKey, TCacheValue, int) -> List[Tuple[TCacheKey, TCacheValue]]
+        # returns the evicted (key, value) pairs, least recently used first
+        self.remove(key)
+        if cost > self.__maxCost:
+            return [(key, value)]
+
+        self.__itemsDic[key] = (value, cost)
+        self.__totalCost += cost
+        return self.__trim()
+
+    def remove(self, key):
+        # type: (TCacheKey) -> Optional[TCacheValue]
+        entry = self.__itemsDic.pop(key, None)
+        if entry is None:
+            return None
+        self.__totalCost -= entry[1]
+        return entry[0]
+
+    def clear(self):
+        # type: () -> NoReturn
+        self.__itemsDic.clear()
+        self.__totalCost = 0
+
+    def __trim(self):
+        # type: () -> List[Tuple[TCacheKey, TCacheValue]]
+        evicted = []
+        while self.__totalCost > self.__maxCost:
+            key, (value, cost) = self.__itemsDic.popitem(last=False)
+            self.__totalCost -= cost
+            evicted.append((key, value))
+        return evicted
+
+
+class ThumbnailAtlas(object):
+
+    def __init__(self, cellSize, pageSize=QSize(2048, 2048), imageFormat=QImage.Format_ARGB32_Premultiplied):
+        # type: (QSize, QSize, QImage.Format) -> NoReturn
+        self.__cellSize = QSize(cellSize)
+        self.__pageSize = QSize(pageSize)
+        self.__imageFormat = imageFormat
+        self.__columns = max(pageSize.width() // cellSize.width(), 1)
+        self.__cellsPerPage = self.__columns * max(pageSize.height() // cellSize.height(), 1)
+        self.__pages = []  # type: List[QImage]
+        self.__widths = array.array('H')
+        self.__heights = array.array('H')
+        self.__free = []  # type: List[int]
+        self.__count = 0
+
+    def cellSize(self):
+        # type: () -> QSize
+        return QSize(self.__cellSize)
+
+    def pageSize(self):
+        # type: () -> QSize
+        return QSize(self.__pageSize)
+
+    def pageCount(self):
+        # type: () -> int
+        return len(self.__pages)
+
+    def count(self):
+        # type: () -> int
+        return self.__count
+
+    def fitted(self, image):
+        # type: (QImage) -> QImage
+        # safe to call from worker threads, unlike allocate and release
+        if image.width() > self.__cellSize.width() or image.height() > self.__cellSize.height():
+            image = image.scaled(self.__cellSize, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        return image
+
+    def allocate(self, image):
+        # type: (QImage) -> int
+        image = self.fitted(image)
+        if len(self.__free) > 0:
+            # the lowest free slot first, so the leading pages stay dense
+            handle = heapq.heappop(self.__free)
+        else:
+            handle = len(self.__widths)
+            self.__widths.append(0)
+            self.__heights.append(0)
+            if handle // self.__cellsPerPage == len(self.__pages):
+                page = QImage(self.__pageSize, self.__imageFormat)
+                page.fill(Qt.transparent)
+                self.__pages.append(page)
+
+        pageIndex, rect = self.__cellRect(handle)
+        painter = QPainter(self.__pages[pageIndex])
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(rect, Qt.transparent)
+        painter.drawImage(rect.topLeft(), image)
+        painter.end()
+
+        self.__widths[handle] = image.width()
+        self.__heights[handle] = image.height()
+        self.__count += 1
+        return handle
+
+    def release(self, handle):
+        # type: (int) -> NoReturn
+        self.__widths[handle] = 0
+        self.__heights[handle] = 0
+        heapq.heappush(self.__free, handle)
+        self.__count -= 1
+
+    def clear(self):
+        # type: () -> NoReturn
+        self.__pages = []
+        self.__widths = array.array('H')
+        self.__heights = array.array('H')
+        self.__free = []
+        self.__count = 0
+
+    def page(self, pageIndex):
+        # type: (int) -> QImage
+        return self.__pages[pageIndex]
+
+    def location(self, handle):
+        # type: (int) -> Tuple[int, QRect]
+        pageIndex, rect = self.__cellRect(handle)
+        rect.setSize(QSize(self.__widths[handle], self.__heights[handle]))
+        return pageIndex, rect
+
+    def image(self, handle):
+        # type: (int) -> QImage
+        pageIndex, rect = self.location(handle)
+        return self.__pages[pageIndex].copy(rect)
+
+    def __cellRect(self, handle):
+        # type: (int) -> Tuple[int, QRect]
+        pageIndex, cell = divmod(handle, self.__cellsPerPage)
+        row, column = divmod(cell, self.__columns)
+        topLeft = QPoint(column * self.__cellSize.width(), row * self.__cellSize.height())
+        return pageIndex, QRect(topLeft, self.__cellSize)
+
+
+class ThumbnailPyramid(object):
+
+    MIN_LEVEL_SIZE = 16
+
+    def __init__(self, levels, sourceSize):
+        # type: (List[QImage], QSize) -> NoReturn
+        self.__levels = levels  # smallest first
+        self.__sourceSize = QSize(sourceSize)
+
+    @staticmethod
+    def build(image, maxSize, levelCount):
+        # type: (QImage, QSize, int) -> ThumbnailPyramid
+        # every level halves the one above it, the top one fits in maxSize
+        level = image
+        if image.width() > maxSize.width() or image.height() > maxSize.height():
+            level = image.scaled(maxSize, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+        levels = [level]
+        while len(levels) < levelCount and min(level.width(), level.height()) >= ThumbnailPyramid.MIN_LEVEL_SIZE * 2:
+            level = level.scaled(level.size() / 2, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+            levels.insert(0, level)
+        return ThumbnailPyramid(levels, image.size())
+
+    def sourceSize(self):
+        # type: () -> QSize
+        return QSize(self.__sourceSize)
+
+    def levelCount(self):
+        # type: () -> int
+        return len(self.__levels)
+
+    def level(self, index):
+        # type: (int) -> QImage
+        return self.__levels[index]
+
+    def displaySize(self, bound):
+        # type: (QSize) -> QSize
+        size = self.__sourceSize
+        if size.width() > bound.width() or size.height() > bound.height():
+            size = size.scaled(bound, Qt.KeepAspectRatio)
+        return size
+
+    def covers(self, bound):
+        # type: (QSize) -> bool
+        # False when drawing at bound would need a level larger than the ones built
+        return self.__levels[-1].width() >= self.displaySize(bound).width()
+
+    def nearest(self, bound):
+        # type: (QSize) -> QImage
+        width = self.displaySize(bound).width()
+        for level in self.__levels:
+            if level.width() >= width:
+                return level
+        return self.__levels[-1]
+
+
+class TrigramIndex(object):
+
+    def __init__(self, keys=(), deferred=False):
+        # type: (Iterable[str], bool) -> NoReturn
+        self.__keys = []  # type: List[str]
+        self.__postings = None  # type: Optional[Dict[str, array.array]]
+        self.__lock = threading.Lock()
+        self.__keys.extend(key.lower() for key in keys)
+        if not deferred:
+            self.buildPostings()
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.__keys)
+
+    def key(self, index):
+        # type: (int) -> str
+        return self.__keys[index]
+
+    def keys(self):
+        # type: () -> List[str]
+        # the lowercased keys themselves, not a copy
+        return self.__keys
+
+    def isReady(self):
+        # type: () -> bool
+        return self.__postings is not None
+
+    def buildPostings(self):
+        # type: () -> NoReturn
+        # may run on a worker thread, searches fall back to a linear scan until it finishes
+        postings = {}  # type: Dict[str, array.array]
+        keys = self.__keys
+        count = len(keys)
+        self.__addPostings(postings, 0, count)
+        with self.__lock:
+            if keys is not self.__keys:
+                return
+            self.__addPostings(postings, count, len(keys))
+            self.__postings = postings
+
+    def clear(self):
+        # type: () -> NoReturn
+        with self.__lock:
+            self.__keys = []
+            self.__postings = {}
+
+    def append(self, key):
+        # type: (str) -> int
+        with self.__lock:
+            index = len(self.__keys)
+            self.__keys.append(key.lower())
+            if self.__postings is not None:
+                self.__addPostings(self.__postings, index, index + 1)
+        return index
+
+    def extend(self, keys):
+        # type: (Iterable[str]) -> NoReturn
+        for key in keys:
+            self.append(key)
+
+    def search(self, query, candidates=None):
+        # type: (str, Optional[List[int]]) -> List[int]
+        # returns the ascending indices of the keys containing "query",
+        # "candidates" narrows the search to a previous (ascending) result
+        query = query.lower()
+        keys = self.__keys
+        postings = self.__postings
+
+        pool = candidates
+        trigrams = {query[i:i + 3] for i in range(len(query) - 2)}
+        if postings is not None and len(trigrams) > 0:
+            smallest = None
+            for trigram in trigrams:
+                posting = postings.get(trigram)
+                if posting is None:
+                    return []
+                if smallest is None or len(posting) < len(smallest):
+                    smallest = posting
+            if pool is None or len(smallest) < len(pool):
+                pool = smallest
+
+        if pool is None:
+            if len(query) == 0:
+                return list(range(len(keys)))
+            return [index for index, key in enumerate(keys) if query in key]
+        if len(query) == 0:
+            return list(pool)
+        return [index for index in pool if query in keys[index]]
+
+    def __addPostings(self, postings, first, last):
+        # type: (Dict[str, array.array], int, int) -> NoReturn
+        keys = self.__keys
+        for index in range(first, last):
+            key = keys[index]
+            for trigram in {key[i:i + 3] for i in range(len(key) - 2)}:
+                posting = postings.get(trigram)
+                if posting is None:
+                    posting = postings[trigram] = array.array('I')
+                posting.append(index)
+
+
+class FuzzyMatcher(object):
+
+    CHUNK_SIZE = 4096
+
+    def __init__(self, keys=()):
+        # type: (Union[Iterable[str], TrigramIndex]) -> NoReturn
+        # the keys of a trigram index are shared rather than lowercased into a copy
+        if isinstance(keys, TrigramIndex):
+            self.__keys = keys.keys()  # type: List[str]
+        else:
+            self.__keys = [key.lower() for key in keys]
+        self.__usage = collections.Counter()  # type: collections.Counter
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.__keys)
+
+    def key(self, index):
+        # type: (int) -> str
+        return self.__keys[index]
+
+    def setUsage(self, usage):
+        # type: (collections.Counter) -> NoReturn
+        # usage counts keyed by the lowercased text, shared with the caller
+        self.__usage = usage
+
+    def match(self, query, candidates=None, isCancelled=None):
+        # type: (str, Optional[List[int]], Optional[Callable[[], bool]]) -> Optional[List[int]]
+        # returns the ascending indices of the keys containing "query" as a subsequence,
+        # or None when "isCancelled" returned True
+        query = query.lower()
+        keys = self.__keys
+        pool = range(len(keys)) if candidates is None else candidates
+        if len(query) == 0:
+            return list(pool)
+
+        search = self.__pattern(query).search
+        matches = []  # type: List[int]
+        for first in range(0, len(pool), FuzzyMatcher.CHUNK_SIZE):
+            if isCancelled is not None and isCancelled():
+                return None
+            matches.extend(index for index in pool[first:first + FuzzyMatcher.CHUNK_SIZE] if search(keys[index]))
+        return matches
+
+    def rank(self, query, matches, limit, isCancelled=None):
+        # type: (str, List[int], int, Optional[Callable[[], bool]]) -> Optional[List[int]]
+        # returns the "limit" best matches ordered by score and usage
+        query = query.lower()
+        score = self.score
+
+        best = []  # type: List[Tuple[float, int]]
+        for first in range(0, len(matches), FuzzyMatcher.CHUNK_SIZE):
+            if isCancelled is not None and isCancelled():
+                return None
+            chunk = [(score(query, index), -index) for index in matches[first:first + FuzzyMatcher.CHUNK_SIZE]]
+            best = heapq.nlargest(limit, best + chunk)
+        return [-index for _, index in best]
+
+    def score(self, query, index):
+        # type: (str, int) -> float
+        key = self.__keys[index]
+        found = self.__pattern(query).search(key)
+        if found is None:
+            return -math.inf
+
+        start = found.start()
+        gaps = found.end() - start - len(query)
+        value = 100.0 - 2.0 * gaps - 0.5 * start - 0.1 * len(key)
+        if start == 0:
+            value += 10.0
+        elif not key[start - 1].isalnum():
+            value += 5.0
+        if gaps == 0:
+            value += 20.0
+        return value + 10.0 * math.log1p(self.__usage.get(key, 0))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def __pattern(query):
+        # type: (str) -> re.Pattern
+        # "[^c]*c" can only stop at the first "c", so matching never backtracks exponentially
+        parts = [re.escape(query[0])]
+        for char in query[1:]:
+            escaped = re.escape(char)
+            parts.append('[^{}]*{}'.format(escaped, escaped))
+        return re.compile(''.join(parts))
+
+
+def _weakCallable(function):
+    # type: (Optional[Callable]) -> Callable[[], Optional[Callable]]
+    # bound methods are held weakly, so the workers do not keep their owner alive
+    if inspect.ismethod(function):
+        return weakref.WeakMethod(function)
+    return lambda: function
+
+
+def _closeOnDestroyed(owner, close):
+    # type: (QObject, Callable[[], Any]) -> NoReturn
+    # close must not refer to owner, which would be kept alive by its own connection
+    owner.destroyed.connect(functools.partial(_invoke, close))
+
+
+def _invoke(function, *args):
+    # type: (Callable[[], Any], Any) -> NoReturn
+    function()
+
+
+class _LazyThreadPool(object):
+
+    def __init__(self, processes=None):
+        # type: (Optional[int]) -> NoReturn
+        self.__processes = processes
+        self.__pool = None  # type: Optional[multiprocessing.pool.ThreadPool]
+        self.__closed = False
+        self.__lock = threading.Lock()
+
+    def apply_async(self, func, args=()):
+        # type: (Callable, tuple) -> multiprocessing.pool.AsyncResult
+        return self.__get().apply_async(func, args)
+
+    def map_async(self, func, iterable, callback=None, error_callback=None):
+        # type: (Callable, Iterable, Optional[Callable], Optional[Callable]) -> multiprocessing.pool.AsyncResult
+        return self.__get().map_async(func, iterable, callback=callback, error_callback=error_callback)
+
+    def close(self):
+        # type: () -> NoReturn
+        # running tasks are finished, the worker threads exit afterwards
+        with self.__lock:
+            self.__closed = True
+            pool = self.__pool
+        if pool is not None:
+            pool.close()
+
+    def isClosed(self):
+        # type: () -> bool
+        return self.__closed
+
+    def __get(self):
+        # type: () -> multiprocessing.pool.ThreadPool
+        with self.__lock:
+            if self.__closed:
+                raise ValueError('Pool not running')
+            if self.__pool is None:
+                self.__pool = multiprocessing.pool.ThreadPool(processes=self.__processes)
+            return self.__pool
+
+
+class PriorityRequestQueue(object):
+
+    def __init__(self, handler, callback=None, errorCallback=None, workers=1, parent=None):
+        # type: (Callable[[Any], Any], Optional[Callable[[Any, Any], Any]], Optional[Callable[[Any, Exception], Any]], int, Optional[QObject]) -> NoReturn
+        # the queue is closed when parent is destroyed
+        self.__handler = _weakCallable(handler)
+        self.__callback = _weakCallable(callback)
+        self.__errorCallback = _weakCallable(errorCallback)
+        self.__workers = workers
+        self.__pending = collections.OrderedDict()  # type: collections.OrderedDict
+        self.__running = set()
+        self.__draining = 0
+        self.__lock = threading.Lock()
+        self.__pool = _LazyThreadPool(workers)
+        if parent is not None:
+            _closeOnDestroyed(parent, self.close)
+
+    def request(self, keys):
+        # type: (Iterable[Any]) -> NoReturn
+        # replaces every outstanding request, the first key is processed first
+        with self.__lock:
+            self.__pending = collections.OrderedDict((key, None) for key in keys if key not in self.__running)
+        self.__spawn()
+
+    def append(self, keys):
+        # type: (Iterable[Any]) -> NoReturn
+        with self.__lock:
+            for key in keys:
+                if key not in self.__running:
+                    self.__pending[key] = None
+        self.__spawn()
+
+    def prioritize(self, keys):
+        # type: (Iterable[Any]) -> NoReturn
+        with self.__lock:
+            for key in reversed(list(keys)):
+                if key in self.__running:
+                    continue
+                self.__pending[key] = None
+                self.__pending.move_to_end(key, last=False)
+        self.__spawn()
+
+    def cancel(self):
+        # type: () -> NoReturn
+        with self.__lock:
+            self.__pending.clear()
+
+    def pendingCount(self):
+        # type: () -> int
+        with self.__lock:
+            return len(self.__pending)
+
+    def close(self):
+        # type: () -> NoReturn
+        # outstanding requests are dropped, the workers exit once the running ones finished
+        with self.__lock:
+            self.__pending.clear()
+        self.__pool.close()
+
+    def isClosed(self):
+        # type: () -> bool
+        return self.__pool.isClosed()
+
+    def __spawn(self):
+        # type: () -> NoReturn
+        with self.__lock:
+            if self.__pool.isClosed():
+                self.__pending.clear()
+                return
+            count = max(min(self.__workers - self.__draining, len(self.__pending)), 0)
+            self.__draining += count
+        for _ in range(count):
+            self.__pool.apply_async(self.__drain)
+
+    def __drain(self):
+        # type: () -> NoReturn
+        while True:
+            with self.__lock:
+                if len(self.__pending) == 0:
+                    self.__draining -= 1
+                    return
+                key, _ = self.__pending.popitem(last=False)
+                self.__running.add(key)
+
+            handler = self.__handler()
+            if handler is None:
+                # the owner is gone
+                self.close()
+                continue
+            try:
+                result = handler(key)
+            except Exception as e:
+                errorCallback = self.__errorCallback()
+                if errorCallback is not None:
+                    errorCallback(key, e)
+                continue
+            finally:
+                handler = None
+                with self.__lock:
+                    self.__running.discard(key)
+
+            callback = self.__callback()
+            if callback is not None and not self.__pool.isClosed():
+                callback(key, result)
+            callback = None
+
+
+def isDirectoryEntry(entry):
+    # type: (os.DirEntry) -> bool
+    # links to directories count as directories, in every listing and in the path index
+    return entry.is_dir()
+
+
+def hasSubdirectory(path):
+    # type: (Union[str, pathlib.Path]) -> bool
+    # one directory read that stops at the first subdirectory, DirEntry.is_dir needs no stat on most file systems
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        return True
+                except OSError:
+                    continue
+    except OSError:
+        return False
+    return False
+
+
+class DirectoryListingCache(object):
+
+    def __init__(self, maxEntries=1024):
+        # type: (int) -> NoReturn
+        self.__maxEntries = maxEntries
+        self.__entries = collections.OrderedDict()  # type: Dict[str, Tuple[int, List[str]]]
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        # type: () -> int
+        with self.__lock:
+            return len(self.__entries)
+
+    def __contains__(self, path):
+        # type: (Union[str, pathlib.Path]) -> bool
+        with self.__lock:
+            return str(path) in self.__entries
+
+    @staticmethod
+    def modificationTime(path):
+        # type: (Union[str, pathlib.Path]) -> Optional[int]
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, path):
+        # type: (Union[str, pathlib.Path]) -> Optional[List[str]]
+        # a listing is only returned while the directory keeps the mtime it was listed at
+        key = str(path)
+        with self.__lock:
+            entry = self.__entries.get(key)
+        if entry is None:
+            return None
+
+        mtime = DirectoryListingCache.modificationTime(path)
+        with self.__lock:
+            if mtime is None or mtime != entry[0]:
+                self.__entries.pop(key, None)
+                return None
+            if key in self.__entries:
+                self.__entries.move_to_end(key)
+        return list(entry[1])
+
+    def set(self, path, names, mtime):
+        # type: (Union[str, pathlib.Path], Iterable[str], Optional[int]) -> NoReturn
+        # mtime should be taken before listing, so changes made during the listing are not hidden
+        if mtime is None:
+            return
+        key = str(path)
+        with self.__lock:
+            self.__entries[key] = (mtime, list(names))
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__maxEntries:
+                self.__entries.popitem(last=False)
+
+    def list(self, path):
+        # type: (Union[str, pathlib.Path]) -> List[str]
+        # the subdirectory names of path, listed and stored when there is no valid listing yet
+        names = self.get(path)
+        if names is not None:
+            return names
+
+        mtime = DirectoryListingCache.modificationTime(path)
+        names = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if isDirectoryEntry(entry):
+                            names.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return names
+        self.set(path, names, mtime)
+        return names
+
+    def invalidate(self, path):
+        # type: (Union[str, pathlib.Path]) -> NoReturn
+        with self.__lock:
+            self.__entries.pop(str(path), None)
+
+    def clear(self):
+        # type: () -> NoReturn
+        with self.__lock:
+            self.__entries.clear()
+
+
+class DirectoryLister(QObject):
+
+    chunkListed = Signal(int, object)
+    finished = Signal(int)
+
+    def __init__(self, parent=None, workers=2):
+        # type: (QObject, int) -> NoReturn
+        super(DirectoryLister, self).__init__(parent)
+        self.__requestIds = itertools.count()
+        self.__active = set()  # type: Set[int]
+        self.__lock = threading.Lock()
+        self.__pool = _LazyThreadPool(workers)
+        _closeOnDestroyed(self, self.__pool.close)
+        _closeOnDestroyed(self, self.__active.clear)
+
+    def list(self, path, entryFilter=None, chunkSize=256, interval=0.05):
+        # type: (Union[str, pathlib.Path], Optional[Callable[[os.DirEntry], bool]], int, float) -> int
+        # entries arrive through chunkListed in chunks of chunkSize, or whatever was read within interval seconds
+        requestId = next(self.__requestIds)
+        with self.__lock:
+            self.__active.add(requestId)
+        self.__pool.apply_async(self.__list, (requestId, path, entryFilter, chunkSize, interval))
+        return requestId
+
+    def cancel(self, requestId):
+        # type: (int) -> NoReturn
+        with self.__lock:
+            self.__active.discard(requestId)
+
+    def cancelAll(self):
+        # type: () -> NoReturn
+        with self.__lock:
+            self.__active.clear()
+
+    def isActive(self, requestId):
+        # type: (int) -> bool
+        with self.__lock:
+            return requestId in self.__active
+
+    def __list(self, requestId, path, entryFilter, chunkSize, interval):
+        # type: (int, Union[str, pathlib.Path], Optional[Callable[[os.DirEntry], bool]], int, float) -> NoReturn
+        chunk = []  # type: List[os.DirEntry]
+        deadline = time.monotonic() + interval
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if not self.isActive(requestId):
+                        return
+                    try:
+                        if entryFilter is not None and not entryFilter(entry):
+                            continue
+                    except OSError:
+                        continue
+
+                    chunk.append(entry)
+                    if len(chunk) >= chunkSize or time.monotonic() >= deadline:
+                        self.chunkListed.emit(requestId, chunk)
+                        chunk = []
+                        deadline = time.monotonic() + interval
+        except OSError:
+            pass
+
+        if not self.isActive(requestId):
+            return
+        if len(chunk) > 0:
+            self.chunkListed.emit(requestId, chunk)
+        self.cancel(requestId)
+        self.finished.emit(requestId)
+
+
+class PathIndex(QObject):
+
+    # removed nodes are dropped once there are more of them than live nodes, and at least this many
+    COMPACT_THRESHOLD = 1024
+
+    finished = Signal()
+
+    def __init__(self, parent=None, workers=4):
+        # type: (QObject, int) -> NoReturn
+        super(PathIndex, self).__init__(parent)
+        # directories are nodes of a trie in parallel lists, node ids are also the name index keys
+        self.__names = []  # type: List[str]
+        self.__parents = array.array('i')
+        self.__mtimes = []  # type: List[Optional[int]]
+        self.__children = []  # type: List[Optional[Dict[str, int]]]
+        self.__roots = collections.OrderedDict()  # type: Dict[int, pathlib.Path]
+        self.__nameIndex = TrigramIndex()
+        self.__count = 0
+        self.__generation = 0
+        self.__pending = 0
+        self.__lock = threading.Lock()
+        self.__pool = _LazyThreadPool(workers)
+        _closeOnDestroyed(self, self.__pool.close)
+
+    def __len__(self):
+        # type: () -> int
+        return self.__count
+
+    def __contains__(self, path):
+        # type: (Union[str, pathlib.Path]) -> bool
+        with self.__lock:
+            return self.__nodeOf(pathlib.Path(path)) is not None
+
+    def build(self, paths):
+        # type: (Iterable[Union[str, pathlib.Path]]) -> NoReturn
+        # walks the directories below paths in parallel, finished is emitted once every directory was listed
+        with self.__lock:
+            self.__generation += 1
+            self.__names = []
+            self.__parents = array.array('i')
+            self.__mtimes = []
+            self.__children = []
+            self.__roots = collections.OrderedDict()
+            self.__nameIndex = TrigramIndex()
+            self.__count = 0
+            nodes = []
+            for path in paths:
+                path = pathlib.Path(path)
+                node = self.__addNode(-1, path.name if len(path.name) > 0 else str(path))
+                self.__roots[node] = path
+                nodes.append(node)
+            generation = self.__generation
+        for node in nodes:
+            self.__schedule(generation, node)
+
+    def isBuilding(self):
+        # type: () -> bool
+        with self.__lock:
+            return self.__pending > 0
+
+    def update(self, path, names=None):
+        # type: (Union[str, pathlib.Path], Optional[Iterable[str]]) -> NoReturn
+        # applies the subdirectory names of an indexed directory, listed again on a worker when names is None
+        path = pathlib.Path(path)
+        with self.__lock:
+            generation = self.__generation
+            node = self.__nodeOf(path)
+            if node is None:
+                return
+            if names is None:
+                added = None
+            else:
+                added = self.__setChildren(node, names)
+                if len(added) == 0 and self.__pending == 0:
+                    self.__compactIfSparse()
+        if added is None:
+            self.__schedule(generation, node)
+            return
+        for child in added:
+            self.__schedule(generation, child)
+
+    def close(self):
+        # type: () -> NoReturn
+        # stops the walk, the index keeps what was listed so far
+        with self.__lock:
+            self.__generation += 1
+        self.__pool.close()
+
+    def refresh(self):
+        # type: () -> NoReturn
+        # every indexed directory whose mtime changed is listed again
+        with self.__lock:
+            if self.__pool.isClosed():
+                return
+            generation = self.__generation
+            nodes = [node for node in range(len(self.__parents)) if self.__isAlive(node)]
+            self.__pending += 1
+        self.__pool.apply_async(self.__refresh, (generation, nodes))
+
+    def search(self, query, root=None, limit=None):
+        # type: (str, Optional[Union[str, pathlib.Path]], Optional[int]) -> List[pathlib.Path]
+        # directories whose name contains query, below root when given, in path order
+        while True:
+            with self.__lock:
+                nameIndex = self.__nameIndex
+            nodes = nameIndex.search(query)
+
+            with self.__lock:
+                # node ids change with a new build or a compaction
+                if nameIndex is not self.__nameIndex:
+                    continue
+                rootNode = None
+                if root is not None:
+                    rootNode = self.__nodeOf(pathlib.Path(root))
+                    if rootNode is None:
+                        return []
+                paths = [
+                    self.__pathOf(node) for node in nodes
+                    if self.__isAlive(node) and (rootNode is None or self.__isBelow(node, rootNode))]
+            paths.sort()
+            return paths if limit is None else paths[:limit]
+
+    def __addNode(self, parent, name):
+        # type: (int, str) -> int
+        node = len(self.__parents)
+        self.__names.append(name)
+        self.__parents.append(parent)
+        self.__mtimes.append(None)
+        self.__children.append(None)
+        self.__nameIndex.append(name)
+        self.__count += 1
+        if parent >= 0:
+            children = self.__children[parent]
+            if children is None:
+                children = self.__children[parent] = {}
+            children[name] = node
+        return node
+
+    def __removeNode(self, node):
+        # type: (int) -> NoReturn
+        # removed nodes stay in the name index with a parent of -2 until the next compaction
+        parent = self.__parents[node]
+        if parent >= 0:
+            del self.__children[parent][self.__names[node]]
+        stack = [node]
+        while len(stack) > 0:
+            node = stack.pop()
+            children = self.__children[node]
+            if children is not None:
+                stack.extend(children.values())
+            self.__parents[node] = -2
+            self.__children[node] = None
+            self.__count -= 1
+
+    def __compactIfSparse(self):
+        # type: () -> NoReturn
+        # renumbers the live nodes, only while no walk refers to node ids
+        dead = len(self.__parents) - self.__count
+        if dead < max(PathIndex.COMPACT_THRESHOLD, self.__count):
+            return
+
+        nodes = {}  # type: Dict[int, int]
+        names = []  # type: List[str]
+        parents = array.array('i')
+        mtimes = []  # type: List[Optional[int]]
+        # parents always have smaller ids than their children
+        for node in range(len(self.__parents)):
+            if not self.__isAlive(node):
+                continue
+            nodes[node] = len(names)
+            parent = self.__parents[node]
+            names.append(self.__names[node])
+            parents.append(nodes[parent] if parent >= 0 else parent)
+            mtimes.append(self.__mtimes[node])
+
+        children = [None] * len(names)  # type: List[Optional[Dict[str, int]]]
+        for node, newNode in nodes.items():
+            if self.__children[node] is not None:
+                children[newNode] = {name: nodes[child] for name, child in self.__children[node].items()}
+
+        self.__names = names
+        self.__parents = parents
+        self.__mtimes = mtimes
+        self.__children = children
+        self.__roots = collections.OrderedDict((nodes[node], path) for node, path in self.__roots.items())
+        self.__nameIndex = TrigramIndex(names)
+
+    def __isAlive(self, node):
+        # type: (int) -> bool
+        return self.__parents[node] != -2
+
+    def __isBelow(self, node, ancestor):
+        # type: (int, int) -> bool
+        while node >= 0:
+            if node == ancestor:
+                return True
+            node = self.__parents[node]
+        return False
+
+    def __pathOf(self, node):
+        # type: (int) -> pathlib.Path
+        parts = []  # type: List[str]
+        while self.__parents[node] >= 0:
+            parts.append(self.__names[node])
+            node = self.__parents[node]
+        return self.__roots[node].joinpath(*reversed(parts))
+
+    def __nodeOf(self, path):
+        # type: (pathlib.Path) -> Optional[int]
+        for node, rootPath in self.__roots.items():
+            if path != rootPath and rootPath not in path.parents:
+                continue
+            for name in path.relative_to(rootPath).parts:
+                children = self.__children[node]
+                if children is None or name not in children:
+                    break
+                node = children[name]
+            else:
+                return node
+        return None
+
+    def __setChildren(self, node, names):
+        # type: (int, Iterable[str]) -> List[int]
+        # returns the added nodes, which still have to be walked
+        names = set(names)
+        children = self.__children[node] or {}
+        for name in [name for name in children if name not in names]:
+            self.__removeNode(children[name])
+        return [self.__addNode(node, name) for name in sorted(names) if name not in children]
+
+    def __schedule(self, generation, node):
+        # type: (int, int) -> NoReturn
+        with self.__lock:
+            if generation != self.__generation or not self.__isAlive(node) or self.__pool.isClosed():
+                return
+            path = self.__pathOf(node)
+            self.__pending += 1
+        self.__pool.apply_async(self.__walk, (generation, node, path))
+
+    def __walk(self, generation, node, path):
+        # type: (int, int, pathlib.Path) -> NoReturn
+        # the mtime is taken before listing, so changes made during the listing are seen by refresh
+        mtime = DirectoryListingCache.modificationTime(path)
+        names = []  # type: List[str]
+        try:
+            if not PathIndex.__isLoop(path):
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        try:
+                            if isDirectoryEntry(entry):
+                                names.append(entry.name)
+                        except OSError:
+                            continue
+        except OSError:
+            pass
+
+        added = []  # type: List[int]
+        with self.__lock:
+            if generation == self.__generation and self.__isAlive(node):
+                self.__mtimes[node] = mtime
+                added = self.__setChildren(node, names)
+        for child in added:
+            self.__schedule(generation, child)
+        self.__finishTask()
+
+    @staticmethod
+    def __isLoop(path):
+        # type: (pathlib.Path) -> bool
+        # links are followed like in the tree, but one to a directory above it is indexed without its children
+        if not path.is_symlink():
+            return False
+        target = os.path.realpath(str(path))
+        return any(os.path.realpath(str(parent)) == target for parent in path.parents)
+
+    def __refresh(self, generation, nodes):
+        # type: (int, List[int]) -> NoReturn
+        for node in nodes:
+            with self.__lock:
+                if generation != self.__generation or not self.__isAlive(node):
+                    continue
+                path = self.__pathOf(node)
+                mtime = self.__mtimes[node]
+            if DirectoryListingCache.modificationTime(path) != mtime:
+                self.__schedule(generation, node)
+        self.__finishTask()
+
+    def __finishTask(self):
+        # type: () -> NoReturn
+        with self.__lock:
+            self.__pending -= 1
+            finished = self.__pending == 0 and not self.__pool.isClosed()
+            if self.__pending == 0:
+                self.__compactIfSparse()
+        if finished:
+            self.finished.emit()
+
+
 @contextlib.contextmanager
 def profileCtx(sortKey=pstats.SortKey.CUMULATIVE, stream=sys.stdout):
     # type: (str, io.TextIOBase) -> NoReturn
@@ -247,7 +1336,10 @@ class QFileIconLoader(QObject):
         super(QFileIconLoader, self).__init__(parent)
         self.__targetPaths = []  # type: List[pathlib.Path]
         self.__iconsCache = LruCache(cacheSize)  # type: LruCache[pathlib.Path, QIcon]
-        self.__pool = multiprocessing.pool.ThreadPool(processes=1)
+        self.__iconsCacheLock = threading.Lock()
+        self.__pool = _LazyThreadPool(1)
+        _closeOnDestroyed(self, self.__pool.close)
+        self.__requests = PriorityRequestQueue(self.__loadIcon, self.__onRequestLoaded, parent=self)
         self.completed.connect(self.reset)
 
     def append(self, filePath):
@@ -274,7 +1366,8 @@ class QFileIconLoader(QObject):
 
         if useCache:
             for path in self.__targetPaths:
-                icon = self.__iconsCache.get(path)
+                with self.__iconsCacheLock:
+                    icon = self.__iconsCache.get(path)
                 if icon is None:
                     continue
                 targetPaths.remove(path)
@@ -286,27 +1379,11 @@ class QFileIconLoader(QObject):
 
         def _load(filePath):
             # type: (pathlib.Path) -> NoReturn
-            with itemsLock:
-                icon = self.__iconsCache.get(filePath)
-
-            if icon is None:
-                iconProvider = QFileIconProvider()
-
-                posixPath = filePath.as_posix()
-                file = QFileInfo(posixPath)
-                icon = iconProvider.icon(file)
-
-                if icon.isNull():
-                    mimeDb = QMimeDatabase()
-                    for mime in mimeDb.mimeTypesForFileName(posixPath):
-                        icon = QIcon.fromTheme(mime.iconName())
-                        if not icon.isNull():
-                            break
+            icon = self.__loadIcon(filePath)
 
             result = QFileIconLoader.LoadResult(filePath, icon)
             with itemsLock:
                 loadedItems[filePath] = result
-                self.__iconsCache.set(filePath, icon)
 
             self.loaded.emit(result)
 
@@ -317,3 +1394,51 @@ class QFileIconLoader(QObject):
             _load,
             targetPaths,
         )
+
+    def request(self, filePaths):
+        # type: (Iterable[Union[str, pathlib.Path]]) -> NoReturn
+        # replaces the outstanding requests, cached icons are emitted immediately
+        targetPaths = []  # type: List[pathlib.Path]
+        for filePath in filePaths:
+            if isinstance(filePath, str):
+                filePath = pathlib.Path(filePath)
+            with self.__iconsCacheLock:
+                icon = self.__iconsCache.get(filePath)
+            if icon is None:
+                targetPaths.append(filePath)
+                continue
+            self.loaded.emit(QFileIconLoader.LoadResult(filePath, icon))
+
+        self.__requests.request(targetPaths)
+
+    def cancel(self):
+        # type: () -> NoReturn
+        self.__requests.cancel()
+
+    def __onRequestLoaded(self, filePath, icon):
+        # type: (pathlib.Path, QIcon) -> NoReturn
+        self.loaded.emit(QFileIconLoader.LoadResult(filePath, icon))
+
+    def __loadIcon(self, filePath):
+        # type: (pathlib.Path) -> QIcon
+        with self.__iconsCacheLock:
+            icon = self.__iconsCache.get(filePath)
+        if icon is not None:
+            return icon
+
+        iconProvider = QFileIconProvider()
+
+        posixPath = filePath.as_posix()
+        file = QFileInfo(posixPath)
+        icon = iconProvider.icon(file)
+
+        if icon.isNull():
+            mimeDb = QMimeDatabase()
+            for mime in mimeDb.mimeTypesForFileName(posixPath):
+                icon = QIcon.fromTheme(mime.iconName())
+                if not icon.isNull():
+                    break
+
+        with self.__iconsCacheLock:
+            self.__iconsCache.set(filePath, icon)
+        return icon
@@ -1,5 +1,10 @@
 # coding: utf-8
+import os
 import pathlib
+import collections
+import bisect
+import array
+import itertools
 from functools import partial
 
 from typing import (
@@ -10,22 +15,31 @@ from typing import (
     Union,
     Any,
     List,
+    Dict,
+    Tuple,
+    Iterable,
+    Callable,
+    Set,
 )
 
 from PySide2.QtCore import (
     Qt,
     QObject,
     QModelIndex,
+    QPersistentModelIndex,
     QAbstractListModel,
     QStringListModel,
     QAbstractItemModel,
     QAbstractProxyModel,
-    QSortFilterProxyModel,
     QRect,
     QPoint,
     QSize,
     Signal,
     QItemSelection,
+    QTimer,
+    QEvent,
+    QCoreApplication,
+    QFileSystemWatcher,
 )
 
 from PySide2.QtWidgets import (
@@ -43,6 +57,12 @@ from PySide2.QtWidgets import (
     QScrollArea,
     QTreeView,
     QAbstractItemView,
+    QApplication,
+    QStyle,
+    QLayoutItem,
+    QAbstractScrollArea,
+    QStyledItemDelegate,
+    QStyleOptionViewItem,
 )
 
 from PySide2.QtGui import (
@@ -50,15 +70,313 @@ from PySide2.QtGui import (
     QStandardItem,
     QStandardItemModel,
     QMouseEvent,
+    QResizeEvent,
+    QShowEvent,
+    QPaintEvent,
+    QPainter,
+    QColor,
+    QFont,
+    QFontMetrics,
+    QPalette,
+    QRegion,
+    QPixmap,
 )
 
+from .QCdtUtils import (
+    QFileIconLoader,
+    TrigramIndex,
+    FuzzyMatcher,
+    CostLruCache,
+    PriorityRequestQueue,
+    ThumbnailAtlas,
+    ThumbnailPyramid,
+    hasSubdirectory,
+    isDirectoryEntry,
+    DirectoryLister,
+    DirectoryListingCache,
+    PathIndex,
+)
+
+
+def _viewportRows(view, margin=0, viewport=None):
+    # type: (QAbstractItemView, int, Optional[QRect]) -> List[int]
+    # rows intersecting the viewport first, then the prefetch margin after and before them
+    model = view.model()
+    rowCount = model.rowCount() if model is not None else 0
+    if rowCount == 0:
+        return []
+
+    if viewport is None:
+        viewport = view.viewport().rect()
+    if viewport.isEmpty():
+        return []
+
+    # rows inserted since the last layout have no visual rect yet
+    view.executeDelayedItemsLayout()
+
+    def _isBefore(row):
+        rect = view.visualRect(model.index(row, 0))
+        return rect.bottom() < viewport.top() or rect.right() < viewport.left()
+
+    def _isAfter(row):
+        rect = view.visualRect(model.index(row, 0))
+        return rect.top() > viewport.bottom() or rect.left() > viewport.right()
+
+    low, high = 0, rowCount
+    while low < high:
+        middle = (low + high) // 2
+        if _isBefore(middle):
+            low = middle + 1
+        else:
+            high = middle
+
+    rows = []
+    row = low
+    while row < rowCount and not _isAfter(row):
+        rows.append(row)
+        row += 1
+
+    rows.extend(range(row, min(row + margin, rowCount)))
+    rows.extend(range(low - 1, max(low - margin, 0) - 1, -1))
+    return rows
+
+
+def _contiguousRuns(rows):
+    # type: (Iterable[int]) -> List[Tuple[int, int]]
+    # ascending (first, last) pairs of the distinct rows
+    runs = []  # type: List[Tuple[int, int]]
+    for row in sorted(set(rows)):
+        if len(runs) > 0 and runs[-1][1] == row - 1:
+            runs[-1] = (runs[-1][0], row)
+        else:
+            runs.append((row, row))
+    return runs
+
+
+def _sourceColumnCount(model):
+    # type: (QAbstractItemModel) -> int
+    # columnCount is private in QAbstractListModel, so it cannot be called on list models from Python
+    if isinstance(model, QAbstractListModel):
+        return 1
+    return model.columnCount(QModelIndex())
+
+
+class QTagWidgetMode(object):
+
+    Widgets = 'Widgets'
+    Painted = 'Painted'
+
+
+class QTagChipsWidget(QWidget):
+
+    tagRemoveRequested = Signal(str)
+
+    CHIP_HEIGHT = 28
+    CHIP_SPACING = 4
+    TEXT_MARGIN = 8
+    CLOSE_SIZE = 20
+    CLOSE_SPACING = 10
+
+    def __init__(self, parent=None):
+        # type: (QWidget) -> NoReturn
+        super(QTagChipsWidget, self).__init__(parent)
+        self.__tags = []  # type: List[str]
+        self.__rects = []  # type: List[QRect]
+        self.__layoutWidth = -1
+        self.__textWidths = {}  # type: Dict[str, int]
+        self.__closeFont = QFont(self.font())
+        self.__closeFont.setBold(True)
+        self.__pressedIndex = -1
+
+        sizePolicy = QSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+        sizePolicy.setHeightForWidth(True)
+        self.setSizePolicy(sizePolicy)
+
+    def tags(self):
+        # type: () -> List[str]
+        return list(self.__tags)
+
+    def setTags(self, tags):
+        # type: (List[str]) -> NoReturn
+        tags = list(tags)
+        first = 0
+        for first, (oldTag, newTag) in enumerate(zip(self.__tags, tags)):
+            if oldTag != newTag:
+                break
+        else:
+            first = min(len(self.__tags), len(tags))
+
+        if first == len(self.__tags) == len(tags):
+            return
+
+        oldHeight = self.heightForWidth(self.width())
+        dirty = QRegion()
+        for rect in self.__rects[first:]:
+            dirty += rect
+
+        self.__tags = tags
+        self.__relayout(first)
+
+        for rect in self.__rects[first:]:
+            dirty += rect
+        self.update(dirty)
+
+        if self.heightForWidth(self.width()) != oldHeight:
+            self.updateGeometry()
+
+    def chipAt(self, pos):
+        # type: (QPoint) -> int
+        for index, rect in enumerate(self.__rects):
+            if rect.contains(pos):
+                return index
+        return -1
+
+    def closeButtonAt(self, pos):
+        # type: (QPoint) -> int
+        index = self.chipAt(pos)
+        if index >= 0 and self.__closeRect(self.__rects[index]).contains(pos):
+            return index
+        return -1
+
+    def hasHeightForWidth(self):
+        # type: () -> bool
+        return True
+
+    def heightForWidth(self, width):
+        # type: (int) -> int
+        if len(self.__tags) == 0:
+            return QTagChipsWidget.CHIP_HEIGHT
+        if width != self.__layoutWidth:
+            rects = self.__flow(0, width, [])
+        else:
+            rects = self.__rects
+        return rects[-1].bottom() + 1
+
+    def sizeHint(self):
+        # type: () -> QSize
+        width = max(self.width(), QTagChipsWidget.CHIP_HEIGHT)
+        return QSize(width, self.heightForWidth(width))
+
+    def minimumSizeHint(self):
+        # type: () -> QSize
+        return QSize(0, QTagChipsWidget.CHIP_HEIGHT)
+
+    def resizeEvent(self, event):
+        # type: (QResizeEvent) -> NoReturn
+        super(QTagChipsWidget, self).resizeEvent(event)
+        if event.size().width() != self.__layoutWidth:
+            self.__relayout(0)
+
+    def changeEvent(self, event):
+        # type: (QEvent) -> NoReturn
+        super(QTagChipsWidget, self).changeEvent(event)
+        if event.type() == QEvent.FontChange:
+            self.__textWidths.clear()
+            self.__closeFont = QFont(self.font())
+            self.__closeFont.setBold(True)
+            self.__relayout(0)
+            self.updateGeometry()
+            self.update()
+
+    def paintEvent(self, event):
+        # type: (QPaintEvent) -> NoReturn
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        exposed = event.rect()
+        for tag, rect in zip(self.__tags, self.__rects):
+            if not rect.intersects(exposed):
+                continue
+
+            painter.setPen(QColor(192, 192, 192))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawRoundedRect(rect.adjusted(0, 0, -1, -1), 4, 4)
+
+            painter.setPen(self.palette().color(self.foregroundRole()))
+            textRect = QRect(
+                rect.left() + QTagChipsWidget.TEXT_MARGIN,
+                rect.top(),
+                self.__textWidth(tag),
+                rect.height())
+            painter.setFont(self.font())
+            painter.drawText(textRect, Qt.AlignLeft | Qt.AlignVCenter, tag)
+
+            painter.setFont(self.__closeFont)
+            painter.drawText(self.__closeRect(rect), Qt.AlignCenter, 'x')
+
+    def mousePressEvent(self, event):
+        # type: (QMouseEvent) -> NoReturn
+        if event.button() == Qt.LeftButton:
+            self.__pressedIndex = self.closeButtonAt(event.pos())
+        super(QTagChipsWidget, self).mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        # type: (QMouseEvent) -> NoReturn
+        pressedIndex = self.__pressedIndex
+        self.__pressedIndex = -1
+        if event.button() == Qt.LeftButton and pressedIndex >= 0 and self.closeButtonAt(event.pos()) == pressedIndex:
+            self.tagRemoveRequested.emit(self.__tags[pressedIndex])
+            return
+        super(QTagChipsWidget, self).mouseReleaseEvent(event)
+
+    def __textWidth(self, tag):
+        # type: (str) -> int
+        width = self.__textWidths.get(tag)
+        if width is None:
+            width = QFontMetrics(self.font()).horizontalAdvance(tag)
+            self.__textWidths[tag] = width
+        return width
+
+    def __chipWidth(self, tag):
+        # type: (str) -> int
+        return (QTagChipsWidget.TEXT_MARGIN + self.__textWidth(tag) + QTagChipsWidget.CLOSE_SPACING +
+                QTagChipsWidget.CLOSE_SIZE + QTagChipsWidget.TEXT_MARGIN // 2)
+
+    def __closeRect(self, rect):
+        # type: (QRect) -> QRect
+        size = QTagChipsWidget.CLOSE_SIZE
+        return QRect(
+            rect.right() - QTagChipsWidget.TEXT_MARGIN // 2 - size + 1,
+            rect.top() + (rect.height() - size) // 2,
+            size,
+            size)
+
+    def __flow(self, first, width, rects):
+        # type: (int, int, List[QRect]) -> List[QRect]
+        # keeps the chips before "first" and places the rest from where they end
+        rects = rects[:first]
+        if len(rects) > 0:
+            x = rects[-1].right() + 1 + QTagChipsWidget.CHIP_SPACING
+            y = rects[-1].top()
+        else:
+            x = 0
+            y = 0
+
+        for tag in self.__tags[first:]:
+            chipWidth = self.__chipWidth(tag)
+            if x > 0 and x + chipWidth > width:
+                x = 0
+                y += QTagChipsWidget.CHIP_HEIGHT + QTagChipsWidget.CHIP_SPACING
+            rects.append(QRect(x, y, chipWidth, QTagChipsWidget.CHIP_HEIGHT))
+            x += chipWidth + QTagChipsWidget.CHIP_SPACING
+
+        return rects
+
+    def __relayout(self, first):
+        # type: (int) -> NoReturn
+        if self.width() != self.__layoutWidth:
+            first = 0
+        self.__layoutWidth = self.width()
+        self.__rects = self.__flow(first, self.__layoutWidth, self.__rects)
+
 
 class QTagWidget(QWidget):
 
-    def __init__(self, parent, items):
+    def __init__(self, parent, items, mode=QTagWidgetMode.Widgets, maxTags=5):
         super(QTagWidget, self).__init__()
         self.parent = parent
         self.items = items
+        self.mode = mode
+        self.maxTags = maxTags
 
         self.tags = []
         self.mainFrame = QFrame()
@@ -89,6 +407,14 @@ class QTagWidget(QWidget):
         self.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Minimum)
         self.hLayout.setContentsMargins(2, 2, 2, 2)
 
+        self.chips = None
+        if self.mode == QTagWidgetMode.Painted:
+            self.chips = QTagChipsWidget()
+            self.chips.setStyleSheet('border:0px')
+            self.chips.tagRemoveRequested.connect(self.delete_tag)
+            self.hLayout.addWidget(self.chips, 1)
+            self.hLayout.addWidget(self.lineEdit)
+
         self.refresh()
 
         self.setup_ui()
@@ -96,6 +422,15 @@ class QTagWidget(QWidget):
     def show(self):
         self.show()
 
+    def setMaxTags(self, count):
+        # type: (Optional[int]) -> NoReturn
+        self.maxTags = count
+        self.lineEdit.setDisabled(self.isFull())
+
+    def isFull(self):
+        # type: () -> bool
+        return self.maxTags is not None and len(self.tags) >= self.maxTags
+
     def setup_ui(self):
         self.lineEdit.returnPressed.connect(self.create_tags)
 
@@ -108,17 +443,20 @@ class QTagWidget(QWidget):
         self.refresh()
 
     def refresh(self):
-        for i in reversed(range(self.hLayout.count())):
-            self.hLayout.itemAt(i).widget().setParent(None)
-        for tag in self.tags:
-            self.add_tag_to_bar(tag)
-        self.hLayout.addWidget(self.lineEdit)
+        if self.chips is not None:
+            # only the chips after the first changed tag are laid out again
+            self.chips.setTags(self.tags)
+        else:
+            # items are taken rather than looked up, a kept item would outlive its deletion by Qt
+            for i in reversed(range(self.hLayout.count())):
+                self.hLayout.takeAt(i).widget().setParent(None)
+            for tag in self.tags:
+                self.add_tag_to_bar(tag)
+            self.hLayout.addWidget(self.lineEdit)
         self.lineEdit.setFocus()
 
-        # Accept to add only 5 tags
-        if len(self.tags) >= 5:
-            self.lineEdit.setDisabled(True)
-            return
+        # Accept to add only "maxTags" tags
+        self.lineEdit.setDisabled(self.isFull())
 
     def add_tag_to_bar(self, text):
         tag = QFrame()
@@ -151,36 +489,345 @@ class QTagWidget(QWidget):
 
     def delete_tag(self, tag_name):
         self.tags.remove(tag_name)
-
-        # Make input available if tags count is less than 5
-        if len(self.tags) < 5:
-            self.lineEdit.setDisabled(False)
         self.refresh()
 
 
+class QRowSubsetProxyModel(QAbstractProxyModel):
+
+    def __init__(self, parent=None):
+        # type: (QObject) -> NoReturn
+        super(QRowSubsetProxyModel, self).__init__(parent)
+        self.__rows = []  # type: List[int]
+        self.__proxyRows = None  # type: Optional[Dict[int, int]]
+
+    def setSourceModel(self, model):
+        # type: (QAbstractItemModel) -> NoReturn
+        self.beginResetModel()
+        previous = self.sourceModel()
+        if previous is not None:
+            previous.rowsAboutToBeRemoved.disconnect(self.__onSourceRowsAboutToBeRemoved)
+            previous.rowsRemoved.disconnect(self.__onSourceRowsRemoved)
+            previous.rowsInserted.disconnect(self.__onSourceRowsInserted)
+            previous.modelReset.disconnect(self.__onSourceReset)
+        super(QRowSubsetProxyModel, self).setSourceModel(model)
+        if model is not None:
+            model.rowsAboutToBeRemoved.connect(self.__onSourceRowsAboutToBeRemoved)
+            model.rowsRemoved.connect(self.__onSourceRowsRemoved)
+            model.rowsInserted.connect(self.__onSourceRowsInserted)
+            model.modelReset.connect(self.__onSourceReset)
+        self.__rows = []
+        self.__proxyRows = None
+        self.endResetModel()
+
+    def setRows(self, rows):
+        # type: (List[int]) -> NoReturn
+        self.beginResetModel()
+        self.__rows = rows
+        self.__proxyRows = None
+        self.endResetModel()
+
+    def rows(self):
+        # type: () -> List[int]
+        return self.__rows
+
+    def rowCount(self, parent=QModelIndex()):
+        # type: (QModelIndex) -> int
+        if parent.isValid():
+            return 0
+        return len(self.__rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        # type: (QModelIndex) -> int
+        sourceModel = self.sourceModel()
+        if parent.isValid() or sourceModel is None:
+            return 0
+        return _sourceColumnCount(sourceModel)
+
+    def index(self, row, column, parent=QModelIndex()):
+        # type: (int, int, QModelIndex) -> QModelIndex
+        if parent.isValid() or not 0 <= row < len(self.__rows):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=None):
+        # type: (Optional[QModelIndex]) -> Union[QObject, QModelIndex]
+        if index is None:
+            return super(QRowSubsetProxyModel, self).parent()
+        return QModelIndex()
+
+    def mapToSource(self, proxyIndex):
+        # type: (QModelIndex) -> QModelIndex
+        if not proxyIndex.isValid() or not 0 <= proxyIndex.row() < len(self.__rows):
+            return QModelIndex()
+        return self.sourceModel().index(self.__rows[proxyIndex.row()], proxyIndex.column())
+
+    def mapFromSource(self, sourceIndex):
+        # type: (QModelIndex) -> QModelIndex
+        if not sourceIndex.isValid():
+            return QModelIndex()
+        if self.__proxyRows is None:
+            self.__proxyRows = {sourceRow: row for row, sourceRow in enumerate(self.__rows)}
+        row = self.__proxyRows.get(sourceIndex.row())
+        if row is None:
+            return QModelIndex()
+        return self.createIndex(row, sourceIndex.column())
+
+    def __onSourceRowsAboutToBeRemoved(self, parent, first, last):
+        # type: (QModelIndex, int, int) -> NoReturn
+        # the subset rows go while the source still has them, the later ones are shifted once they are gone
+        if parent.isValid():
+            return
+        removed = [row for row, sourceRow in enumerate(self.__rows) if first <= sourceRow <= last]
+        if len(removed) == 0:
+            return
+        rows = list(self.__rows)
+        for firstRow, lastRow in reversed(_contiguousRuns(removed)):
+            self.beginRemoveRows(QModelIndex(), firstRow, lastRow)
+            del rows[firstRow:lastRow + 1]
+            self.__rows = rows
+            self.__proxyRows = None
+            self.endRemoveRows()
+
+    def __onSourceRowsRemoved(self, parent, first, last):
+        # type: (QModelIndex, int, int) -> NoReturn
+        if parent.isValid():
+            return
+        count = last - first + 1
+        self.__rows = [sourceRow - count if sourceRow > last else sourceRow for sourceRow in self.__rows]
+        self.__proxyRows = None
+
+    def __onSourceRowsInserted(self, parent, first, last):
+        # type: (QModelIndex, int, int) -> NoReturn
+        if parent.isValid():
+            return
+        count = last - first + 1
+        self.__rows = [sourceRow + count if sourceRow >= first else sourceRow for sourceRow in self.__rows]
+        self.__proxyRows = None
+
+    def __onSourceReset(self):
+        # type: () -> NoReturn
+        self.setRows([])
+
+
+class QPartialMatchMode(object):
+
+    Substring = 'Substring'
+    Fuzzy = 'Fuzzy'
+
+
 class QPartialMatchCompleter(QCompleter):
 
+    _fuzzySearchFinished = Signal(int, object)
+
     def __init__(self, parent):
         super(QPartialMatchCompleter, self).__init__(parent)
 
         self.local_completion_prefix = ""
         self.source_model = None
 
+        self.__index = TrigramIndex()
+        self.__indexDirty = True
+        self.__lastPrefix = None  # type: Optional[str]
+        self.__lastRows = None  # type: Optional[List[int]]
+        self.__proxyModel = QRowSubsetProxyModel()
+
+        self.__matchMode = QPartialMatchMode.Substring
+        self.__fuzzyLimit = 50
+        self.__fuzzyMatcher = None  # type: Optional[FuzzyMatcher]
+        self.__fuzzyGeneration = 0
+        self.__fuzzyQuery = None  # type: Optional[str]
+        self.__fuzzyLastQuery = None  # type: Optional[str]
+        self.__fuzzyLastMatches = None  # type: Optional[List[int]]
+        self.__usage = collections.Counter()  # type: collections.Counter
+        self.__fuzzySearch = None  # type: Optional[Tuple[FuzzyMatcher, str, Optional[List[int]], int]]
+        self.__fuzzySearches = PriorityRequestQueue(self.__runFuzzySearch, self._fuzzySearchFinished.emit, parent=self)
+        # one worker builds the trigram postings, a rebuild replaces the ones still waiting
+        self.__postingBuilds = PriorityRequestQueue(self.__buildPostings, parent=self)
+        # source changes within one event loop iteration rebuild the index once
+        self.__sourceTimer = QTimer(self)
+        self.__sourceTimer.setSingleShot(True)
+        self.__sourceTimer.setInterval(0)
+        self.__sourceTimer.timeout.connect(self.__onSourceSettled)
+        self.__debounceTimer = QTimer(self)
+        self.__debounceTimer.setSingleShot(True)
+        self.__debounceTimer.setInterval(100)
+        self.__debounceTimer.timeout.connect(self.__startFuzzySearch)
+        self._fuzzySearchFinished.connect(self.__onFuzzySearchFinished)
+        self.activated[str].connect(self.recordUsage)
+
+    def setMatchMode(self, mode):
+        # type: (str) -> NoReturn
+        self.__matchMode = mode
+        self.__lastPrefix = None
+        self.__lastRows = None
+        self.__fuzzyQuery = None
+        self.__fuzzyLastQuery = None
+        self.__fuzzyLastMatches = None
+        self.__fuzzyGeneration += 1
+
+    def matchMode(self):
+        # type: () -> str
+        return self.__matchMode
+
+    def setFuzzyLimit(self, limit):
+        # type: (int) -> NoReturn
+        self.__fuzzyLimit = limit
+
+    def fuzzyLimit(self):
+        # type: () -> int
+        return self.__fuzzyLimit
+
+    def setDebounceInterval(self, msec):
+        # type: (int) -> NoReturn
+        self.__debounceTimer.setInterval(msec)
+
+    def debounceInterval(self):
+        # type: () -> int
+        return self.__debounceTimer.interval()
+
+    def recordUsage(self, text):
+        # type: (str) -> NoReturn
+        self.__usage[text.lower()] += 1
+
     def setModel(self, model):
+        if self.source_model is not None:
+            for signal in self.__sourceSignals(self.source_model):
+                signal.disconnect(self.__onSourceChanged)
+
         self.source_model = model
+        self.__indexDirty = True
+        self.__proxyModel.setSourceModel(model)
+        if model is not None:
+            for signal in self.__sourceSignals(model):
+                signal.connect(self.__onSourceChanged)
+
         super(QPartialMatchCompleter, self).setModel(self.source_model)
 
     def updateModel(self):
-        local_completion_prefix = self.local_completion_prefix
+        if self.source_model is None:
+            return
+
+        if self.__indexDirty:
+            self.__rebuildIndex()
+
+        if self.__matchMode == QPartialMatchMode.Fuzzy:
+            # rapid typing only restarts the timer, the search runs once the input settles
+            if self.local_completion_prefix != self.__fuzzyQuery:
+                self.__fuzzyQuery = self.local_completion_prefix
+                self.__debounceTimer.start()
+            # the previous matches stay listed meanwhile, never the whole unfiltered source
+            if self.model() is not self.__proxyModel:
+                self.__proxyModel.setRows([])
+                super(QPartialMatchCompleter, self).setModel(self.__proxyModel)
+            return
+
+        # narrow the previous result when the query only extends it
+        prefix = self.local_completion_prefix.lower()
+        candidates = None
+        if self.__lastPrefix is not None and self.__lastPrefix in prefix:
+            candidates = self.__lastRows
+
+        rows = self.__index.search(prefix, candidates)
+        self.__lastPrefix = prefix
+        self.__lastRows = rows
+
+        self.__proxyModel.setRows(rows)
+        if self.model() is not self.__proxyModel:
+            super(QPartialMatchCompleter, self).setModel(self.__proxyModel)
+
+    def __sourceSignals(self, model):
+        return [model.modelReset, model.rowsInserted, model.rowsRemoved, model.rowsMoved, model.dataChanged, model.layoutChanged]
+
+    def __rebuildIndex(self):
+        model = self.source_model
+        column = self.completionColumn()
+        role = self.completionRole()
+
+        keys = []
+        for row in range(model.rowCount()):
+            key = model.data(model.index(row, column), role)
+            keys.append(key if isinstance(key, str) else '' if key is None else str(key))
+
+        # the trigram postings are built off the UI thread, searches scan the keys meanwhile
+        self.__index = TrigramIndex(keys, deferred=True)
+        self.__indexDirty = False
+        self.__postingBuilds.request([self.__index])
+        self.__lastPrefix = None
+        self.__lastRows = None
+
+        self.__fuzzyMatcher = FuzzyMatcher(self.__index)
+        self.__fuzzyMatcher.setUsage(self.__usage)
+        self.__fuzzyLastQuery = None
+        self.__fuzzyLastMatches = None
+
+    def __buildPostings(self, index):
+        # type: (TrigramIndex) -> NoReturn
+        # runs on a worker, indexes replaced meanwhile are not built anymore
+        if index is self.__index:
+            index.buildPostings()
+
+    def __onSourceChanged(self, *args):
+        self.__indexDirty = True
+        self.__lastPrefix = None
+        self.__lastRows = None
+        self.__fuzzyQuery = None
+        if self.model() is self.__proxyModel and not self.__sourceTimer.isActive():
+            self.__sourceTimer.start()
+
+    def __onSourceSettled(self):
+        # type: () -> NoReturn
+        if self.__indexDirty and self.model() is self.__proxyModel:
+            self.updateModel()
+
+    def __startFuzzySearch(self):
+        if self.__fuzzyQuery is None or self.__fuzzyMatcher is None:
+            return
 
-        class InnerProxyModel(QSortFilterProxyModel):
-            def filterAcceptsRow(self, sourceRow, sourceParent):
-                index0 = self.sourceModel().index(sourceRow, 0, sourceParent)
-                return local_completion_prefix.lower() in self.sourceModel().data(index0).lower()
+        self.__fuzzyGeneration += 1
+        query = self.__fuzzyQuery.lower()
 
-        proxyModel = InnerProxyModel()
-        proxyModel.setSourceModel(self.source_model)
-        super(QPartialMatchCompleter, self).setModel(proxyModel)
+        # a longer query can only match a subset of the previous matches
+        candidates = None
+        if self.__fuzzyLastQuery is not None and query.startswith(self.__fuzzyLastQuery):
+            candidates = self.__fuzzyLastMatches
+
+        self.__fuzzySearch = (self.__fuzzyMatcher, query, candidates, self.__fuzzyLimit)
+        self.__fuzzySearches.request([self.__fuzzyGeneration])
+
+    def __runFuzzySearch(self, generation):
+        # type: (int) -> Optional[Tuple[str, List[int], List[int]]]
+        # runs on a worker, None when the search was replaced by a newer one
+        matcher, query, candidates, limit = self.__fuzzySearch
+
+        def _isCancelled():
+            return generation != self.__fuzzyGeneration
+
+        matches = matcher.match(query, candidates, _isCancelled)
+        if matches is None:
+            return None
+        if len(query) == 0:
+            return query, matches, matches[:limit]
+        rows = matcher.rank(query, matches, limit, _isCancelled)
+        if rows is None:
+            return None
+        return query, matches, rows
+
+    def __onFuzzySearchFinished(self, generation, result):
+        # results of outdated queries are dropped
+        if result is None or generation != self.__fuzzyGeneration or self.__matchMode != QPartialMatchMode.Fuzzy:
+            return
+
+        query, matches, rows = result
+        self.__fuzzyLastQuery = query
+        self.__fuzzyLastMatches = matches
+
+        self.__proxyModel.setRows(rows)
+        if self.model() is not self.__proxyModel:
+            super(QPartialMatchCompleter, self).setModel(self.__proxyModel)
+
+        widget = self.widget()
+        if len(rows) > 0 and widget is not None and widget.hasFocus() and not self.popup().isVisible():
+            self.complete()
 
     def splitPath(self, path):
         self.local_completion_prefix = path
@@ -188,10 +835,39 @@ class QPartialMatchCompleter(QCompleter):
         return ""
 
 
+class _QFlowLayoutResult(object):
+
+    __slots__ = ('positions', 'states', 'height')
+
+    def __init__(self):
+        self.positions = []  # type: List[QPoint]
+        # (x, y, lineHeight) before each item, so that a relayout can resume from any item
+        self.states = []  # type: List[Tuple[int, int, int]]
+        self.height = None  # type: Optional[int]
+
+
 # https://github.com/pyside/Examples/blob/master/examples/layouts/flowlayout.py
 class QFlowLayout(QLayout):
 
+    MAX_CACHED_WIDTHS = 8
+
+    COMPACT_THRESHOLD = 64
+
     def __init__(self, parent=None, margin=0, spacing=-1):
+        # the caches must exist before QLayout.__init__ can call invalidate()
+        # items before "__head" were taken from the front and are compacted lazily
+        self.__items = []  # type: List[Optional[QLayoutItem]]
+        self.__hints = []  # type: List[Optional[QSize]]
+        self.__head = 0
+        self.__hintsDirty = False
+        self.__spacings = {}  # type: Dict[QStyle, Tuple[int, int]]
+        self.__previousSpacings = {}  # type: Dict[QStyle, Tuple[int, int]]
+        self.__results = collections.OrderedDict()  # type: collections.OrderedDict
+        self.__minimumSize = None  # type: Optional[QSize]
+        self.__appliedRect = QRect()
+        self.__appliedCount = 0
+        self.__capturedItems = None  # type: Optional[List[QLayoutItem]]
+
         super(QFlowLayout, self).__init__(parent)
 
         if parent is not None:
@@ -199,31 +875,119 @@ class QFlowLayout(QLayout):
 
         self.setSpacing(spacing)
 
-        self.itemList = []
-
     def __del__(self):
-        item = self.takeAt(0)
-        while item:
-            item = self.takeAt(0)
+        self.__clear()
+
+    @property
+    def itemList(self):
+        # type: () -> List[QLayoutItem]
+        # the live list of items as before, items taken from the front are compacted away first.
+        # Changing it directly bypasses the size hint cache, use the layout methods instead
+        if self.__head > 0:
+            del self.__items[:self.__head]
+            del self.__hints[:self.__head]
+            self.__head = 0
+        return self.__items
 
     def addItem(self, item):
-        self.itemList.append(item)
+        if self.__capturedItems is not None:
+            self.__capturedItems.append(item)
+            return
+
+        self.__items.append(item)
+        self.__hints.append(None)
+        self.__markDirty(self.count() - 1)
 
     def count(self):
-        return len(self.itemList)
+        return len(self.__items) - self.__head
 
     def itemAt(self, index):
-        if 0 <= index < len(self.itemList):
-            return self.itemList[index]
+        if 0 <= index < self.count():
+            return self.__items[self.__head + index]
 
         return None
 
     def takeAt(self, index):
-        if 0 <= index < len(self.itemList):
-            return self.itemList.pop(index)
+        if 0 <= index < self.count():
+            return self.__take(index, 1)[0]
 
         return None
 
+    def insertItems(self, index, items):
+        # type: (int, List[QLayoutItem]) -> NoReturn
+        index = max(0, min(index, self.count()))
+        position = self.__head + index
+        self.__items[position:position] = items
+        self.__hints[position:position] = [None] * len(items)
+        self.__markDirty(index)
+        self.invalidate()
+
+    def insertWidgets(self, index, widgets):
+        # type: (int, List[QWidget]) -> NoReturn
+        # the items are created by addWidget(), Qt deletes them when their widget is deleted
+        self.__capturedItems = []
+        try:
+            for widget in widgets:
+                self.addWidget(widget)
+            items = self.__capturedItems
+        finally:
+            self.__capturedItems = None
+        self.insertItems(index, items)
+
+    def removeItems(self, index, count):
+        # type: (int, int) -> List[QLayoutItem]
+        # the taken items and their widgets are owned by the caller, like takeAt()
+        index = max(0, index)
+        count = min(count, self.count() - index)
+        if count <= 0:
+            return []
+
+        items = self.__take(index, count)
+        self.invalidate()
+        return items
+
+    def clear(self):
+        # type: () -> List[QLayoutItem]
+        items = self.__clear()
+        self.invalidate()
+        return items
+
+    def __take(self, index, count):
+        # type: (int, int) -> List[QLayoutItem]
+        position = self.__head + index
+        items = self.__items[position:position + count]
+        if index == 0:
+            # taking from the front only moves the head
+            self.__items[position:position + count] = [None] * count
+            self.__hints[position:position + count] = [None] * count
+            self.__head += count
+            if self.__head >= QFlowLayout.COMPACT_THRESHOLD and self.__head * 2 >= len(self.__items):
+                del self.__items[:self.__head]
+                del self.__hints[:self.__head]
+                self.__head = 0
+        else:
+            del self.__items[position:position + count]
+            del self.__hints[position:position + count]
+        self.__markDirty(index)
+        return items
+
+    def __clear(self):
+        # type: () -> List[QLayoutItem]
+        items = self.__items[self.__head:]
+        self.__items = []
+        self.__hints = []
+        self.__head = 0
+        self.__markDirty(0)
+        return items
+
+    def invalidate(self):
+        # size hints are queried again once, the layout resumes from the first changed one
+        self.__hintsDirty = True
+        self.__previousSpacings.update(self.__spacings)
+        self.__spacings.clear()
+        self.__minimumSize = None
+        super(QFlowLayout, self).invalidate()
+
     def expandingDirections(self):
         return Qt.Orientations(Qt.Orientation(0))
 
@@ -242,37 +1006,339 @@ class QFlowLayout(QLayout):
         return self.minimumSize()
 
     def minimumSize(self):
+        if self.__minimumSize is not None:
+            return QSize(self.__minimumSize)
+
         size = QSize()
 
-        for item in self.itemList:
+        for item in self.__items[self.__head:]:
             size = size.expandedTo(item.minimumSize())
 
         size += QSize(2 * self.contentsMargins().top(), 2 * self.contentsMargins().top())
+        self.__minimumSize = QSize(size)
         return size
 
     def doLayout(self, rect, testOnly):
-        x = rect.x()
-        y = rect.y()
-        lineHeight = 0
-
-        for item in self.itemList:
-            wid = item.widget()
-            spaceX = self.spacing() + wid.style().layoutSpacing(QSizePolicy.PushButton, QSizePolicy.PushButton, Qt.Horizontal)
-            spaceY = self.spacing() + wid.style().layoutSpacing(QSizePolicy.PushButton, QSizePolicy.PushButton, Qt.Vertical)
-            nextX = x + item.sizeHint().width() + spaceX
-            if nextX - spaceX > rect.right() and lineHeight > 0:
-                x = rect.x()
+        result = self.__layout(rect.width())
+
+        if not testOnly:
+            if rect != self.__appliedRect:
+                self.__appliedRect = QRect(rect)
+                self.__appliedCount = 0
+
+            origin = rect.topLeft()
+            head = self.__head
+            for index in range(self.__appliedCount, self.count()):
+                self.__items[head + index].setGeometry(QRect(result.positions[index] + origin, self.__hints[head + index]))
+            self.__appliedCount = self.count()
+
+        return result.height
+
+    def __markDirty(self, index):
+        # type: (int) -> NoReturn
+        for result in self.__results.values():
+            del result.positions[index:]
+            del result.states[index + 1:]
+            result.height = None
+        self.__appliedCount = min(self.__appliedCount, index)
+        self.__minimumSize = None
+
+    def __updateHints(self):
+        # type: () -> NoReturn
+        self.__hintsDirty = False
+        for style, spacing in self.__previousSpacings.items():
+            if self.__styleSpacing(style) != spacing:
+                self.__markDirty(0)
+                break
+        self.__previousSpacings.clear()
+
+        hints = self.__hints
+        head = self.__head
+        for index in range(self.count()):
+            hint = self.__items[head + index].sizeHint()
+            if hint != hints[head + index]:
+                hints[head + index] = hint
+                self.__markDirty(index)
+
+    def __spacing(self, item):
+        # type: (QLayoutItem) -> Tuple[int, int]
+        widget = item.widget()
+        if widget is not None:
+            style = widget.style()
+        elif self.parentWidget() is not None:
+            style = self.parentWidget().style()
+        else:
+            style = QApplication.style()
+        return self.__styleSpacing(style)
+
+    def __styleSpacing(self, style):
+        # type: (QStyle) -> Tuple[int, int]
+        spacing = self.__spacings.get(style)
+        if spacing is None:
+            spacing = (
+                self.spacing() + style.layoutSpacing(QSizePolicy.PushButton, QSizePolicy.PushButton, Qt.Horizontal),
+                self.spacing() + style.layoutSpacing(QSizePolicy.PushButton, QSizePolicy.PushButton, Qt.Vertical),
+            )
+            self.__spacings[style] = spacing
+        return spacing
+
+    def __layout(self, width):
+        # type: (int) -> _QFlowLayoutResult
+        if self.__hintsDirty:
+            self.__updateHints()
+
+        result = self.__results.get(width)
+        if result is None:
+            result = _QFlowLayoutResult()
+            self.__results[width] = result
+            while len(self.__results) > QFlowLayout.MAX_CACHED_WIDTHS:
+                self.__results.popitem(last=False)
+        else:
+            self.__results.move_to_end(width)
+
+        count = self.count()
+        first = len(result.positions)
+        if first == count and result.height is not None:
+            return result
+
+        if first > 0:
+            x, y, lineHeight = result.states[first]
+        else:
+            x, y, lineHeight = 0, 0, 0
+        del result.states[first:]
+
+        right = width - 1
+        head = self.__head
+        hints = self.__hints
+        for index in range(first, count):
+            result.states.append((x, y, lineHeight))
+            hint = hints[head + index]
+            spaceX, spaceY = self.__spacing(self.__items[head + index])
+            nextX = x + hint.width() + spaceX
+            if nextX - spaceX > right and lineHeight > 0:
+                x = 0
                 y = y + lineHeight + spaceY
-                nextX = x + item.sizeHint().width() + spaceX
+                nextX = x + hint.width() + spaceX
                 lineHeight = 0
 
-            if not testOnly:
-                item.setGeometry(QRect(QPoint(x, y), item.sizeHint()))
-
+            result.positions.append(QPoint(x, y))
             x = nextX
-            lineHeight = max(lineHeight, item.sizeHint().height())
+            lineHeight = max(lineHeight, hint.height())
+
+        # the state after the last item resumes appends
+        result.states.append((x, y, lineHeight))
+        result.height = y + lineHeight
+        return result
+
+
+class QVirtualFlowWidget(QAbstractScrollArea):
+
+    def __init__(self, parent=None):
+        # type: (QWidget) -> NoReturn
+        super(QVirtualFlowWidget, self).__init__(parent)
+        self.__itemCount = 0
+        self.__itemSize = QSize(100, 100)
+        self.__spacing = 4
+        self.__layoutWidth = -1
+        self.__xs = []  # type: List[int]
+        self.__ys = []  # type: List[int]
+        self.__sizes = []  # type: List[QSize]
+        self.__lineStarts = []  # type: List[int]
+        self.__lineTops = []  # type: List[int]
+        self.__lineBottoms = []  # type: List[int]
+        self.__contentHeight = 0
+        self.__activeWidgets = {}  # type: Dict[int, QWidget]
+        self.__recycledWidgets = []  # type: List[QWidget]
+
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+
+    def createWidget(self):
+        # type: () -> QWidget
+        return QLabel()
+
+    def bindWidget(self, widget, index):
+        # type: (QWidget, int) -> NoReturn
+        if isinstance(widget, QLabel):
+            widget.setText(str(index))
+
+    def unbindWidget(self, widget, index):
+        # type: (QWidget, int) -> NoReturn
+        pass
+
+    def itemSize(self, index):
+        # type: (int) -> QSize
+        return self.__itemSize
+
+    def setItemSize(self, size):
+        # type: (QSize) -> NoReturn
+        self.__itemSize = QSize(size)
+        self.relayout()
+
+    def setSpacing(self, spacing):
+        # type: (int) -> NoReturn
+        self.__spacing = spacing
+        self.relayout()
+
+    def spacing(self):
+        # type: () -> int
+        return self.__spacing
+
+    def setItemCount(self, count):
+        # type: (int) -> NoReturn
+        self.__itemCount = count
+        self.relayout()
+
+    def itemCount(self):
+        # type: () -> int
+        return self.__itemCount
+
+    def itemRect(self, index):
+        # type: (int) -> QRect
+        # content coordinates, independent of the scroll position
+        return QRect(self.__xs[index], self.__ys[index], self.__sizes[index].width(), self.__sizes[index].height())
+
+    def indexAt(self, pos):
+        # type: (QPoint) -> int
+        y = pos.y() + self.verticalScrollBar().value()
+        line = bisect.bisect_right(self.__lineTops, y) - 1
+        if line < 0 or y > self.__lineBottoms[line]:
+            return -1
+        last = self.__lineStarts[line + 1] if line + 1 < len(self.__lineStarts) else self.__itemCount
+        for index in range(self.__lineStarts[line], last):
+            if self.itemRect(index).contains(pos.x(), y):
+                return index
+        return -1
+
+    def widgetAt(self, index):
+        # type: (int) -> Optional[QWidget]
+        return self.__activeWidgets.get(index)
+
+    def activeWidgets(self):
+        # type: () -> Dict[int, QWidget]
+        return dict(self.__activeWidgets)
+
+    def refresh(self, first=0, last=None):
+        # type: (int, Optional[int]) -> NoReturn
+        # binds the live widgets of the changed items again
+        if last is None:
+            last = self.__itemCount - 1
+        for index, widget in self.__activeWidgets.items():
+            if first <= index <= last:
+                self.unbindWidget(widget, index)
+                self.bindWidget(widget, index)
+
+    def relayout(self):
+        # type: () -> NoReturn
+        for index in list(self.__activeWidgets.keys()):
+            self.__release(index)
+        self.__layoutWidth = -1
+        self.__doLayout()
+        self.__updateVisibleWidgets()
+
+    def resizeEvent(self, event):
+        # type: (QResizeEvent) -> NoReturn
+        super(QVirtualFlowWidget, self).resizeEvent(event)
+        if self.viewport().width() != self.__layoutWidth:
+            self.__doLayout()
+        self.__updateScrollBar()
+        self.__updateVisibleWidgets()
+
+    def scrollContentsBy(self, dx, dy):
+        # type: (int, int) -> NoReturn
+        self.__updateVisibleWidgets()
+
+    def __doLayout(self):
+        # type: () -> NoReturn
+        # positions every logical item, but no widget is touched here
+        width = self.viewport().width()
+        spacing = self.__spacing
+        xs = self.__xs = []
+        ys = self.__ys = []
+        sizes = self.__sizes = []
+        lineStarts = self.__lineStarts = []
+        lineTops = self.__lineTops = []
+        lineBottoms = self.__lineBottoms = []
+
+        x = y = lineHeight = 0
+        for index in range(self.__itemCount):
+            size = self.itemSize(index)
+            if len(lineStarts) == 0 or (x > 0 and x + size.width() > width):
+                if len(lineStarts) > 0:
+                    lineBottoms.append(y + lineHeight - 1)
+                    y += lineHeight + spacing
+                x = 0
+                lineHeight = 0
+                lineStarts.append(index)
+                lineTops.append(y)
+            xs.append(x)
+            ys.append(y)
+            sizes.append(size)
+            x += size.width() + spacing
+            lineHeight = max(lineHeight, size.height())
+
+        if len(lineStarts) > 0:
+            lineBottoms.append(y + lineHeight - 1)
+        self.__contentHeight = y + lineHeight
+        self.__layoutWidth = width
+        self.__updateScrollBar()
+
+    def __updateScrollBar(self):
+        # type: () -> NoReturn
+        scrollBar = self.verticalScrollBar()
+        pageStep = self.viewport().height()
+        scrollBar.setPageStep(pageStep)
+        scrollBar.setSingleStep(max(self.__itemSize.height() // 4, 1))
+        scrollBar.setRange(0, max(self.__contentHeight - pageStep, 0))
+
+    def __visibleIndices(self):
+        # type: () -> range
+        top = self.verticalScrollBar().value()
+        bottom = top + self.viewport().height()
+        if len(self.__lineStarts) == 0:
+            return range(0)
+
+        # lines are sorted by their top, so only the intersecting ones are looked at
+        firstLine = max(bisect.bisect_right(self.__lineBottoms, top - 1), 0)
+        lastLine = bisect.bisect_right(self.__lineTops, bottom) - 1
+        if lastLine < firstLine:
+            return range(0)
+        first = self.__lineStarts[firstLine]
+        last = self.__lineStarts[lastLine + 1] if lastLine + 1 < len(self.__lineStarts) else self.__itemCount
+        return range(first, last)
+
+    def __updateVisibleWidgets(self):
+        # type: () -> NoReturn
+        visible = self.__visibleIndices()
+        for index in list(self.__activeWidgets.keys()):
+            if index not in visible:
+                self.__release(index)
+
+        offset = self.verticalScrollBar().value()
+        for index in visible:
+            widget = self.__activeWidgets.get(index)
+            if widget is None:
+                widget = self.__acquire(index)
+            widget.setGeometry(self.itemRect(index).translated(0, -offset))
+            widget.show()
+
+    def __acquire(self, index):
+        # type: (int) -> QWidget
+        if len(self.__recycledWidgets) > 0:
+            widget = self.__recycledWidgets.pop()
+        else:
+            widget = self.createWidget()
+            widget.setParent(self.viewport())
+        self.bindWidget(widget, index)
+        self.__activeWidgets[index] = widget
+        return widget
 
-        return y + lineHeight - rect.y()
+    def __release(self, index):
+        # type: (int) -> NoReturn
+        widget = self.__activeWidgets.pop(index)
+        widget.hide()
+        self.unbindWidget(widget, index)
+        self.__recycledWidgets.append(widget)
 
 
 TListItem = TypeVar('TListItem', bound=QAbstractListModel)
@@ -280,36 +1346,264 @@ TListItem = TypeVar('TListItem', bound=QAbstractListModel)
 
 class QListModel(QAbstractListModel, Generic[TListItem]):
 
+    MAX_LOGGED_REMOVALS = 64
+
     def __init__(self, parent):
         # type: (QObject) -> NoReturn
         super(QListModel, self).__init__(parent)
         self.__items = []  # type: List[TListItem]
+        # id(item) -> row, only the rows before "__rowsValid" are trusted
+        self.__rows = {}  # type: Dict[int, int]
+        self.__rowsValid = 0
+        # (row, count) removed since the later rows were indexed, their entries are shifted by these on lookup.
+        # None once anything else changed them, they are indexed again then
+        self.__removals = []  # type: Optional[List[Tuple[int, int]]]
+        # (offset, count) -> items of the lazy source, None once it is exhausted
+        self.__fetchPage = None  # type: Optional[Callable[[int, int], Iterable[TListItem]]]
+        self.__fetchOffset = 0
+        self.__fetchChunkSize = 256
+        # roles -> rows, an empty roles tuple means every role
+        self.__dirtyRows = {}  # type: Dict[Tuple[int, ...], Set[int]]
+        self.__dirtyTimer = QTimer(self)
+        self.__dirtyTimer.setSingleShot(True)
+        self.__dirtyTimer.setInterval(0)
+        self.__dirtyTimer.timeout.connect(self.flushDirty)
 
     def append(self, item):
         # type: (TListItem) -> NoReturn
-        self.beginInsertRows(QModelIndex(), self.rowCount(), self.rowCount() + 1)
-        self.__items.append(item)
-        self.endInsertRows()
+        self.insertItems(self.rowCount(), [item])
 
     def extend(self, items):
         # type: (List[TListItem]) -> NoReturn
-        self.beginInsertRows(QModelIndex(), self.rowCount(), self.rowCount() + len(items))
-        self.__items.extend(items)
+        self.insertItems(self.rowCount(), items)
+
+    def insertItems(self, row, items):
+        # type: (int, List[TListItem]) -> NoReturn
+        items = list(items)
+        if len(items) == 0:
+            return
+
+        self.flushDirty()
+        rowCount = self.rowCount()
+        row = max(0, min(row, rowCount))
+        self.beginInsertRows(QModelIndex(), row, row + len(items) - 1)
+        self.__items[row:row] = items
+        if row == rowCount == self.__rowsValid:
+            self.__indexRows(row, len(self.__items))
+        else:
+            self.__rowsValid = min(self.__rowsValid, row)
+            self.__removals = None
         self.endInsertRows()
 
     def remove(self, item):
         # type: (TListItem) -> NoReturn
-        index = self.__items.index(item)
-        self.beginRemoveRows(QModelIndex(), index, index + 1)
-        self.__items.remove(item)
+        # the row holding item itself, else the first row equal to it like list.remove.
+        # removeItems() removes many in one pass
+        row = self.rowOf(item)
+        if row < 0:
+            row = self.__items.index(item)
+        self.removeRange(row, 1)
+
+    def removeRange(self, row, count):
+        # type: (int, int) -> NoReturn
+        row = max(0, row)
+        count = min(count, self.rowCount() - row)
+        if count <= 0:
+            return
+
+        self.flushDirty()
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        self.__forgetRows(row, row + count)
+        del self.__items[row:row + count]
+        self.__rowsValid = min(self.__rowsValid, row)
+        if self.__removals is not None and len(self.__removals) < QListModel.MAX_LOGGED_REMOVALS:
+            self.__removals.append((row, count))
+        else:
+            self.__removals = None
         self.endRemoveRows()
 
+    def removeItems(self, items):
+        # type: (Iterable[TListItem]) -> NoReturn
+        rows = [self.rowOf(item) for item in items]
+        self._removeRowRuns([row for row in rows if row >= 0])
+
+    def removeIf(self, predicate):
+        # type: (Callable[[TListItem], bool]) -> NoReturn
+        self._removeRowRuns([row for row, item in enumerate(self.__items) if predicate(item)])
+
+    def replaceRange(self, row, count, items):
+        # type: (int, int, List[TListItem]) -> NoReturn
+        # rows replaced one by one only emit dataChanged, the length difference is inserted or removed
+        items = list(items)
+        row = max(0, min(row, self.rowCount()))
+        count = max(0, min(count, self.rowCount() - row))
+        common = min(count, len(items))
+        if common > 0:
+            self.__forgetRows(row, row + common)
+            self.__items[row:row + common] = items[:common]
+            self.__rowsValid = min(self.__rowsValid, row)
+            self.__removals = None
+            self.dataChanged.emit(self.index(row), self.index(row + common - 1))
+
+        if count > common:
+            self.removeRange(row + common, count - common)
+        elif len(items) > common:
+            self.insertItems(row + common, items[common:])
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        # type: (int, int, QModelIndex) -> bool
+        if parent.isValid() or row < 0 or count <= 0 or row + count > self.rowCount():
+            return False
+        self.removeRange(row, count)
+        return True
+
+    def moveRows(self, sourceParent, sourceRow, count, destinationParent, destinationChild):
+        # type: (QModelIndex, int, int, QModelIndex, int) -> bool
+        rowCount = self.rowCount()
+        if sourceParent.isValid() or destinationParent.isValid():
+            return False
+        if count <= 0 or sourceRow < 0 or sourceRow + count > rowCount or not 0 <= destinationChild <= rowCount:
+            return False
+        if sourceRow <= destinationChild <= sourceRow + count:
+            return False
+
+        self.flushDirty()
+        self.beginMoveRows(QModelIndex(), sourceRow, sourceRow + count - 1, QModelIndex(), destinationChild)
+        moved = self.__items[sourceRow:sourceRow + count]
+        del self.__items[sourceRow:sourceRow + count]
+        position = destinationChild - count if destinationChild > sourceRow else destinationChild
+        self.__items[position:position] = moved
+        self.__rowsValid = min(self.__rowsValid, sourceRow, destinationChild)
+        self.__removals = None
+        self.endMoveRows()
+        return True
+
+    def rowOf(self, item):
+        # type: (TListItem) -> int
+        row = self.__rows.get(id(item))
+        if row is not None:
+            if row >= self.__rowsValid and self.__removals is not None:
+                # removals since the row was indexed only moved it up
+                for first, count in self.__removals:
+                    if row >= first + count:
+                        row -= count
+            elif row >= self.__rowsValid:
+                row = None
+            if row is not None and row < len(self.__items) and self.__items[row] is item:
+                return row
+
+        if self.__rowsValid < len(self.__items):
+            self.__indexRows(self.__rowsValid, len(self.__items))
+            row = self.__rows.get(id(item))
+            if row is not None and self.__items[row] is item:
+                return row
+        return -1
+
     def reset(self, items):
         # type: (List[TListItem]) -> NoReturn
         self.beginResetModel()
         self.__items = items.copy()
+        self.__rows = {}
+        self.__rowsValid = 0
+        self.__removals = []
+        self.__dirtyRows = {}
+        self.__dirtyTimer.stop()
+        self.__fetchPage = None
         self.endResetModel()
 
+    def setSource(self, source, chunkSize=256):
+        # type: (Union[Iterable[TListItem], Callable[[int, int], Iterable[TListItem]]], int) -> NoReturn
+        # "source" is an iterable (a generator for example) or a paged callback taking (offset, count),
+        # rows are pulled "chunkSize" at a time as the view asks for more
+        self.reset([])
+        if callable(source):
+            self.__fetchPage = source
+        else:
+            iterator = iter(source)
+            self.__fetchPage = lambda offset, count: itertools.islice(iterator, count)
+        self.__fetchOffset = 0
+        self.__fetchChunkSize = chunkSize
+        self.fetchMore(QModelIndex())
+
+    def canFetchMore(self, parent=QModelIndex()):
+        # type: (QModelIndex) -> bool
+        return not parent.isValid() and self.__fetchPage is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        # type: (QModelIndex) -> NoReturn
+        if not self.canFetchMore(parent):
+            return
+
+        items = list(self.__fetchPage(self.__fetchOffset, self.__fetchChunkSize))
+        self.__fetchOffset += len(items)
+        if len(items) < self.__fetchChunkSize:
+            self.__fetchPage = None
+        self.extend(items)
+
+    def fetchAll(self):
+        # type: () -> NoReturn
+        while self.canFetchMore():
+            self.fetchMore()
+
+    def markDirty(self, rows, roles=None):
+        # type: (Union[int, Iterable[int]], Optional[Iterable[int]]) -> NoReturn
+        # the rows are merged and emitted as dataChanged ranges once per event loop iteration
+        if isinstance(rows, int):
+            rows = [rows]
+        key = tuple(sorted(set(roles))) if roles else ()
+        dirtyRows = self.__dirtyRows.get(key)
+        if dirtyRows is None:
+            dirtyRows = self.__dirtyRows[key] = set()
+        dirtyRows.update(rows)
+        if not self.__dirtyTimer.isActive():
+            self.__dirtyTimer.start()
+
+    def flushDirty(self):
+        # type: () -> NoReturn
+        self.__dirtyTimer.stop()
+        if len(self.__dirtyRows) == 0:
+            return
+
+        dirtyRows = self.__dirtyRows
+        self.__dirtyRows = {}
+        allRoles = dirtyRows.pop((), set())
+        rowCount = self.rowCount()
+
+        for roles, rows in [((), allRoles)] + list(dirtyRows.items()):
+            if roles != ():
+                rows = rows - allRoles
+            for first, last in _contiguousRuns(row for row in rows if 0 <= row < rowCount):
+                self.dataChanged.emit(self.index(first), self.index(last), list(roles))
+
+    def _removeRowRuns(self, rows):
+        # type: (List[int]) -> NoReturn
+        # removes contiguous runs from the last one, so the earlier rows keep their numbers
+        for first, last in reversed(_contiguousRuns(rows)):
+            self.removeRange(first, last - first + 1)
+
+    def __forgetRows(self, first, last):
+        # type: (int, int) -> NoReturn
+        # drops the entries of items leaving the model, trusted entries of earlier rows stay
+        rows = self.__rows
+        limit = min(first, self.__rowsValid)
+        for item in self.__items[first:last]:
+            key = id(item)
+            if rows.get(key, -1) >= limit:
+                del rows[key]
+
+    def __indexRows(self, first, last):
+        # type: (int, int) -> NoReturn
+        rows = self.__rows
+        items = self.__items
+        for row in range(first, last):
+            key = id(items[row])
+            existing = rows.get(key)
+            # keeps the first occurrence of an item added more than once
+            if existing is None or existing >= first:
+                rows[key] = row
+        self.__rowsValid = last
+        self.__removals = []
+
     def clear(self):
         # type: () -> NoReturn
         self.reset([])
@@ -332,7 +1626,460 @@ class QListModel(QAbstractListModel, Generic[TListItem]):
 
     def refresh(self):
         # type: () -> NoReturn
-        self.dataChanged.emit(self.index(0), self.index(self.rowCount()))
+        if self.rowCount() == 0:
+            return
+        self.dataChanged.emit(self.index(0), self.index(self.rowCount() - 1))
+
+
+class QSortedListModel(QListModel, Generic[TListItem]):
+
+    def __init__(self, parent, key=None):
+        # type: (QObject, Optional[Callable[[TListItem], Any]]) -> NoReturn
+        self.__key = key
+        self.__keys = []  # type: List[Any]
+        super(QSortedListModel, self).__init__(parent)
+
+    def sortKey(self, item):
+        # type: (TListItem) -> Any
+        if self.__key is None:
+            return item
+        return self.__key(item)
+
+    def setSortKey(self, key):
+        # type: (Optional[Callable[[TListItem], Any]]) -> NoReturn
+        self.__key = key
+        self.reset(self.items())
+
+    def insertItems(self, row, items):
+        # type: (int, List[TListItem]) -> NoReturn
+        # "row" is ignored, every item goes to its bisected position;
+        # items landing at the same position are inserted as one run
+        entries = sorted(((self.sortKey(item), item) for item in items), key=lambda entry: entry[0])
+        groups = []  # type: List[Tuple[int, List[Any], List[TListItem]]]
+        for key, item in entries:
+            position = bisect.bisect_right(self.__keys, key)
+            if len(groups) > 0 and groups[-1][0] == position:
+                groups[-1][1].append(key)
+                groups[-1][2].append(item)
+            else:
+                groups.append((position, [key], [item]))
+
+        for position, keys, groupItems in reversed(groups):
+            self.__keys[position:position] = keys
+            super(QSortedListModel, self).insertItems(position, groupItems)
+
+    def removeRange(self, row, count):
+        # type: (int, int) -> NoReturn
+        row = max(0, row)
+        count = min(count, self.rowCount() - row)
+        if count <= 0:
+            return
+        del self.__keys[row:row + count]
+        super(QSortedListModel, self).removeRange(row, count)
+
+    def replaceRange(self, row, count, items):
+        # type: (int, int, List[TListItem]) -> NoReturn
+        self.removeRange(row, count)
+        self.insertItems(row, items)
+
+    def moveRows(self, sourceParent, sourceRow, count, destinationParent, destinationChild):
+        # type: (QModelIndex, int, int, QModelIndex, int) -> bool
+        return False
+
+    def reset(self, items):
+        # type: (List[TListItem]) -> NoReturn
+        entries = sorted(((self.sortKey(item), item) for item in items), key=lambda entry: entry[0])
+        self.__keys = [key for key, _ in entries]
+        super(QSortedListModel, self).reset([item for _, item in entries])
+
+    def rowForKey(self, key):
+        # type: (Any) -> int
+        # the first row whose sort key is not less than "key"
+        return bisect.bisect_left(self.__keys, key)
+
+
+class QColumnarListModel(QAbstractListModel):
+
+    StringColumn = 'str'
+
+    def __init__(self, parent):
+        # type: (QObject) -> NoReturn
+        super(QColumnarListModel, self).__init__(parent)
+        self.__columnNames = []  # type: List[str]
+        self.__columnTypes = []  # type: List[str]
+        self.__columns = []  # type: List[array.array]
+        self.__roleColumns = {}  # type: Dict[int, int]
+        self.__rowCount = 0
+        # string columns hold ids into this table, every distinct string is stored once
+        self.__strings = []  # type: List[str]
+        self.__stringIds = {}  # type: Dict[str, int]
+        self.__recordType = None
+
+    def addColumn(self, name, typecode, role=None):
+        # type: (str, str, Optional[int]) -> NoReturn
+        # "typecode" is an array module typecode or QColumnarListModel.StringColumn
+        if self.__rowCount > 0:
+            raise RuntimeError('columns must be added before any row')
+        if name in self.__columnNames:
+            raise ValueError('column "{}" already exists'.format(name))
+
+        self.__columnNames.append(name)
+        self.__columnTypes.append(typecode)
+        self.__columns.append(array.array('I' if typecode == QColumnarListModel.StringColumn else typecode))
+        self.__recordType = collections.namedtuple('QColumnarRecord', self.__columnNames, rename=True)
+        if role is not None:
+            self.setRoleColumn(role, name)
+
+    def columnNames(self):
+        # type: () -> List[str]
+        return list(self.__columnNames)
+
+    def setRoleColumn(self, role, name):
+        # type: (int, str) -> NoReturn
+        self.__roleColumns[role] = self.__columnNames.index(name)
+
+    def appendRow(self, *values):
+        # type: (Any) -> NoReturn
+        self.appendRows([values])
+
+    def appendRows(self, rows):
+        # type: (Iterable[Tuple[Any, ...]]) -> NoReturn
+        rows = rows if isinstance(rows, list) else list(rows)
+        if len(rows) == 0:
+            return
+
+        # checked and converted before the insertion starts, zip would silently drop the extra values
+        width = len(self.__columns)
+        for row, values in enumerate(rows):
+            if len(values) != width:
+                raise ValueError('row {} has {} values, expected {}'.format(row, len(values), width))
+        columns = []
+        for values, typecode, column in zip(zip(*rows), self.__columnTypes, self.__columns):
+            if typecode == QColumnarListModel.StringColumn:
+                values = [self.__intern(value) for value in values]
+            columns.append(array.array(column.typecode, values))
+
+        self.beginInsertRows(QModelIndex(), self.__rowCount, self.__rowCount + len(rows) - 1)
+        for column, values in zip(self.__columns, columns):
+            column.extend(values)
+        self.__rowCount += len(rows)
+        self.endInsertRows()
+
+    def removeRange(self, row, count):
+        # type: (int, int) -> NoReturn
+        row = max(0, row)
+        count = min(count, self.__rowCount - row)
+        if count <= 0:
+            return
+
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        for column in self.__columns:
+            del column[row:row + count]
+        self.__rowCount -= count
+        self.endRemoveRows()
+
+    def reset(self, rows):
+        # type: (Iterable[Tuple[Any, ...]]) -> NoReturn
+        self.beginResetModel()
+        self.__columns = [array.array(column.typecode) for column in self.__columns]
+        self.__strings = []
+        self.__stringIds = {}
+        self.__rowCount = 0
+        self.endResetModel()
+        self.appendRows(rows)
+
+    def clear(self):
+        # type: () -> NoReturn
+        self.reset([])
+
+    def value(self, row, name):
+        # type: (int, str) -> Any
+        return self.__value(row, self.__columnNames.index(name))
+
+    def column(self, name):
+        # type: (str) -> array.array
+        # string columns return their ids, see string()
+        return self.__columns[self.__columnNames.index(name)]
+
+    def string(self, stringId):
+        # type: (int) -> str
+        return self.__strings[stringId]
+
+    def stringCount(self):
+        # type: () -> int
+        return len(self.__strings)
+
+    def createItem(self, row):
+        # type: (int) -> Any
+        return self.__recordType(*[self.__value(row, column) for column in range(len(self.__columns))])
+
+    def itemFromIndex(self, index):
+        # type: (Union[int, QModelIndex]) -> Any
+        # items are only materialised here, nothing but the columns is kept per row
+        if isinstance(index, QModelIndex):
+            index = index.row()
+        if isinstance(index, int):
+            if not 0 <= index < self.__rowCount:
+                raise IndexError('row {} is out of range'.format(index))
+            return self.createItem(index)
+        raise RuntimeError('the type of "index" must be QModelIndex or int')
+
+    def rowCount(self, parent=QModelIndex()):
+        # type: (QModelIndex) -> int
+        if parent.isValid():
+            return 0
+        return self.__rowCount
+
+    def data(self, index, role=Qt.DisplayRole):
+        # type: (QModelIndex, int) -> Any
+        if not index.isValid() or not 0 <= index.row() < self.__rowCount:
+            return None
+        column = self.__roleColumns.get(role)
+        if column is None:
+            return None
+        return self.__value(index.row(), column)
+
+    def __value(self, row, column):
+        # type: (int, int) -> Any
+        value = self.__columns[column][row]
+        if self.__columnTypes[column] == QColumnarListModel.StringColumn:
+            return self.__strings[value]
+        return value
+
+    def __intern(self, value):
+        # type: (str) -> int
+        stringId = self.__stringIds.get(value)
+        if stringId is None:
+            stringId = self.__stringIds[value] = len(self.__strings)
+            self.__strings.append(value)
+        return stringId
+
+
+class QListFilterProxyModel(QAbstractProxyModel):
+
+    def __init__(self, parent=None):
+        # type: (QObject) -> NoReturn
+        super(QListFilterProxyModel, self).__init__(parent)
+        self.__filterRole = Qt.DisplayRole
+        self.__filterText = ''
+        self.__keys = []  # type: List[str]
+        self.__accepted = []  # type: List[int]
+        self.__removing = None  # type: Optional[Tuple[int, int]]
+
+    def setSourceModel(self, model):
+        # type: (QAbstractItemModel) -> NoReturn
+        previous = self.sourceModel()
+        if previous is not None:
+            for signal, slot in self.__sourceConnections(previous):
+                signal.disconnect(slot)
+
+        self.beginResetModel()
+        super(QListFilterProxyModel, self).setSourceModel(model)
+        if model is not None:
+            for signal, slot in self.__sourceConnections(model):
+                signal.connect(slot)
+        self.__rebuild()
+        self.endResetModel()
+
+    def setFilterRole(self, role):
+        # type: (int) -> NoReturn
+        self.beginResetModel()
+        self.__filterRole = role
+        self.__rebuild()
+        self.endResetModel()
+
+    def filterRole(self):
+        # type: () -> int
+        return self.__filterRole
+
+    def filterKey(self, sourceRow):
+        # type: (int) -> str
+        # computed once per source row and kept until the row changes
+        model = self.sourceModel()
+        value = model.data(model.index(sourceRow, 0), self.__filterRole)
+        if value is None:
+            return ''
+        return str(value).casefold()
+
+    def setFilterText(self, text):
+        # type: (str) -> NoReturn
+        text = text.casefold()
+        previous = self.__filterText
+        if text == previous:
+            return
+        self.__filterText = text
+
+        keys = self.__keys
+        if previous in text:
+            # a longer query can only drop rows of the current result
+            accepted = [row for row in self.__accepted if text in keys[row]]
+        else:
+            accepted = [row for row, key in enumerate(keys) if text in key]
+        self.__setAccepted(accepted)
+
+    def filterText(self):
+        # type: () -> str
+        return self.__filterText
+
+    def rowCount(self, parent=QModelIndex()):
+        # type: (QModelIndex) -> int
+        if parent.isValid():
+            return 0
+        return len(self.__accepted)
+
+    def columnCount(self, parent=QModelIndex()):
+        # type: (QModelIndex) -> int
+        sourceModel = self.sourceModel()
+        if parent.isValid() or sourceModel is None:
+            return 0
+        return _sourceColumnCount(sourceModel)
+
+    def index(self, row, column, parent=QModelIndex()):
+        # type: (int, int, QModelIndex) -> QModelIndex
+        if parent.isValid() or not 0 <= row < len(self.__accepted):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=None):
+        # type: (Optional[QModelIndex]) -> Union[QObject, QModelIndex]
+        if index is None:
+            return super(QListFilterProxyModel, self).parent()
+        return QModelIndex()
+
+    def mapToSource(self, proxyIndex):
+        # type: (QModelIndex) -> QModelIndex
+        if not proxyIndex.isValid() or not 0 <= proxyIndex.row() < len(self.__accepted):
+            return QModelIndex()
+        return self.sourceModel().index(self.__accepted[proxyIndex.row()], proxyIndex.column())
+
+    def mapFromSource(self, sourceIndex):
+        # type: (QModelIndex) -> QModelIndex
+        if not sourceIndex.isValid():
+            return QModelIndex()
+        row = bisect.bisect_left(self.__accepted, sourceIndex.row())
+        if row == len(self.__accepted) or self.__accepted[row] != sourceIndex.row():
+            return QModelIndex()
+        return self.createIndex(row, sourceIndex.column())
+
+    def __sourceConnections(self, model):
+        return [
+            (model.rowsInserted, self.__onRowsInserted),
+            (model.rowsAboutToBeRemoved, self.__onRowsAboutToBeRemoved),
+            (model.rowsRemoved, self.__onRowsRemoved),
+            (model.dataChanged, self.__onDataChanged),
+            (model.modelAboutToBeReset, self.beginResetModel),
+            (model.modelReset, self.__onReset),
+            (model.rowsAboutToBeMoved, self.beginResetModel),
+            (model.rowsMoved, self.__onReset),
+            (model.layoutAboutToBeChanged, self.beginResetModel),
+            (model.layoutChanged, self.__onReset),
+        ]
+
+    def __rebuild(self):
+        # type: () -> NoReturn
+        model = self.sourceModel()
+        rowCount = model.rowCount() if model is not None else 0
+        self.__keys = [self.filterKey(row) for row in range(rowCount)]
+        self.__accepted = [row for row, key in enumerate(self.__keys) if self.__filterText in key]
+
+    def __setAccepted(self, accepted):
+        # type: (List[int]) -> NoReturn
+        # only the difference is emitted, as contiguous runs of removed and inserted rows
+        acceptedSet = set(accepted)
+        removed = [row for row, sourceRow in enumerate(self.__accepted) if sourceRow not in acceptedSet]
+        for first, last in reversed(_contiguousRuns(removed)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.__accepted[first:last + 1]
+            self.endRemoveRows()
+
+        current = set(self.__accepted)
+        self.__insertAccepted([row for row in accepted if row not in current])
+
+    def __insertAccepted(self, sourceRows):
+        # type: (List[int]) -> NoReturn
+        groups = []  # type: List[Tuple[int, List[int]]]
+        for sourceRow in sourceRows:
+            position = bisect.bisect_left(self.__accepted, sourceRow)
+            if len(groups) > 0 and groups[-1][0] == position:
+                groups[-1][1].append(sourceRow)
+            else:
+                groups.append((position, [sourceRow]))
+
+        for position, group in reversed(groups):
+            self.beginInsertRows(QModelIndex(), position, position + len(group) - 1)
+            self.__accepted[position:position] = group
+            self.endInsertRows()
+
+    def __onRowsInserted(self, parent, first, last):
+        # type: (QModelIndex, int, int) -> NoReturn
+        if parent.isValid():
+            return
+        count = last - first + 1
+        self.__keys[first:first] = [self.filterKey(row) for row in range(first, last + 1)]
+
+        accepted = self.__accepted
+        for position in range(bisect.bisect_left(accepted, first), len(accepted)):
+            accepted[position] += count
+
+        text = self.__filterText
+        self.__insertAccepted([row for row in range(first, last + 1) if text in self.__keys[row]])
+
+    def __onRowsAboutToBeRemoved(self, parent, first, last):
+        # type: (QModelIndex, int, int) -> NoReturn
+        if parent.isValid():
+            return
+        proxyFirst = bisect.bisect_left(self.__accepted, first)
+        proxyLast = bisect.bisect_right(self.__accepted, last) - 1
+        self.__removing = None
+        if proxyFirst <= proxyLast:
+            self.__removing = (proxyFirst, proxyLast)
+            self.beginRemoveRows(QModelIndex(), proxyFirst, proxyLast)
+
+    def __onRowsRemoved(self, parent, first, last):
+        # type: (QModelIndex, int, int) -> NoReturn
+        if parent.isValid():
+            return
+        count = last - first + 1
+        del self.__keys[first:last + 1]
+
+        removing = self.__removing
+        self.__removing = None
+        if removing is not None:
+            del self.__accepted[removing[0]:removing[1] + 1]
+
+        accepted = self.__accepted
+        for position in range(bisect.bisect_left(accepted, first), len(accepted)):
+            accepted[position] -= count
+
+        if removing is not None:
+            self.endRemoveRows()
+
+    def __onDataChanged(self, topLeft, bottomRight, roles=()):
+        # type: (QModelIndex, QModelIndex, List[int]) -> NoReturn
+        first, last = topLeft.row(), bottomRight.row()
+        if len(roles) == 0 or self.__filterRole in roles:
+            text = self.__filterText
+            for row in range(first, last + 1):
+                self.__keys[row] = self.filterKey(row)
+
+            accepted = self.__accepted
+            start = bisect.bisect_left(accepted, first)
+            end = bisect.bisect_right(accepted, last)
+            inRange = [row for row in range(first, last + 1) if text in self.__keys[row]]
+            self.__setAccepted(accepted[:start] + inRange + accepted[end:])
+
+        accepted = self.__accepted
+        start = bisect.bisect_left(accepted, first)
+        end = bisect.bisect_right(accepted, last)
+        for proxyFirst, proxyLast in _contiguousRuns(range(start, end)):
+            self.dataChanged.emit(
+                self.index(proxyFirst, topLeft.column()),
+                self.index(proxyLast, bottomRight.column()),
+                roles)
+
+    def __onReset(self, *args):
+        self.__rebuild()
+        self.endResetModel()
 
 
 class QFlowView(QListView):
@@ -351,19 +2098,295 @@ class QFlowDirection(object):
     TopToBottom = 'TopToBottom'
 
 
+class QImageFlowScrollMode(object):
+
+    ScrollArea = 'ScrollArea'
+    Native = 'Native'
+
+
 class QImageFlowItem(object):
 
-    def __init__(self):
+    def __init__(self, filePath=None):
+        # type: (Optional[Union[str, pathlib.Path]]) -> NoReturn
         self.__image = None  # type: Optional[QImage]
+        self.__imageSize = None  # type: Optional[QSize]
+        self.__thumbnail = None  # type: Optional[int]
+        self.__pyramid = None  # type: Optional[ThumbnailPyramid]
+        self.__filePath = None  # type: Optional[pathlib.Path]
+        self.setFilePath(filePath)
+
+    def setFilePath(self, filePath):
+        # type: (Optional[Union[str, pathlib.Path]]) -> NoReturn
+        if isinstance(filePath, str):
+            filePath = pathlib.Path(filePath)
+        self.__filePath = filePath
+
+    def filePath(self):
+        # type: () -> Optional[pathlib.Path]
+        return self.__filePath
 
     def setImage(self, image):
-        # type: (QImage) -> NoReturn
+        # type: (Optional[QImage]) -> NoReturn
         self.__image = image
+        if image is not None and not image.isNull():
+            self.__imageSize = image.size() / image.devicePixelRatio()
 
     def image(self):
         # type: () -> Optional[QImage]
         return self.__image
 
+    def setImageSize(self, size):
+        # type: (Optional[QSize]) -> NoReturn
+        self.__imageSize = size
+
+    def imageSize(self):
+        # type: () -> Optional[QSize]
+        # kept after the image is unloaded, so the layout does not jump
+        return self.__imageSize
+
+    def setThumbnail(self, handle):
+        # type: (Optional[int]) -> NoReturn
+        # slot handle in the ThumbnailAtlas of the widget, used instead of an own image
+        self.__thumbnail = handle
+
+    def thumbnail(self):
+        # type: () -> Optional[int]
+        return self.__thumbnail
+
+    def setPyramid(self, pyramid):
+        # type: (Optional[ThumbnailPyramid]) -> NoReturn
+        self.__pyramid = pyramid
+
+    def pyramid(self):
+        # type: () -> Optional[ThumbnailPyramid]
+        return self.__pyramid
+
+    def needsImage(self):
+        # type: () -> bool
+        return self.__image is None and self.__thumbnail is None
+
+
+class QImageFlowItemState(object):
+
+    Unloaded = 'Unloaded'
+    Loaded = 'Loaded'
+    Failed = 'Failed'
+
+
+class QImageFlowHandleItem(object):
+
+    # only a path, a key into the shared image cache and a state are kept per item,
+    # pixel data lives in the cache and is resolved when the item is painted
+    __slots__ = ('__filePath', '__cacheKey', '__state')
+
+    DEFAULT_CACHE_COST = 256 * 1024 * 1024  # bytes of decoded images
+
+    __imageCache = CostLruCache(DEFAULT_CACHE_COST)  # type: CostLruCache[int, QImage]
+    __cacheKeys = itertools.count()
+
+    def __init__(self, filePath):
+        # type: (Union[str, pathlib.Path]) -> NoReturn
+        self.__filePath = str(filePath)
+        self.__cacheKey = next(QImageFlowHandleItem.__cacheKeys)
+        self.__state = QImageFlowItemState.Unloaded
+
+    @staticmethod
+    def setImageCache(cache):
+        # type: (CostLruCache[int, QImage]) -> NoReturn
+        QImageFlowHandleItem.__imageCache = cache
+
+    @staticmethod
+    def imageCache():
+        # type: () -> CostLruCache[int, QImage]
+        return QImageFlowHandleItem.__imageCache
+
+    def filePath(self):
+        # type: () -> pathlib.Path
+        return pathlib.Path(self.__filePath)
+
+    def cacheKey(self):
+        # type: () -> int
+        return self.__cacheKey
+
+    def state(self):
+        # type: () -> str
+        if self.__state == QImageFlowItemState.Loaded and self.__cacheKey not in QImageFlowHandleItem.__imageCache:
+            self.__state = QImageFlowItemState.Unloaded
+        return self.__state
+
+    def setImage(self, image):
+        # type: (Optional[QImage]) -> NoReturn
+        cache = QImageFlowHandleItem.__imageCache
+        if image is None:
+            cache.remove(self.__cacheKey)
+            self.__state = QImageFlowItemState.Unloaded
+        elif image.isNull():
+            cache.remove(self.__cacheKey)
+            self.__state = QImageFlowItemState.Failed
+        else:
+            cache.set(self.__cacheKey, image, image.sizeInBytes())
+            self.__state = QImageFlowItemState.Loaded
+
+    def image(self):
+        # type: () -> Optional[QImage]
+        return QImageFlowHandleItem.__imageCache.get(self.__cacheKey)
+
+    def imageSize(self):
+        # type: () -> Optional[QSize]
+        return None
+
+    def thumbnail(self):
+        # type: () -> Optional[int]
+        return None
+
+    def setPyramid(self, pyramid):
+        # type: (Optional[ThumbnailPyramid]) -> NoReturn
+        pass
+
+    def pyramid(self):
+        # type: () -> Optional[ThumbnailPyramid]
+        return None
+
+    def needsImage(self):
+        # type: () -> bool
+        return self.state() == QImageFlowItemState.Unloaded
+
+
+class QImageFlowDelegate(QStyledItemDelegate):
+
+    DEFAULT_CACHE_COST = 128 * 1024 * 1024  # bytes of scaled pixmaps
+
+    def __init__(self, parent, cacheCost=DEFAULT_CACHE_COST):
+        # type: (QObject, int) -> NoReturn
+        super(QImageFlowDelegate, self).__init__(parent)
+        self.__pixmaps = CostLruCache(cacheCost)  # type: CostLruCache[Tuple[int, int, int, float], QPixmap]
+        self.__placeholderColor = None  # type: Optional[QColor]
+        self.__thumbnailAtlas = None  # type: Optional[ThumbnailAtlas]
+
+    def setCacheCost(self, cost):
+        # type: (int) -> NoReturn
+        self.__pixmaps.setMaxCost(cost)
+
+    def cacheCost(self):
+        # type: () -> int
+        return self.__pixmaps.maxCost()
+
+    def cachedPixmapCount(self):
+        # type: () -> int
+        return len(self.__pixmaps)
+
+    def clearCache(self):
+        # type: () -> NoReturn
+        self.__pixmaps.clear()
+
+    def setPlaceholderColor(self, color):
+        # type: (Optional[QColor]) -> NoReturn
+        self.__placeholderColor = color
+
+    def placeholderColor(self):
+        # type: () -> Optional[QColor]
+        return self.__placeholderColor
+
+    def setThumbnailAtlas(self, atlas):
+        # type: (Optional[ThumbnailAtlas]) -> NoReturn
+        self.__thumbnailAtlas = atlas
+
+    def thumbnailAtlas(self):
+        # type: () -> Optional[ThumbnailAtlas]
+        return self.__thumbnailAtlas
+
+    def sizeHint(self, option, index):
+        # type: (QStyleOptionViewItem, QModelIndex) -> QSize
+        size = index.data(Qt.SizeHintRole)
+        if isinstance(size, QSize):
+            return size
+        image = index.data(Qt.DecorationRole)
+        if isinstance(image, QImage) and not image.isNull():
+            return image.size() / image.devicePixelRatio()
+        handle = index.data(QImageFlowModel.ThumbnailRole)
+        if handle is not None and self.__thumbnailAtlas is not None:
+            return self.__thumbnailAtlas.location(handle)[1].size()
+        return QSize(option.decorationSize)
+
+    def pixmap(self, image, size, devicePixelRatio):
+        # type: (QImage, QSize, float) -> QPixmap
+        # scaled once per image, size and pixel ratio, so repaints are a plain blit
+        key = (image.cacheKey(), size.width(), size.height(), devicePixelRatio)
+        pixmap = self.__pixmaps.get(key)
+        if pixmap is not None:
+            return pixmap
+
+        scaled = image
+        deviceSize = size * devicePixelRatio
+        if scaled.size() != deviceSize:
+            scaled = image.scaled(deviceSize, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        pixmap = QPixmap.fromImage(scaled)
+        pixmap.setDevicePixelRatio(devicePixelRatio)
+        self.__pixmaps.set(key, pixmap, pixmap.width() * pixmap.height() * max(pixmap.depth() // 8, 1))
+        return pixmap
+
+    def paint(self, painter, option, index):
+        # type: (QPainter, QStyleOptionViewItem, QModelIndex) -> NoReturn
+        widget = option.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, widget)
+
+        image = index.data(Qt.DecorationRole)
+        if isinstance(image, QImage) and not image.isNull():
+            size = index.data(Qt.SizeHintRole)
+            if not isinstance(size, QSize):
+                size = image.size() / image.devicePixelRatio()
+            rect = self.__targetRect(option, size)
+            if not rect.isEmpty():
+                painter.drawPixmap(rect.topLeft(), self.pixmap(image, rect.size(), painter.device().devicePixelRatioF()))
+        else:
+            handle = index.data(QImageFlowModel.ThumbnailRole)
+            if handle is not None and self.__thumbnailAtlas is not None:
+                pageIndex, source = self.__thumbnailAtlas.location(handle)
+                rect = self.__targetRect(option, source.size())
+                if not rect.isEmpty():
+                    # the page is drawn as it is, no pixmap copy to convert again after every write
+                    painter.save()
+                    painter.setRenderHint(QPainter.SmoothPixmapTransform, rect.size() != source.size())
+                    painter.drawImage(rect, self.__thumbnailAtlas.page(pageIndex), source)
+                    painter.restore()
+            else:
+                self.paintPlaceholder(painter, option, index)
+
+        text = index.data(Qt.DisplayRole)
+        if text is not None:
+            self.paintText(painter, option, str(text))
+
+    def paintPlaceholder(self, painter, option, index):
+        # type: (QPainter, QStyleOptionViewItem, QModelIndex) -> NoReturn
+        size = option.decorationSize.boundedTo(option.rect.size())
+        rect = QRect(QPoint(0, 0), size)
+        rect.moveCenter(option.rect.center())
+        color = self.__placeholderColor
+        if color is None:
+            color = option.palette.midlight().color()
+        painter.fillRect(rect, color)
+
+    def paintText(self, painter, option, text):
+        # type: (QPainter, QStyleOptionViewItem, str) -> NoReturn
+        # drawn over the bottom of the image, elided to the item width
+        selected = int(option.state) & int(QStyle.State_Selected)
+        role = QPalette.HighlightedText if selected else QPalette.Text
+        painter.save()
+        painter.setFont(option.font)
+        painter.setPen(option.palette.color(role))
+        text = option.fontMetrics.elidedText(text, option.textElideMode, option.rect.width())
+        painter.drawText(option.rect, int(Qt.AlignHCenter) | int(Qt.AlignBottom), text)
+        painter.restore()
+
+    def __targetRect(self, option, size):
+        # type: (QStyleOptionViewItem, QSize) -> QRect
+        if size.width() > option.rect.width() or size.height() > option.rect.height():
+            size = size.scaled(option.rect.size(), Qt.KeepAspectRatio)
+        rect = QRect(QPoint(0, 0), size)
+        rect.moveCenter(option.rect.center())
+        return rect
+
 
 class QImageFlowView(QFlowView):
 
@@ -371,6 +2394,7 @@ class QImageFlowView(QFlowView):
         # type: (QObject) -> NoReturn
         super(QImageFlowView, self).__init__(parent)
         self.setViewMode(QListView.IconMode)
+        self.setItemDelegate(QImageFlowDelegate(self))
 
 
 TImageFlowItem = TypeVar('TImageFlowItem', bound=QImageFlowItem)
@@ -378,14 +2402,21 @@ TImageFlowItem = TypeVar('TImageFlowItem', bound=QImageFlowItem)
 
 class QImageFlowModel(QListModel, Generic[TImageFlowItem]):
 
+    ThumbnailRole = Qt.UserRole + 0x100
+
     def data(self, index, role=Qt.DisplayRole):
         # type: (QModelIndex, int) -> Any
-        if role != Qt.DecorationRole:
+        if role not in (Qt.DecorationRole, Qt.SizeHintRole, QImageFlowModel.ThumbnailRole):
             return None
         if not index.isValid() or not 0 <= index.row() < self.rowCount():
             return None
 
-        return self.itemFromIndex(index).image()
+        item = self.itemFromIndex(index)
+        if role == Qt.SizeHintRole:
+            return item.imageSize()
+        if role == QImageFlowModel.ThumbnailRole:
+            return item.thumbnail()
+        return item.image()
 
 
 class _ViewModelWidgetBase(QWidget):
@@ -428,6 +2459,8 @@ TImageFlowModel = TypeVar('TImageFlowModel', bound=QImageFlowModel)
 
 class QImageFlowWidget(_ViewModelWidgetBase, Generic[TImageFlowView, TImageFlowModel]):
 
+    _imageLoaded = Signal(object, object)
+
     def __init__(self, parent):
         # type: (QObject) -> NoReturn
         super(QImageFlowWidget, self).__init__(parent, QImageFlowView, QImageFlowModel)
@@ -440,26 +2473,146 @@ class QImageFlowWidget(_ViewModelWidgetBase, Generic[TImageFlowView, TImageFlowM
         mainLayout.addWidget(self.__scrollArea)
         self.setLayout(mainLayout)
 
+        self.__scrollMode = QImageFlowScrollMode.ScrollArea
         self.__flowDirection = self.setFlowDirection(QFlowDirection.LeftToRight)
 
+        self.__prefetch = 40
+        self.__retain = 200
+        self.__loadedItems = set()  # type: Set[TImageFlowItem]
+        self.__thumbnailAtlas = None  # type: Optional[ThumbnailAtlas]
+        self.__pyramidLevels = 0
+        self.__pyramidSize = (0, 0)
+        self.__upgradeItems = set()  # type: Set[TImageFlowItem]
+        self.__evictedItems = set()  # type: Set[TImageFlowItem]
+        self.__imageRequests = PriorityRequestQueue(self.__decodeImage, self._imageLoaded.emit, parent=self)
+        self._imageLoaded.connect(self.__onImageLoaded)
+        self.__loadTimer = QTimer(self)
+        self.__loadTimer.setSingleShot(True)
+        self.__loadTimer.setInterval(0)
+        self.__loadTimer.timeout.connect(self.__updateLoadedImages)
+        for scrollArea in (self.__scrollArea, self._view):
+            scrollArea.verticalScrollBar().valueChanged.connect(self.__loadTimer.start)
+            scrollArea.horizontalScrollBar().valueChanged.connect(self.__loadTimer.start)
+        self._view.iconSizeChanged.connect(self.__onIconSizeChanged)
+        self.__connectModel(self.model())
+
+    def showEvent(self, event):
+        # type: (QShowEvent) -> NoReturn
+        super(QImageFlowWidget, self).showEvent(event)
+        self.__loadTimer.start()
+
+    def resizeEvent(self, event):
+        # type: (QResizeEvent) -> NoReturn
+        super(QImageFlowWidget, self).resizeEvent(event)
+        self.__loadTimer.start()
+
+    def setLoadMargins(self, prefetch, retain):
+        # type: (int, int) -> NoReturn
+        # rows beyond the viewport that are decoded ahead, and that keep their image once decoded
+        self.__prefetch = prefetch
+        self.__retain = max(retain, prefetch)
+        self.__loadTimer.start()
+
+    def loadMargins(self):
+        # type: () -> Tuple[int, int]
+        return self.__prefetch, self.__retain
+
+    def setThumbnailAtlas(self, atlas):
+        # type: (Optional[ThumbnailAtlas]) -> NoReturn
+        # images decoded by appendFiles are packed into the atlas pages instead of kept per item
+        for item in list(self.__loadedItems):
+            self.__unloadItem(item)
+        self.__thumbnailAtlas = atlas
+        delegate = self.view().itemDelegate()
+        if isinstance(delegate, QImageFlowDelegate):
+            delegate.setThumbnailAtlas(atlas)
+        self.__loadTimer.start()
+
+    def thumbnailAtlas(self):
+        # type: () -> Optional[ThumbnailAtlas]
+        return self.__thumbnailAtlas
+
+    def setPyramidLevels(self, levels):
+        # type: (int) -> NoReturn
+        # with levels > 0, appendFiles keeps a ThumbnailPyramid per item up to the icon size,
+        # so shrinking the icon size needs no decoding and growing it only refetches the visible items
+        self.__pyramidLevels = levels
+        size = self.view().iconSize()
+        self.__pyramidSize = (size.width(), size.height())
+
+    def pyramidLevels(self):
+        # type: () -> int
+        return self.__pyramidLevels
+
     def setFlowDirection(self, direction):
         # type: (str) -> str
+        scrollArea = self.__scrollArea
+        if self.__scrollMode == QImageFlowScrollMode.Native:
+            scrollArea = self.view()
+
         if direction == QFlowDirection.LeftToRight:
             self.view().setFlow(QListView.LeftToRight)
-            self.__scrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-            self.__scrollArea.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+            scrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+            scrollArea.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+            self.__flowDirection = direction
             return direction
 
         if direction == QFlowDirection.TopToBottom:
             self.view().setFlow(QListView.TopToBottom)
-            self.__scrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-            self.__scrollArea.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+            scrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+            scrollArea.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+            self.__flowDirection = direction
             return direction
 
     def flowDirection(self):
         # type: () -> str
         return self.__flowDirection
 
+    def setScrollMode(self, mode):
+        # type: (str) -> NoReturn
+        # Native lets the list view scroll itself, so only the rows in its viewport are laid out and painted
+        if mode == self.__scrollMode:
+            return
+
+        view = self.view()
+        layout = self.layout()
+        if mode == QImageFlowScrollMode.Native:
+            self.__scrollArea.takeWidget()
+            layout.removeWidget(self.__scrollArea)
+            self.__scrollArea.hide()
+            layout.addWidget(view)
+            view.show()
+            view.setUniformItemSizes(True)
+            view.setLayoutMode(QListView.Batched)
+        elif mode == QImageFlowScrollMode.ScrollArea:
+            layout.removeWidget(view)
+            self.__scrollArea.setWidget(view)
+            layout.addWidget(self.__scrollArea)
+            self.__scrollArea.show()
+            view.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+            view.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+            view.setUniformItemSizes(False)
+            view.setLayoutMode(QListView.SinglePass)
+        else:
+            return
+
+        self.__scrollMode = mode
+        self.setFlowDirection(self.__flowDirection)
+        self.__loadTimer.start()
+
+    def scrollMode(self):
+        # type: () -> str
+        return self.__scrollMode
+
+    def setBatchSize(self, size):
+        # type: (int) -> NoReturn
+        # rows laid out per pass when the view uses batched layout
+        self.view().setBatchSize(size)
+
+    def batchSize(self):
+        # type: () -> int
+        return self.view().batchSize()
+
     def setProxyModel(self, proxy):
         # type: (QAbstractProxyModel) -> NoReturn
         model = self.model()
@@ -469,6 +2622,7 @@ class QImageFlowWidget(_ViewModelWidgetBase, Generic[TImageFlowView, TImageFlowM
         else:
             proxy.setSourceModel(model)
         self.view().setModel(proxy)
+        self.__connectModel(proxy)
 
     def appendItem(self, item):
         # type: (TImageFlowItem) -> TImageFlowItem
@@ -489,6 +2643,143 @@ class QImageFlowWidget(_ViewModelWidgetBase, Generic[TImageFlowView, TImageFlowM
         image = QImage(filePath)
         return self.appendImage(image)
 
+    def createItem(self, filePath):
+        # type: (pathlib.Path) -> TImageFlowItem
+        return QImageFlowItem(filePath)
+
+    def loadImage(self, filePath):
+        # type: (pathlib.Path) -> QImage
+        # called on a worker thread for the files of appendFiles
+        return QImage(filePath.as_posix())
+
+    def appendFiles(self, filePaths):
+        # type: (Iterable[Union[str, pathlib.Path]]) -> List[TImageFlowItem]
+        # placeholders are inserted at once, images are decoded in the background as they become visible
+        items = [self.createItem(pathlib.Path(filePath)) for filePath in filePaths]
+        self._sourceModel().extend(items)
+        return items
+
+    def __connectModel(self, model):
+        # type: (QAbstractItemModel) -> NoReturn
+        model.modelReset.connect(self.__loadTimer.start)
+        model.rowsInserted.connect(self.__loadTimer.start)
+        model.rowsRemoved.connect(self.__loadTimer.start)
+        model.layoutChanged.connect(self.__loadTimer.start)
+
+    def __sourceItems(self, rows):
+        # type: (Iterable[int]) -> List[TImageFlowItem]
+        model = self.model()
+        sourceModel = self._sourceModel()
+        items = []
+        for row in rows:
+            index = model.index(row, 0)
+            if isinstance(model, QAbstractProxyModel):
+                index = model.mapToSource(index)
+            items.append(sourceModel.itemFromIndex(index))
+        return items
+
+    def __updateLoadedImages(self):
+        # type: () -> NoReturn
+        viewport = self._view.viewport().visibleRegion().boundingRect()
+        sourceModel = self._sourceModel()
+
+        retained = set(self.__sourceItems(_viewportRows(self._view, self.__retain, viewport)))
+        self.__evictedItems &= retained
+        for item in list(self.__loadedItems):
+            if item in retained:
+                continue
+            self.__unloadItem(item)
+            row = sourceModel.rowOf(item)
+            if row >= 0:
+                sourceModel.markDirty(row, [Qt.DecorationRole])
+
+        requests = []
+        for item in self.__sourceItems(_viewportRows(self._view, self.__prefetch, viewport)):
+            if item.filePath() is None or item in self.__evictedItems:
+                continue
+            if item in self.__upgradeItems or item.needsImage():
+                requests.append(item)
+        self.__imageRequests.request(requests)
+
+    def __unloadItem(self, item):
+        # type: (TImageFlowItem) -> NoReturn
+        self.__loadedItems.discard(item)
+        self.__upgradeItems.discard(item)
+        self.__evictedItems.discard(item)
+        if item.thumbnail() is not None:
+            self.__thumbnailAtlas.release(item.thumbnail())
+            item.setThumbnail(None)
+        item.setPyramid(None)
+        item.setImage(None)
+
+    def __decodeImage(self, item):
+        # type: (TImageFlowItem) -> Union[QImage, ThumbnailPyramid]
+        image = self.loadImage(item.filePath())
+        if isinstance(item, QImageFlowHandleItem):
+            # handle items keep plain images in their shared cache
+            return image
+        atlas = self.__thumbnailAtlas
+        if atlas is not None:
+            return atlas.fitted(image)
+        if self.__pyramidLevels > 0 and not image.isNull():
+            return ThumbnailPyramid.build(image, QSize(*self.__pyramidSize), self.__pyramidLevels)
+        return image
+
+    def __onImageLoaded(self, item, image):
+        # type: (TImageFlowItem, Union[QImage, ThumbnailPyramid]) -> NoReturn
+        sourceModel = self._sourceModel()
+        row = sourceModel.rowOf(item)
+        if row < 0 or not (item.needsImage() or item in self.__upgradeItems):
+            return
+        self.__upgradeItems.discard(item)
+
+        atlas = self.__thumbnailAtlas
+        if isinstance(image, ThumbnailPyramid):
+            item.setPyramid(image)
+            self.__applyPyramid(item)
+        elif atlas is not None and not image.isNull() and not isinstance(item, QImageFlowHandleItem):
+            item.setThumbnail(atlas.allocate(image))
+            item.setImageSize(image.size())
+        else:
+            item.setImage(image)
+        self.__loadedItems.add(item)
+        sourceModel.markDirty(row, [Qt.DecorationRole, Qt.SizeHintRole])
+
+        # items pushed out of a shared cache smaller than the range are not requested again until they
+        # leave it, otherwise the visible items keep evicting each other
+        for loadedItem in [loadedItem for loadedItem in self.__loadedItems if loadedItem.needsImage()]:
+            self.__loadedItems.discard(loadedItem)
+            self.__evictedItems.add(loadedItem)
+            evictedRow = sourceModel.rowOf(loadedItem)
+            if evictedRow >= 0:
+                sourceModel.markDirty(evictedRow, [Qt.DecorationRole])
+        self.__loadTimer.start()
+
+    def __applyPyramid(self, item):
+        # type: (TImageFlowItem) -> bool
+        pyramid = item.pyramid()
+        iconSize = QSize(*self.__pyramidSize)
+        item.setImage(pyramid.nearest(iconSize))
+        item.setImageSize(pyramid.displaySize(iconSize))
+        return pyramid.covers(iconSize)
+
+    def __onIconSizeChanged(self, size):
+        # type: (QSize) -> NoReturn
+        if self.__pyramidLevels == 0:
+            return
+
+        self.__pyramidSize = (size.width(), size.height())
+        sourceModel = self._sourceModel()
+        for item in self.__loadedItems:
+            if item.pyramid() is None:
+                continue
+            if not self.__applyPyramid(item):
+                self.__upgradeItems.add(item)
+            row = sourceModel.rowOf(item)
+            if row >= 0:
+                sourceModel.markDirty(row, [Qt.DecorationRole, Qt.SizeHintRole])
+        self.__loadTimer.start()
+
 
 class QDirectoryTreeItem(QStandardItem):
 
@@ -500,8 +2791,8 @@ class QDirectoryTreeItem(QStandardItem):
         else:
             self.__path = path
 
-        if self.hasChild():
-            self.appendRow(None)
+        # optimistic expand arrow, the model removes it when the directory turns out to have no subdirectories
+        self.appendRow(None)
 
         self.setEditable(False)
 
@@ -518,10 +2809,48 @@ class QDirectoryTreeItem(QStandardItem):
 
     def hasChild(self):
         # type: () -> bool
-        for child in self.path().glob('*'):
-            if child.is_dir():
-                return True
-        return False
+        return hasSubdirectory(self.path())
+
+    def hasPlaceholder(self):
+        # type: () -> bool
+        return self.rowCount() == 1 and self.child(0) is None
+
+
+def _directorySortKey(item):
+    # type: (QDirectoryTreeItem) -> str
+    return item.name().casefold()
+
+
+def _pathSortKey(path):
+    # type: (pathlib.Path) -> str
+    return path.name.casefold()
+
+
+class _QDirectoryListing(object):
+
+    def __init__(self, index, mtime, refresh=False):
+        # type: (QPersistentModelIndex, Optional[int], bool) -> NoReturn
+        self.index = index
+        self.mtime = mtime
+        self.refresh = refresh  # a watched node listed again, applied as a diff when finished
+        self.keys = []  # type: List[str]
+        self.names = []  # type: List[str]
+
+
+class _QDirectoryTreeLoadingItem(QStandardItem):
+
+    def __init__(self):
+        # type: () -> NoReturn
+        super(_QDirectoryTreeLoadingItem, self).__init__()
+        self.setFlags(Qt.NoItemFlags)
+
+    def path(self):
+        # type: () -> Optional[pathlib.Path]
+        return None
+
+    def name(self):
+        # type: () -> str
+        return QCoreApplication.translate('QDirectoryTreeModel', 'Loading...')
 
 
 TDirectoryTreeItem = TypeVar('TDirectoryTreeItem', bound=QDirectoryTreeItem)
@@ -537,6 +2866,7 @@ class QDirectoryTreeView(QTreeView):
         # type: (QObject) -> NoReturn
         super(QDirectoryTreeView, self).__init__(parent)
         self.expanded.connect(self.__onItemExpanded)
+        self.collapsed.connect(self.__onItemCollapsed)
         self.clicked.connect(self.itemClicked.emit)
 
     def selectionChanged(self, selected, deselected):
@@ -553,14 +2883,45 @@ class QDirectoryTreeView(QTreeView):
         model = self.model()
         if model is None:
             return
+        if isinstance(model, QAbstractProxyModel):
+            index = model.mapToSource(index)
+            model = model.sourceModel()
         model.expand(index)
 
+    def __onItemCollapsed(self, index):
+        # type: (QModelIndex) -> NoReturn
+        model = self.model()
+        if model is None:
+            return
+        if isinstance(model, QAbstractProxyModel):
+            index = model.mapToSource(index)
+            model = model.sourceModel()
+        model.collapse(index)
+
 
 class QDirectoryTreeModel(QStandardItemModel, Generic[TDirectoryTreeItem]):
 
+    directoryListed = Signal(object, object)
+    _childDetected = Signal(object, bool)
+
     def __init__(self, parent):
         # type: (QObject) -> NoReturn
         super(QDirectoryTreeModel, self).__init__(parent)
+        self.__detecting = {}  # type: Dict[pathlib.Path, List[QPersistentModelIndex]]
+        self.__childDetection = PriorityRequestQueue(hasSubdirectory, self._childDetected.emit, workers=4, parent=self)
+        self._childDetected.connect(self.__onChildDetected)
+
+        self.__listings = {}  # type: Dict[int, _QDirectoryListing]
+        self.__listingChunkSize = 256
+        self.__lister = DirectoryLister(self)
+        self.__lister.chunkListed.connect(self.__onChunkListed)
+        self.__lister.finished.connect(self.__onListingFinished)
+
+        # subdirectory names per path, and watchers on the expanded nodes to keep them current
+        self.__listingCache = DirectoryListingCache()
+        self.__watched = {}  # type: Dict[str, List[QPersistentModelIndex]]
+        self.__watcher = QFileSystemWatcher(self)
+        self.__watcher.directoryChanged.connect(self.__onDirectoryChanged)
 
     def setRootDirectoryPaths(self, paths):
         # type: (List[Union[str, pathlib.Path]]) -> NoReturn
@@ -570,9 +2931,16 @@ class QDirectoryTreeModel(QStandardItemModel, Generic[TDirectoryTreeItem]):
                 path = pathlib.Path(path)
             rootPaths.append(path)
 
+        self.__childDetection.cancel()
+        self.__detecting = {}
+        self.__lister.cancelAll()
+        self.__listings = {}
+        if len(self.__watched) > 0:
+            self.__watcher.removePaths(list(self.__watched.keys()))
+        self.__watched = {}
         item = self.invisibleRootItem()
         item.removeRows(0, item.rowCount())
-        item.appendRows([self.createItem(rootPath) for rootPath in rootPaths])
+        self.__appendItems(item, rootPaths)
 
     def headerData(self, section, orientation, role):
         # type: (int, Qt.Orientation, int) -> Any
@@ -592,11 +2960,207 @@ class QDirectoryTreeModel(QStandardItemModel, Generic[TDirectoryTreeItem]):
         # type: (pathlib.Path) -> TDirectoryTreeItem
         return QDirectoryTreeItem(path)
 
+    def setListingChunkSize(self, size):
+        # type: (int) -> NoReturn
+        self.__listingChunkSize = size
+
+    def listingChunkSize(self):
+        # type: () -> int
+        return self.__listingChunkSize
+
+    def setListingCache(self, cache):
+        # type: (DirectoryListingCache) -> NoReturn
+        self.__listingCache = cache
+
+    def listingCache(self):
+        # type: () -> DirectoryListingCache
+        return self.__listingCache
+
+    def isLoading(self, index):
+        # type: (QModelIndex) -> bool
+        listing = self.__listingOf(index)
+        return listing is not None and not self.__listings[listing].refresh
+
     def expand(self, index):
         # type: (QModelIndex) -> NoReturn
+        # children are listed on a worker and streamed in sorted, behind a loading row
+        if self.isLoading(index):
+            return
+
         item = self.itemFromIndex(index)
+        names = self.__listingCache.get(item.path())
+        if names is not None and not item.hasPlaceholder():
+            # the listing may have been refreshed since the rows were built, by a prefetch or a shared cache
+            self.__applyListing(item, names)
+            self.__watch(index)
+            return
+
+        requestId = self.__listingOf(index)
+        if requestId is not None:
+            self.__lister.cancel(requestId)
+            del self.__listings[requestId]
+
         item.removeRows(0, item.rowCount())
-        item.appendRows([self.createItem(path) for path in item.path().glob('*') if path.is_dir()])
+        if names is not None:
+            self.__appendItems(item, sorted((item.path() / name for name in names), key=_pathSortKey))
+            self.__watch(index)
+            return
+
+        item.appendRow(_QDirectoryTreeLoadingItem())
+        self.__list(index, refresh=False)
+
+    def collapse(self, index):
+        # type: (QModelIndex) -> NoReturn
+        self.__unwatch(index)
+        requestId = self.__listingOf(index)
+        if requestId is None:
+            return
+
+        # an unfinished listing is dropped, the next expand starts over
+        self.__lister.cancel(requestId)
+        listing = self.__listings.pop(requestId)
+        if listing.refresh:
+            return
+        item = self.itemFromIndex(index)
+        item.removeRows(0, item.rowCount())
+        item.appendRow(None)
+
+    def __list(self, index, refresh):
+        # type: (QModelIndex, bool) -> NoReturn
+        path = self.itemFromIndex(index).path()
+        listing = _QDirectoryListing(QPersistentModelIndex(index), DirectoryListingCache.modificationTime(path), refresh)
+        requestId = self.__lister.list(path, isDirectoryEntry, self.__listingChunkSize)
+        self.__listings[requestId] = listing
+
+    def __listingOf(self, index):
+        # type: (QModelIndex) -> Optional[int]
+        for requestId, listing in self.__listings.items():
+            if listing.index == index:
+                return requestId
+        return None
+
+    def __onChunkListed(self, requestId, entries):
+        # type: (int, List[os.DirEntry]) -> NoReturn
+        listing = self.__listings.get(requestId)
+        if listing is None:
+            return
+        if not listing.index.isValid():
+            self.__lister.cancel(requestId)
+            del self.__listings[requestId]
+            return
+
+        listing.names.extend(entry.name for entry in entries)
+        if listing.refresh:
+            return
+
+        parentItem = self.itemFromIndex(QModelIndex(listing.index))
+        items = sorted((self.createItem(pathlib.Path(entry.path)) for entry in entries), key=_directorySortKey)
+
+        keys = listing.keys
+        groups = []  # type: List[Tuple[int, List[TDirectoryTreeItem]]]
+        for item in items:
+            row = bisect.bisect_right(keys, _directorySortKey(item))
+            if len(groups) > 0 and groups[-1][0] == row:
+                groups[-1][1].append(item)
+            else:
+                groups.append((row, [item]))
+
+        for row, group in reversed(groups):
+            keys[row:row] = [_directorySortKey(item) for item in group]
+            self.__insertItems(parentItem, row, group)
+
+    def __onListingFinished(self, requestId):
+        # type: (int) -> NoReturn
+        listing = self.__listings.pop(requestId, None)
+        if listing is None or not listing.index.isValid():
+            return
+
+        index = QModelIndex(listing.index)
+        parentItem = self.itemFromIndex(index)
+        self.__listingCache.set(parentItem.path(), listing.names, listing.mtime)
+        self.directoryListed.emit(parentItem.path(), list(listing.names))
+        if listing.refresh:
+            self.__applyListing(parentItem, listing.names)
+        else:
+            parentItem.removeRows(parentItem.rowCount() - 1, 1)
+            self.__watch(index)
+
+    def __applyListing(self, parentItem, names):
+        # type: (QStandardItem, List[str]) -> NoReturn
+        # only the differences become row removals and insertions, renames are one of each
+        listed = set(names)
+        children = [parentItem.child(row) for row in range(parentItem.rowCount())]
+        for row in reversed(range(len(children))):
+            if children[row].name() not in listed:
+                parentItem.removeRow(row)
+                del children[row]
+
+        existing = set(child.name() for child in children)
+        keys = [_directorySortKey(child) for child in children]
+        for path in sorted((parentItem.path() / name for name in listed - existing), key=_pathSortKey):
+            row = bisect.bisect_right(keys, _pathSortKey(path))
+            keys.insert(row, _pathSortKey(path))
+            self.__insertItems(parentItem, row, [self.createItem(path)])
+
+    def __watch(self, index):
+        # type: (QModelIndex) -> NoReturn
+        path = str(self.itemFromIndex(index).path())
+        indexes = [watched for watched in self.__watched.get(path, []) if watched.isValid() and watched != index]
+        indexes.append(QPersistentModelIndex(index))
+        if path not in self.__watched:
+            self.__watcher.addPath(path)
+        self.__watched[path] = indexes
+
+    def __unwatch(self, index):
+        # type: (QModelIndex) -> NoReturn
+        path = str(self.itemFromIndex(index).path())
+        indexes = [watched for watched in self.__watched.get(path, []) if watched.isValid() and watched != index]
+        if len(indexes) > 0:
+            self.__watched[path] = indexes
+        elif path in self.__watched:
+            del self.__watched[path]
+            self.__watcher.removePath(path)
+
+    def __onDirectoryChanged(self, path):
+        # type: (str) -> NoReturn
+        indexes = [index for index in self.__watched.get(path, []) if index.isValid()]
+        if len(indexes) == 0:
+            self.__watched.pop(path, None)
+            self.__watcher.removePath(path)
+            return
+
+        self.__listingCache.invalidate(path)
+        for index in indexes:
+            index = QModelIndex(index)
+            requestId = self.__listingOf(index)
+            if requestId is not None:
+                if not self.__listings[requestId].refresh:
+                    continue
+                self.__lister.cancel(requestId)
+                del self.__listings[requestId]
+            self.__list(index, refresh=True)
+
+    def __appendItems(self, parentItem, paths):
+        # type: (QStandardItem, List[pathlib.Path]) -> NoReturn
+        self.__insertItems(parentItem, parentItem.rowCount(), [self.createItem(path) for path in paths])
+
+    def __insertItems(self, parentItem, row, items):
+        # type: (QStandardItem, int, List[TDirectoryTreeItem]) -> NoReturn
+        parentItem.insertRows(row, items)
+
+        # subdirectories are looked for in the background, in row order
+        for item in items:
+            self.__detecting.setdefault(item.path(), []).append(QPersistentModelIndex(item.index()))
+        self.__childDetection.append([item.path() for item in items])
+
+    def __onChildDetected(self, path, hasChild):
+        # type: (pathlib.Path, bool) -> NoReturn
+        for index in self.__detecting.pop(path, []):
+            if hasChild or not index.isValid():
+                continue
+            item = self.itemFromIndex(QModelIndex(index))
+            if item.hasPlaceholder():
+                item.removeRows(0, 1)
 
 
 TDirectoryTreeView = TypeVar('TDirectoryTreeView', bound=QDirectoryTreeView)
@@ -620,6 +3184,41 @@ class QDirectoryTreeWidget(_ViewModelWidgetBase, Generic[TDirectoryTreeView, TDi
         layout.addWidget(self._view)
         self.setLayout(layout)
 
+        self.__prefetcher = None  # type: Optional[PriorityRequestQueue]
+        self.__prefetchBudget = 0
+        self.__prefetchCache = None  # type: Optional[DirectoryListingCache]
+        self.__hoveredPath = None  # type: Optional[pathlib.Path]
+        self.__recentPaths = collections.deque()  # type: collections.deque
+        self._view.itemSelectionChanged.connect(self.__prefetch)
+        self._view.expanded.connect(self.__onItemExpanded)
+        self._view.entered.connect(self.__onItemEntered)
+
+        self.__rootPaths = []  # type: List[Union[str, pathlib.Path]]
+        self.__pathIndex = None  # type: Optional[PathIndex]
+        self.__jumpPath = None  # type: Optional[pathlib.Path]
+        self.__jumping = False
+        self._sourceModel().rowsInserted.connect(self.__onRowsChanged)
+        self._sourceModel().rowsRemoved.connect(self.__onRowsChanged)
+
+    def setPrefetchEnabled(self, enabled, budget=32):
+        # type: (bool, int) -> NoReturn
+        # lists the hovered, selected and recently expanded directories ahead into the listing cache,
+        # at most budget directories per round on a single worker
+        self.__prefetchBudget = budget
+        self.__recentPaths = collections.deque(self.__recentPaths, maxlen=budget)
+        if enabled and self.__prefetcher is None:
+            # the listings only fill the cache, nothing to do once they arrive
+            self.__prefetcher = PriorityRequestQueue(self.__prefetchListing, parent=self)
+            self._view.setMouseTracking(True)
+        elif not enabled and self.__prefetcher is not None:
+            self.__prefetcher.close()
+            self.__prefetcher = None
+            self._view.setMouseTracking(False)
+
+    def isPrefetchEnabled(self):
+        # type: () -> bool
+        return self.__prefetcher is not None
+
     def setSelectionMode(self, mode):
         # type: (int) -> NoReturn
         self._view.setSelectionMode(mode)
@@ -651,7 +3250,159 @@ class QDirectoryTreeWidget(_ViewModelWidgetBase, Generic[TDirectoryTreeView, TDi
 
     def setRootDirectoryPaths(self, paths):
         # type: (List[Union[str, pathlib.Path]]) -> NoReturn
+        self.__rootPaths = list(paths)
+        self.__jumpPath = None
         self._sourceModel().setRootDirectoryPaths(paths)
+        if self.__pathIndex is not None:
+            self.__pathIndex.build(self.__rootPaths)
+
+    def setPathIndexEnabled(self, enabled, workers=4):
+        # type: (bool, int) -> NoReturn
+        # indexes every directory below the roots in the background, kept current by the model's listings
+        if enabled and self.__pathIndex is None:
+            self.__pathIndex = PathIndex(self, workers)
+            self._sourceModel().directoryListed.connect(self.__pathIndex.update)
+            self.__pathIndex.build(self.__rootPaths)
+        elif not enabled and self.__pathIndex is not None:
+            self._sourceModel().directoryListed.disconnect(self.__pathIndex.update)
+            self.__pathIndex.close()
+            self.__pathIndex.deleteLater()
+            self.__pathIndex = None
+
+    def pathIndex(self):
+        # type: () -> Optional[PathIndex]
+        return self.__pathIndex
+
+    def searchPaths(self, query, root=None, limit=None):
+        # type: (str, Optional[Union[str, pathlib.Path]], Optional[int]) -> List[pathlib.Path]
+        if self.__pathIndex is None:
+            return []
+        return self.__pathIndex.search(query, root, limit)
+
+    def jumpTo(self, path):
+        # type: (Union[str, pathlib.Path]) -> bool
+        # expands only the ancestors of path, continuing as their children are listed,
+        # and selects it once it is shown. False when no root contains it or an ancestor lacks it
+        self.__jumpPath = pathlib.Path(path)
+        self.__jumping = True
+        try:
+            return self.__continueJump()
+        finally:
+            self.__jumping = False
+
+    def __onRowsChanged(self, *args):
+        # type: (Any) -> NoReturn
+        # rows changed by the expands of a running jump are handled by the jump itself
+        if self.__jumpPath is None or self.__jumping:
+            return
+        self.__jumping = True
+        try:
+            self.__continueJump()
+        finally:
+            self.__jumping = False
+
+    def __continueJump(self):
+        # type: () -> bool
+        path = self.__jumpPath
+        model = self._sourceModel()
+        index = QModelIndex()
+        for row in range(model.rowCount()):
+            rootIndex = model.index(row, 0)
+            rootPath = model.itemFromIndex(rootIndex).path()
+            if rootPath == path or rootPath in path.parents:
+                index = rootIndex
+                break
+
+        while index.isValid():
+            # the view shows the rows through the proxy model when one is installed
+            viewIndex = self.__viewIndex(index)
+            if not viewIndex.isValid():
+                break
+
+            itemPath = model.itemFromIndex(index).path()
+            if itemPath == path:
+                self.__jumpPath = None
+                self._view.setCurrentIndex(viewIndex)
+                self._view.scrollTo(viewIndex)
+                return True
+
+            if not self._view.isExpanded(viewIndex):
+                self._view.expand(viewIndex)
+            childPath = itemPath / path.relative_to(itemPath).parts[0]
+            childIndex = QModelIndex()
+            for row in range(model.rowCount(index)):
+                child = model.index(row, 0, index)
+                if model.itemFromIndex(child).path() == childPath:
+                    childIndex = child
+                    break
+            if not childIndex.isValid() and model.isLoading(index):
+                return True
+            index = childIndex
+
+        self.__jumpPath = None
+        return False
+
+    def __viewIndex(self, index):
+        # type: (QModelIndex) -> QModelIndex
+        model = self.model()
+        if isinstance(model, QAbstractProxyModel):
+            return model.mapFromSource(index)
+        return index
+
+    def __itemPath(self, index):
+        # type: (QModelIndex) -> Optional[pathlib.Path]
+        if not index.isValid():
+            return None
+        item = self.itemFromIndex(index)
+        if item is None:
+            return None
+        return item.path()
+
+    def __onItemEntered(self, index):
+        # type: (QModelIndex) -> NoReturn
+        path = self.__itemPath(index)
+        if path is None or path == self.__hoveredPath:
+            return
+        self.__hoveredPath = path
+        self.__prefetch()
+
+    def __onItemExpanded(self, index):
+        # type: (QModelIndex) -> NoReturn
+        path = self.__itemPath(index)
+        if path is None:
+            return
+        if path in self.__recentPaths:
+            self.__recentPaths.remove(path)
+        self.__recentPaths.appendleft(path)
+
+    def __prefetch(self, *args):
+        # type: (Any) -> NoReturn
+        if self.__prefetcher is None:
+            return
+
+        paths = []  # type: List[pathlib.Path]
+        if self.__hoveredPath is not None:
+            paths.append(self.__hoveredPath)
+
+        model = self.model()
+        for index in self.selectedIndexes():
+            path = self.__itemPath(index)
+            if path is None:
+                continue
+            paths.append(path)
+            for row in range(model.rowCount(index)):
+                childPath = self.__itemPath(model.index(row, 0, index))
+                if childPath is not None:
+                    paths.append(childPath)
+        paths.extend(self.__recentPaths)
+
+        candidates = list(collections.OrderedDict.fromkeys(paths))[:self.__prefetchBudget]
+        self.__prefetchCache = self._sourceModel().listingCache()
+        self.__prefetcher.request(candidates)
+
+    def __prefetchListing(self, path):
+        # type: (pathlib.Path) -> List[str]
+        return self.__prefetchCache.list(path)
 
 
 class QFileListItem(QStandardItem):
@@ -717,22 +3468,47 @@ class QFileListView(QListView):
 
 class QFileListModel(QListModel, Generic[TFileListItem]):
 
+    directoryLoaded = Signal(object)
+
     def __init__(self, parent):
         # type: (QObject) -> NoReturn
         super(QFileListModel, self).__init__(parent)
+        self.__directoryPath = None  # type: Optional[pathlib.Path]
+        self.__dirCount = 0
+        self.__listingChunkSize = 256
+        self.__requestId = None  # type: Optional[int]
+        self.__lister = DirectoryLister(self, workers=1)
+        self.__lister.chunkListed.connect(self.__onChunkListed)
+        self.__lister.finished.connect(self.__onListingFinished)
 
     def setDirectoryPath(self, path):
         # type: (Union[str, pathlib.Path]) -> None
+        # entries are read in one scandir pass on a worker and inserted in chunks, directories first
         if isinstance(path, str):
             path = pathlib.Path(path)
 
-        items = []  # type: List[TFileListItem]
-        for dirPath in [p for p in path.glob('*') if p.is_dir()]:
-            items.append(self.createItem(dirPath))
-        for filePath in [p for p in path.glob('*') if p.is_file()]:
-            items.append(self.createItem(filePath))
+        if self.__requestId is not None:
+            self.__lister.cancel(self.__requestId)
+        self.__directoryPath = path
+        self.__dirCount = 0
+        self.reset([])
+        self.__requestId = self.__lister.list(path, chunkSize=self.__listingChunkSize)
 
-        self.reset(items)
+    def directoryPath(self):
+        # type: () -> Optional[pathlib.Path]
+        return self.__directoryPath
+
+    def isLoading(self):
+        # type: () -> bool
+        return self.__requestId is not None
+
+    def setListingChunkSize(self, size):
+        # type: (int) -> NoReturn
+        self.__listingChunkSize = size
+
+    def listingChunkSize(self):
+        # type: () -> int
+        return self.__listingChunkSize
 
     def createItem(self, path):
         # type: (pathlib.Path) -> TFileListItem
@@ -746,9 +3522,39 @@ class QFileListModel(QListModel, Generic[TFileListItem]):
         item = self.itemFromIndex(index)
         if role == Qt.DisplayRole:
             return item.path().name
+        if role == Qt.DecorationRole:
+            return item.data(Qt.DecorationRole)
 
         return None
 
+    def __onChunkListed(self, requestId, entries):
+        # type: (int, List[os.DirEntry]) -> NoReturn
+        if requestId != self.__requestId:
+            return
+
+        # DirEntry keeps the type read by scandir, so no stat is needed on most file systems
+        dirs = []  # type: List[TFileListItem]
+        files = []  # type: List[TFileListItem]
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    dirs.append(self.createItem(pathlib.Path(entry.path)))
+                elif entry.is_file():
+                    files.append(self.createItem(pathlib.Path(entry.path)))
+            except OSError:
+                continue
+
+        self.insertItems(self.__dirCount, dirs)
+        self.__dirCount += len(dirs)
+        self.extend(files)
+
+    def __onListingFinished(self, requestId):
+        # type: (int) -> NoReturn
+        if requestId != self.__requestId:
+            return
+        self.__requestId = None
+        self.directoryLoaded.emit(self.__directoryPath)
+
 
 class QFileListWidget(_ViewModelWidgetBase):
 
@@ -769,6 +3575,45 @@ class QFileListWidget(_ViewModelWidgetBase):
         layout.addWidget(self._view)
         self.setLayout(layout)
 
+        self.__iconLoader = None  # type: Optional[QFileIconLoader]
+        self.__iconPrefetch = 0
+        self.__iconRequests = {}  # type: Dict[pathlib.Path, Tuple[int, TFileListItem]]
+        self.__iconTimer = QTimer(self)
+        self.__iconTimer.setSingleShot(True)
+        self.__iconTimer.setInterval(0)
+        self.__iconTimer.timeout.connect(self.__requestVisibleIcons)
+        self._view.verticalScrollBar().valueChanged.connect(self.__iconTimer.start)
+        self._view.horizontalScrollBar().valueChanged.connect(self.__iconTimer.start)
+
+        model = self.model()
+        model.modelReset.connect(self.__iconTimer.start)
+        model.rowsInserted.connect(self.__iconTimer.start)
+        model.rowsRemoved.connect(self.__iconTimer.start)
+        model.layoutChanged.connect(self.__iconTimer.start)
+
+    def resizeEvent(self, event):
+        # type: (QResizeEvent) -> NoReturn
+        super(QFileListWidget, self).resizeEvent(event)
+        self.__iconTimer.start()
+
+    def setIconLoader(self, loader, prefetch=40):
+        # type: (Optional[QFileIconLoader], int) -> NoReturn
+        if self.__iconLoader is not None:
+            self.__iconLoader.loaded.disconnect(self.__onIconLoaded)
+            self.__iconLoader.cancel()
+
+        self.__iconLoader = loader
+        self.__iconPrefetch = prefetch
+        self.__iconRequests = {}
+
+        if loader is not None:
+            loader.loaded.connect(self.__onIconLoaded)
+            self.__iconTimer.start()
+
+    def iconLoader(self):
+        # type: () -> Optional[QFileIconLoader]
+        return self.__iconLoader
+
     def setViewMode(self, mode):
         # type: (str) -> NoReturn
         self._view.setViewMode(mode)
@@ -801,3 +3646,37 @@ class QFileListWidget(_ViewModelWidgetBase):
     def setDirectoryPath(self, path):
         # type: (Union[str, pathlib.Path]) -> None
         return self._sourceModel().setDirectoryPath(path)
+
+    def __requestVisibleIcons(self):
+        # type: () -> NoReturn
+        if self.__iconLoader is None:
+            return
+
+        model = self.model()
+        sourceModel = self._sourceModel()
+        requests = {}  # type: Dict[pathlib.Path, Tuple[int, TFileListItem]]
+        for row in _viewportRows(self._view, self.__iconPrefetch):
+            index = model.index(row, 0)
+            if isinstance(model, QAbstractProxyModel):
+                index = model.mapToSource(index)
+            item = sourceModel.itemFromIndex(index)
+            if item.data(Qt.DecorationRole) is not None:
+                continue
+            requests[item.path()] = (index.row(), item)
+
+        self.__iconRequests = requests
+        self.__iconLoader.request(list(requests.keys()))
+
+    def __onIconLoaded(self, result):
+        # type: (QFileIconLoader.LoadResult) -> NoReturn
+        request = self.__iconRequests.pop(result.filePath, None)
+        if request is None:
+            return
+
+        row, item = request
+        model = self._sourceModel()
+        if row >= model.rowCount() or model.itemFromIndex(row) is not item:
+            return
+
+        item.setIcon(result.icon)
+        model.markDirty(row, [Qt.DecorationRole])
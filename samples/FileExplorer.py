@@ -63,24 +63,6 @@ class DirTreeWidget(QDirectoryTreeWidget):
         return DirTreeModel
 
 
-class FileListModel(QFileListModel):
-
-    icons = {}
-
-    def data(self, index, role=Qt.DisplayRole):
-        if role == Qt.DecorationRole:
-            item = self.itemFromIndex(index)
-            path = item.path()
-            return FileListModel.icons.get(path)
-        return super(FileListModel, self).data(index, role)
-
-
-class FileListWidget(QFileListWidget):
-
-    def modelType(self):
-        return FileListModel
-
-
 def main():
     app = QApplication()
     window = QMainWindow()
@@ -113,29 +95,17 @@ def main():
 
     tree.customContextMenuRequested.connect(_ctx_menu)
 
-    files = FileListWidget(window)
+    files = QFileListWidget(window)
     files.setViewMode(QFileListViewMode.ListMode)
     files.setSelectionMode(QAbstractItemView.ExtendedSelection)
     # files.itemSelectionChanged.connect(lambda x, y: print(tree.selectedItems()))
     # files.itemClicked.connect(lambda idx: print(f'click: {idx}'))
     # files.itemDoubleClicked.connect(lambda idx: print(f'doubleclick: {idx}'))
 
-    iconLoader = QFileIconLoader(None)
+    # 表示されている行のアイコンだけを読み込む
+    files.setIconLoader(QFileIconLoader(files))
 
     def _updateFiles(index):
-        item = tree.itemFromIndex(index)
-
-        filePaths = list(item.path().glob('*'))
-        iconLoader.reset(filePaths)
-
-        def _set_icon(result):
-            FileListModel.icons[result.filePath] = result.icon
-            files.model().refresh()
-
-        iconLoader.loaded.connect(_set_icon)
-        # iconLoader.completed.connect(print)
-        iconLoader.loadAsync()
-
         files.setDirectoryPath(tree.itemFromIndex(index).path())
 
     tree.itemSelectionChanged.connect(lambda x, y: _updateFiles(tree.selectedIndexes()[0]))
@@ -0,0 +1,88 @@
+# coding: utf-8
+import sys
+import time
+import argparse
+
+from PySide2.QtCore import (
+    Qt,
+    QSize,
+)
+
+from PySide2.QtGui import (
+    QImage,
+)
+
+from PySide2.QtWidgets import (
+    QApplication,
+)
+
+from PySideLib.QCdtWidgets import (
+    QImageFlowWidget,
+    QImageFlowItem,
+    QImageFlowScrollMode,
+)
+
+
+def measure(app, mode, count, frames, batchSize):
+    image = QImage(64, 64, QImage.Format_RGB32)
+    image.fill(Qt.darkCyan)
+
+    widget = QImageFlowWidget(None)
+    widget.resize(QSize(1280, 800))
+    widget.view().setIconSize(QSize(64, 64))
+    widget.setScrollMode(mode)
+    widget.setBatchSize(batchSize)
+
+    items = []
+    for _ in range(count):
+        item = QImageFlowItem()
+        item.setImage(image)
+        items.append(item)
+
+    # 表示までの時間
+    start = time.perf_counter()
+    widget._sourceModel().extend(items)
+    widget.show()
+    app.processEvents()
+    widget.view().viewport().repaint()
+    firstPaint = time.perf_counter() - start
+
+    # バッチレイアウトが終わるまで待つ
+    scrollBar = widget.view().verticalScrollBar()
+    maximum = -1
+    while maximum != scrollBar.maximum():
+        maximum = scrollBar.maximum()
+        for _ in range(10):
+            app.processEvents()
+
+    # スクロール1フレームあたりの時間
+    step = max(scrollBar.pageStep() // 4, 1)
+    start = time.perf_counter()
+    for frame in range(frames):
+        scrollBar.setValue((frame * step) % max(scrollBar.maximum(), 1))
+        app.processEvents()
+        widget.view().viewport().repaint()
+    frameTime = (time.perf_counter() - start) / frames
+
+    widget.close()
+    widget.deleteLater()
+    app.processEvents()
+    return firstPaint, frameTime
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    for mode in (QImageFlowScrollMode.ScrollArea, QImageFlowScrollMode.Native):
+        firstPaint, frameTime = measure(app, mode, args.count, args.frames, args.batch_size)
+        print('{:<10} items={} first paint={:.1f}ms scroll frame={:.2f}ms'.format(
+            mode, args.count, firstPaint * 1000, frameTime * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,6 @@ import glob
 from PySide2.QtCore import (
     Qt,
     QSize,
-    QSortFilterProxyModel,
 )
 
 from PySide2.QtGui import (
@@ -27,23 +26,19 @@ from PySideLib.QCdtWidgets import (
     QImageFlowModel,
     QImageFlowView,
     QImageFlowItem,
-)
-
-from PySideLib.QCdtUtils import (
-    BatchImageLoader,
-    ImageLoadingCallback,
+    QSortedListModel,
+    QListFilterProxyModel,
 )
 
 
 class FlowItem(QImageFlowItem):
     def __init__(self, filePath, image=None):
-        super(FlowItem, self).__init__()
-        self.filePath = filePath
+        super(FlowItem, self).__init__(filePath)
         self.name = os.path.basename(filePath)
         self.setImage(image)
 
     def __repr__(self):
-        return "{}('{}')".format(self.__class__.__name__, self.filePath)
+        return "{}('{}')".format(self.__class__.__name__, self.filePath())
 
 
 class FlowView(QImageFlowView):
@@ -52,12 +47,16 @@ class FlowView(QImageFlowView):
         proxy = self.model()
         index = proxy.mapToSource(index)
         item = proxy.sourceModel().itemFromIndex(index)
-        QMessageBox.information(None, 'test', item.filePath)
+        QMessageBox.information(None, 'test', str(item.filePath()))
 
 
-class FlowModel(QImageFlowModel):
+# 読み込み完了順に追加しても常にファイル名順に並ぶ
+class FlowModel(QSortedListModel, QImageFlowModel):
     FileNameRole = Qt.UserRole + 1
 
+    def sortKey(self, item):
+        return item.name
+
     def data(self, index, role=Qt.DisplayRole):
         if role == FlowModel.FileNameRole:
             return self.itemFromIndex(index).name
@@ -73,6 +72,12 @@ class FlowWidget(QImageFlowWidget):
     def modelType(self):
         return FlowModel
 
+    def createItem(self, filePath):
+        return FlowItem(filePath)
+
+    def loadImage(self, filePath):
+        return super(FlowWidget, self).loadImage(filePath).scaled(100, 100)
+
 
 def main():
     app = QApplication()
@@ -81,13 +86,12 @@ def main():
 
     imageFlow = FlowWidget(window)
 
-    proxy = QSortFilterProxyModel()
+    proxy = QListFilterProxyModel()
     proxy.setFilterRole(FlowModel.FileNameRole)
-    proxy.setSortRole(FlowModel.FileNameRole)
     imageFlow.setProxyModel(proxy)
 
     searchFilter = QLineEdit()
-    searchFilter.textChanged.connect(lambda text: proxy.setFilterWildcard(text))
+    searchFilter.textChanged.connect(proxy.setFilterText)
 
     layout = QVBoxLayout()
     layout.addWidget(searchFilter)
@@ -106,27 +110,8 @@ def main():
     #     item.setImage(image)
     #     imageFlow.appendItem(item)
 
-    # 画像を非同期読み込み
-    loader = BatchImageLoader()
-    loader.addCallback(ImageLoadingCallback.LOADED, lambda img: img.scaled(100, 100))
-    tasks = {}
-
-    def _on_load_image(taskId):
-        filePath = tasks[taskId]
-        image = loader.image(taskId)
-        item = FlowItem(filePath, image)
-        imageFlow.appendItem(item)
-
-    def _on_load_complete():
-        proxy.sort(0)
-
-    loader.loaded.connect(_on_load_image)
-    loader.completed.connect(_on_load_complete)
-    for filePath in glob.iglob('C:/tmp/test_images/*.png'):
-        taskId = loader.addFile(filePath)
-        tasks[taskId] = filePath
-
-    loader.loadAsync()
+    # 画像を非同期読み込み (表示範囲の画像だけをバックグラウンドでデコード)
+    imageFlow.appendFiles(glob.iglob('C:/tmp/test_images/*.png'))
 
     sys.exit(app.exec_())
 
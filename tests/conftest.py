@@ -8,7 +8,7 @@ from PySide2.QtWidgets import (
 )
 
 # Set path to parent directory
-sys.path.add(os.path.abspath(
+sys.path.append(os.path.abspath(
     os.path.dirname(os.path.abspath(__file__)) + "/../"))
 
 # @pytest.fixture
@@ -21,6 +21,13 @@ sys.path.add(os.path.abspath(
 #     return mainWindow
 
 
+@pytest.fixture
+def qapp():
+    """Yield the running QApplication, creating it if needed
+    """
+    yield QApplication.instance() or QApplication([])
+
+
 @pytest.fixture
 def sample_list_str():
     """Yeild fuilds stirng list: ['apple', 'grape', 'peach', 'strawberry', 'banana']
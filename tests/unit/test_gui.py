@@ -1,3 +1,7 @@
+from PySide2.QtCore import (
+    QPoint,
+)
+
 from PySide2.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -5,6 +9,17 @@ from PySide2.QtWidgets import (
 )
 
 
+def _waitUntil(qapp, condition, timeout=5.0):
+    # processes events until condition holds, shared by the tests of the asynchronous models
+    import time
+
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
 class TestQTabWidget:
     """
     Group of tests for QTabWidget
@@ -17,3 +32,1400 @@ class TestQTabWidget:
         tagWidget = QTagWidget(mainwWindow, sample_list_str)
         mainwWindow.setCentralWidget(tagWidget)
         mainwWindow.show()
+
+    def test_paintedModeWithManyTags(self, qapp):
+        from PySide2.QtTest import QTest
+        from PySide2.QtCore import Qt
+        from PySideLib.QCdtWidgets import QTagWidget, QTagWidgetMode
+
+        tags = ['tag{:03d}'.format(i) for i in range(300)]
+        tagWidget = QTagWidget(None, tags, mode=QTagWidgetMode.Painted, maxTags=None)
+        tagWidget.resize(400, 100)
+        tagWidget.setVisible(True)
+
+        tagWidget.lineEdit.setText(', '.join(tags))
+        tagWidget.create_tags()
+        assert tagWidget.chips.tags() == tags
+        assert tagWidget.lineEdit.isEnabled()
+        assert tagWidget.chips.heightForWidth(400) > 28
+
+        # click the close button of the first chip
+        pos = QPoint(tagWidget.chips.width(), 0)
+        for x in range(tagWidget.chips.width()):
+            if tagWidget.chips.closeButtonAt(QPoint(x, 14)) == 0:
+                pos = QPoint(x, 14)
+                break
+        QTest.mouseClick(tagWidget.chips, Qt.LeftButton, Qt.NoModifier, pos)
+        assert tagWidget.tags == tags[1:]
+        assert tagWidget.chips.tags() == tags[1:]
+
+    def test_maxTags(self, qapp):
+        from PySideLib.QCdtWidgets import QTagWidget
+
+        tagWidget = QTagWidget(None, [], maxTags=2)
+        tagWidget.lineEdit.setText('a, b')
+        tagWidget.create_tags()
+        assert not tagWidget.lineEdit.isEnabled()
+
+        tagWidget.delete_tag('a')
+        assert tagWidget.lineEdit.isEnabled()
+
+
+class TestQPartialMatchCompleter:
+    """
+    Group of tests for QPartialMatchCompleter
+    """
+
+    def test_substringMatch(self, qapp, sample_list_str):
+        from PySide2.QtCore import QStringListModel
+        from PySideLib.QCdtWidgets import QPartialMatchCompleter
+
+        completer = QPartialMatchCompleter(None)
+        completer.setModel(QStringListModel(sample_list_str + ['Pineapple']))
+
+        def _matches(text):
+            completer.splitPath(text)
+            model = completer.model()
+            return [model.index(row, 0).data() for row in range(model.rowCount())]
+
+        assert _matches('AP') == ['apple', 'grape', 'Pineapple']
+        proxy = completer.model()
+        assert _matches('app') == ['apple', 'Pineapple']
+        assert _matches('eapp') == ['Pineapple']
+        assert _matches('rr') == ['strawberry']
+        assert completer.model() is proxy
+
+        completer.source_model.setStringList(['happy'])
+        assert _matches('app') == ['happy']
+
+    def test_typedCompletions(self, qapp):
+        from PySide2.QtCore import QStringListModel
+        from PySide2.QtTest import QTest
+        from PySide2.QtWidgets import QCompleter, QLineEdit
+        from PySideLib.QCdtWidgets import QPartialMatchCompleter
+
+        lineEdit = QLineEdit()
+        completer = QPartialMatchCompleter(lineEdit)
+        completer.setCompletionMode(QCompleter.PopupCompletion)
+        completer.setModel(QStringListModel(['apple', 'grape', 'banana']))
+        lineEdit.setCompleter(completer)
+        lineEdit.show()
+
+        QTest.keyClicks(lineEdit, 'ap')
+        model = completer.completionModel()
+        assert model.columnCount() == 1
+        assert [model.index(row, 0).data() for row in range(model.rowCount())] == ['apple', 'grape']
+
+    def test_postingBuilds(self, qapp, monkeypatch):
+        import threading
+        from PySide2.QtCore import QStringListModel
+        from PySideLib.QCdtUtils import TrigramIndex
+        from PySideLib.QCdtWidgets import QPartialMatchCompleter
+
+        built = []
+        released = threading.Event()
+        buildPostings = TrigramIndex.buildPostings
+
+        def _buildPostings(index):
+            # the worker is held until every rebuild was requested
+            released.wait(5)
+            buildPostings(index)
+            if len(index) > 0 and index.key(0).startswith('apple'):
+                built.append(index.key(0))
+
+        source = QStringListModel()
+        completer = QPartialMatchCompleter(None)
+        completer.setModel(source)
+        monkeypatch.setattr(TrigramIndex, 'buildPostings', _buildPostings)
+        for i in range(5):
+            source.setStringList(['apple{}'.format(i)] * 1000)
+            completer.splitPath('app')
+        released.set()
+
+        # the rebuilds run one after the other, the replaced ones are skipped
+        assert _waitUntil(qapp, lambda: 'apple4' in built)
+        assert len(built) <= 2
+        assert built[-1] == 'apple4'
+
+    def test_sourceRowChanges(self, qapp):
+        from PySide2.QtCore import QStringListModel
+        from PySideLib.QCdtWidgets import QPartialMatchCompleter
+
+        source = QStringListModel(['apple', 'banana', 'grape', 'pineapple'])
+        completer = QPartialMatchCompleter(None)
+        completer.setModel(source)
+        completer.splitPath('ap')
+        proxy = completer.model()
+
+        def _rows():
+            return [proxy.index(row, 0).data() for row in range(proxy.rowCount())]
+
+        assert _rows() == ['apple', 'grape', 'pineapple']
+        source.removeRows(0, 2)
+        assert _rows() == ['grape', 'pineapple']
+        source.insertRows(0, 1)
+        source.setData(source.index(0, 0), 'papaya')
+        source.removeRows(1, 1)
+        assert _rows() == ['pineapple']
+        assert all(proxy.mapToSource(proxy.index(row, 0)).row() < source.rowCount() for row in range(proxy.rowCount()))
+
+        qapp.processEvents()
+        assert _rows() == ['papaya', 'pineapple']
+
+    def test_fuzzyMatch(self, qapp, sample_list_str):
+        import time
+        from PySide2.QtCore import QStringListModel
+        from PySideLib.QCdtWidgets import QPartialMatchCompleter, QPartialMatchMode
+
+        completer = QPartialMatchCompleter(None)
+        completer.setMatchMode(QPartialMatchMode.Fuzzy)
+        completer.setDebounceInterval(0)
+        completer.setModel(QStringListModel(sample_list_str + ['Pineapple']))
+
+        finished = []
+        completer._fuzzySearchFinished.connect(lambda *args: finished.append(args))
+
+        def _matches(text):
+            count = len(finished)
+            completer.splitPath(text)
+            timeout = time.time() + 5
+            while len(finished) == count and time.time() < timeout:
+                qapp.processEvents()
+            model = completer.model()
+            return [model.index(row, 0).data() for row in range(model.rowCount())]
+
+        assert _matches('apl') == ['apple', 'Pineapple']
+        assert _matches('stb') == ['strawberry']
+
+        for _ in range(5):
+            completer.recordUsage('Pineapple')
+        assert _matches('apl') == ['Pineapple', 'apple']
+
+    def test_typedFuzzyCompletions(self, qapp):
+        from PySide2.QtCore import QStringListModel
+        from PySide2.QtTest import QTest
+        from PySide2.QtWidgets import QCompleter, QLineEdit
+        from PySideLib.QCdtWidgets import QPartialMatchCompleter, QPartialMatchMode
+
+        lineEdit = QLineEdit()
+        completer = QPartialMatchCompleter(lineEdit)
+        completer.setMatchMode(QPartialMatchMode.Fuzzy)
+        completer.setCompletionMode(QCompleter.PopupCompletion)
+        completer.setModel(QStringListModel(['apple', 'grape', 'banana']))
+        lineEdit.setCompleter(completer)
+        lineEdit.show()
+
+        def _completions():
+            model = completer.completionModel()
+            return [model.index(row, 0).data() for row in range(model.rowCount())]
+
+        # nothing is listed before the first search finished
+        QTest.keyClicks(lineEdit, 'ape')
+        assert _completions() == []
+        assert _waitUntil(qapp, lambda: _completions() == ['grape', 'apple'])
+
+
+class TestQFileListWidget:
+    """
+    Group of tests for QFileListWidget
+    """
+
+    def test_iconLoaderRequestsViewportRows(self, qapp, tmp_path):
+        from PySideLib.QCdtUtils import QFileIconLoader
+        from PySideLib.QCdtWidgets import QFileListWidget
+
+        class _Loader(QFileIconLoader):
+            def __init__(self, parent):
+                super(_Loader, self).__init__(parent)
+                self.requests = []
+
+            def request(self, filePaths):
+                requested = list(filePaths)
+                if len(requested) > 0:
+                    self.requests.append(requested)
+                super(_Loader, self).request(requested)
+
+        for i in range(500):
+            (tmp_path / 'file_{:04d}.txt'.format(i)).touch()
+
+        widget = QFileListWidget(None)
+        widget.resize(200, 200)
+        widget.show()
+        loader = _Loader(widget)
+        widget.setIconLoader(loader, prefetch=10)
+        widget.setDirectoryPath(tmp_path)
+        assert _waitUntil(qapp, lambda: not widget.model().isLoading())
+        qapp.processEvents()
+
+        # rows stream in, rows whose icon arrived in between are not requested again
+        assert len(loader.requests) > 0
+        assert all(len(requested) < 100 for requested in loader.requests)
+        assert loader.requests[0][0] == widget.model().itemFromIndex(0).path()
+
+    def test_streamedDirectoryListing(self, qapp, tmp_path):
+        from PySideLib.QCdtWidgets import QFileListModel
+
+        for i in range(40):
+            (tmp_path / 'file_{:02d}.txt'.format(i)).touch()
+            if i % 4 == 0:
+                (tmp_path / 'dir_{:02d}'.format(i)).mkdir()
+        other = tmp_path / 'dir_00'
+        (other / 'inner.txt').touch()
+
+        model = QFileListModel(None)
+        model.setListingChunkSize(8)
+        loaded = []
+        model.directoryLoaded.connect(loaded.append)
+        inserted = []
+        model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+
+        model.setDirectoryPath(str(tmp_path))
+        assert model.isLoading()
+        assert model.rowCount() == 0
+        assert _waitUntil(qapp, lambda: not model.isLoading())
+        assert loaded == [tmp_path]
+        assert len(inserted) > 2
+
+        # directories stay in front of the files whatever order the chunks came in
+        paths = [model.itemFromIndex(row).path() for row in range(model.rowCount())]
+        assert len(paths) == 50
+        assert all(path.is_dir() for path in paths[:10])
+        assert all(path.is_file() for path in paths[10:])
+        assert sorted(paths) == sorted(tmp_path.iterdir())
+
+        # changing the directory drops the rows of the previous listing
+        model.setDirectoryPath(tmp_path)
+        model.setDirectoryPath(other)
+        assert model.directoryPath() == other
+        assert _waitUntil(qapp, lambda: not model.isLoading())
+        _waitUntil(qapp, lambda: False, timeout=0.2)
+        assert [model.itemFromIndex(row).path() for row in range(model.rowCount())] == [other / 'inner.txt']
+        assert loaded == [tmp_path, other]
+
+
+class TestQFlowLayout:
+    """
+    Group of tests for QFlowLayout
+    """
+
+    @staticmethod
+    def _expectedGeometries(layout, width):
+        from PySide2.QtCore import Qt, QRect, QPoint
+        from PySide2.QtWidgets import QSizePolicy
+
+        geometries = []
+        x = y = lineHeight = 0
+        for index in range(layout.count()):
+            item = layout.itemAt(index)
+            style = item.widget().style()
+            spaceX = layout.spacing() + style.layoutSpacing(QSizePolicy.PushButton, QSizePolicy.PushButton, Qt.Horizontal)
+            spaceY = layout.spacing() + style.layoutSpacing(QSizePolicy.PushButton, QSizePolicy.PushButton, Qt.Vertical)
+            nextX = x + item.sizeHint().width() + spaceX
+            if nextX - spaceX > width - 1 and lineHeight > 0:
+                x = 0
+                y = y + lineHeight + spaceY
+                nextX = x + item.sizeHint().width() + spaceX
+                lineHeight = 0
+            geometries.append(QRect(QPoint(x, y), item.sizeHint()))
+            x = nextX
+            lineHeight = max(lineHeight, item.sizeHint().height())
+        return geometries, y + lineHeight
+
+    def test_cachedLayout(self, qapp):
+        from PySide2.QtCore import QRect
+        from PySide2.QtWidgets import QWidget, QPushButton
+        from PySideLib.QCdtWidgets import QFlowLayout
+
+        widget = QWidget()
+        layout = QFlowLayout(widget)
+        buttons = [QPushButton('button {}'.format('x' * (i % 7))) for i in range(200)]
+        for button in buttons:
+            layout.addWidget(button)
+
+        for width in (300, 500, 300):
+            layout.setGeometry(QRect(0, 0, width, 1000))
+            geometries, height = self._expectedGeometries(layout, width)
+            assert [button.geometry() for button in buttons] == geometries
+            assert layout.heightForWidth(width) == height
+
+        buttons[150].setText('a much longer label than before')
+        layout.invalidate()
+        layout.setGeometry(QRect(0, 0, 300, 1000))
+        geometries, height = self._expectedGeometries(layout, 300)
+        assert [button.geometry() for button in buttons] == geometries
+        assert layout.heightForWidth(300) == height
+        assert layout.heightForWidth(500) == self._expectedGeometries(layout, 500)[1]
+
+        layout.takeAt(10).widget().setParent(None)
+        del buttons[10]
+        layout.setGeometry(QRect(0, 0, 300, 1000))
+        assert [button.geometry() for button in buttons] == self._expectedGeometries(layout, 300)[0]
+
+    def test_bulkOperations(self, qapp):
+        from PySide2.QtCore import QRect
+        from PySide2.QtWidgets import QWidget, QPushButton
+        from PySideLib.QCdtWidgets import QFlowLayout
+
+        invalidated = []
+
+        class _Layout(QFlowLayout):
+            def invalidate(self):
+                invalidated.append(self)
+                super(_Layout, self).invalidate()
+
+        widget = QWidget()
+        layout = _Layout(widget)
+        buttons = [QPushButton('button {}'.format(i)) for i in range(300)]
+
+        del invalidated[:]
+        layout.insertWidgets(0, buttons)
+        assert len(invalidated) == 1
+        assert layout.count() == 300
+
+        del invalidated[:]
+        taken = layout.removeItems(0, 100)
+        assert len(invalidated) == 1
+        assert [item.widget() for item in taken] == buttons[:100]
+        assert layout.itemAt(0).widget() is buttons[100]
+
+        taken = layout.removeItems(50, 10)
+        assert [item.widget() for item in taken] == buttons[150:160]
+        remaining = buttons[100:150] + buttons[160:]
+        assert [layout.itemAt(i).widget() for i in range(layout.count())] == remaining
+
+        for _ in range(20):
+            assert layout.takeAt(0).widget() is remaining.pop(0)
+
+        layout.insertWidgets(1, buttons[:2])
+        remaining[1:1] = buttons[:2]
+        assert layout.itemList == [layout.itemAt(i) for i in range(layout.count())]
+        assert layout.itemList is layout.itemList
+        assert [item.widget() for item in layout.itemList] == remaining
+
+        layout.setGeometry(QRect(0, 0, 300, 1000))
+        assert [button.geometry() for button in remaining] == self._expectedGeometries(layout, 300)[0]
+
+        assert len(layout.clear()) == len(remaining)
+        assert layout.count() == 0
+        assert layout.heightForWidth(300) == 0
+
+
+class TestQVirtualFlowWidget:
+    """
+    Group of tests for QVirtualFlowWidget
+    """
+
+    def test_recycleWidgets(self, qapp):
+        from PySide2.QtCore import QSize, QPoint
+        from PySideLib.QCdtWidgets import QVirtualFlowWidget
+
+        created = []
+
+        class _FlowWidget(QVirtualFlowWidget):
+            def createWidget(self):
+                widget = super(_FlowWidget, self).createWidget()
+                created.append(widget)
+                return widget
+
+        flow = _FlowWidget()
+        flow.setSpacing(0)
+        flow.setItemSize(QSize(50, 50))
+        flow.resize(300, 300)
+        flow.setItemCount(10000)
+        flow.show()
+        qapp.processEvents()
+
+        visibleCount = len(flow.activeWidgets())
+        createdCount = len(created)
+        assert 0 < visibleCount <= 6 * 8
+        assert flow.widgetAt(0) is not None
+
+        scrollBar = flow.verticalScrollBar()
+        for value in range(0, scrollBar.maximum(), scrollBar.maximum() // 20):
+            scrollBar.setValue(value)
+        scrollBar.setValue(scrollBar.maximum())
+
+        assert len(created) - createdCount <= visibleCount
+        assert flow.widgetAt(0) is None
+        assert flow.widgetAt(9999) is not None
+        assert flow.widgetAt(9999).text() == '9999'
+        assert flow.indexAt(flow.widgetAt(9999).geometry().center()) == 9999
+
+
+class TestQListModel:
+    """
+    Group of tests for QListModel
+    """
+
+    @staticmethod
+    def _recordSignals(model):
+        signals = []
+        model.rowsInserted.connect(lambda parent, first, last: signals.append(('insert', first, last)))
+        model.rowsRemoved.connect(lambda parent, first, last: signals.append(('remove', first, last)))
+        model.rowsMoved.connect(lambda parent, first, last, dest, row: signals.append(('move', first, last, row)))
+        model.dataChanged.connect(lambda topLeft, bottomRight, roles: signals.append(('change', topLeft.row(), bottomRight.row())))
+        return signals
+
+    def test_insertAndRemove(self, qapp):
+        from PySideLib.QCdtWidgets import QListModel
+
+        model = QListModel(None)
+        signals = self._recordSignals(model)
+
+        model.extend(list(range(10)))
+        model.append(10)
+        model.insertItems(0, ['a', 'b'])
+        assert signals == [('insert', 0, 9), ('insert', 10, 10), ('insert', 0, 1)]
+        assert model.items() == ['a', 'b'] + list(range(11))
+
+        del signals[:]
+        model.removeIf(lambda item: isinstance(item, int) and item % 4 in (1, 2))
+        assert model.items() == ['a', 'b', 0, 3, 4, 7, 8]
+        assert signals == [('remove', 11, 12), ('remove', 7, 8), ('remove', 3, 4)]
+
+        del signals[:]
+        model.remove(7)
+        model.removeRange(0, 2)
+        assert model.items() == [0, 3, 4, 8]
+        assert signals == [('remove', 5, 5), ('remove', 0, 1)]
+
+    def test_moveAndReplace(self, qapp):
+        from PySide2.QtCore import QModelIndex
+        from PySideLib.QCdtWidgets import QListModel
+
+        model = QListModel(None)
+        model.extend(list('abcdef'))
+        signals = self._recordSignals(model)
+
+        assert model.moveRows(QModelIndex(), 0, 2, QModelIndex(), 4)
+        assert model.items() == list('cdabef')
+        assert model.moveRows(QModelIndex(), 4, 2, QModelIndex(), 0)
+        assert model.items() == list('efcdab')
+        assert not model.moveRows(QModelIndex(), 0, 2, QModelIndex(), 1)
+
+        del signals[:]
+        model.replaceRange(1, 2, ['x'])
+        assert model.items() == list('exdab')
+        assert signals == [('change', 1, 1), ('remove', 2, 2)]
+
+        del signals[:]
+        model.replaceRange(4, 1, ['y', 'z'])
+        assert model.items() == list('exdayz')
+        assert signals == [('change', 4, 4), ('insert', 5, 5)]
+
+    def test_removeItemsByIdentity(self, qapp):
+        from PySideLib.QCdtWidgets import QListModel
+
+        items = [object() for _ in range(100000)]
+        model = QListModel(None)
+        model.extend(items)
+
+        removed = items[::10]
+        model.removeItems(removed)
+        assert model.rowCount() == 90000
+        assert model.rowOf(removed[0]) == -1
+        assert model.rowOf(items[1]) == 0
+        assert model.rowOf(items[-1]) == 89999
+
+    def test_removeByEquality(self, qapp):
+        import pytest
+        from PySideLib.QCdtWidgets import QListModel
+
+        items = [['a'], ['b'], ['a']]
+        model = QListModel(None)
+        model.extend(items)
+
+        # remove() takes the first equal row like list.remove, removeItems() only the very items
+        model.remove(['a'])
+        assert model.items() == [['b'], ['a']]
+        assert model.items()[1] is items[2]
+        model.removeItems([['b']])
+        assert model.rowCount() == 2
+        with pytest.raises(ValueError):
+            model.remove(['c'])
+
+    def test_repeatedRemove(self, qapp, monkeypatch):
+        import random
+        from PySideLib.QCdtWidgets import QListModel
+
+        indexed = []
+        indexRows = QListModel._QListModel__indexRows
+
+        def _indexRows(model, first, last):
+            indexed.append(last - first)
+            indexRows(model, first, last)
+
+        monkeypatch.setattr(QListModel, '_QListModel__indexRows', _indexRows)
+
+        items = [object() for _ in range(20000)]
+        model = QListModel(None)
+        model.extend(items)
+        expected = list(items)
+        removed = random.Random(0).sample(items, 300)
+        for item in removed:
+            model.remove(item)
+            expected.remove(item)
+        assert model.items() == expected
+
+        # later rows are shifted by the logged removals, not indexed again on every call
+        assert sum(indexed) < len(items) * 10
+        assert all(model.rowOf(expected[row]) == row for row in range(0, len(expected), 97))
+        assert all(model.rowOf(item) == -1 for item in removed)
+
+    def test_markDirty(self, qapp):
+        from PySide2.QtCore import Qt
+        from PySideLib.QCdtWidgets import QListModel
+
+        model = QListModel(None)
+        model.extend(list(range(20)))
+        changes = []
+        model.dataChanged.connect(lambda topLeft, bottomRight, roles: changes.append((topLeft.row(), bottomRight.row(), list(roles))))
+
+        for _ in range(100):
+            model.markDirty([1, 2, 3, 7], [Qt.DecorationRole])
+        model.markDirty(8, [Qt.DecorationRole])
+        model.markDirty(2)
+        model.markDirty(50, [Qt.DecorationRole])
+        assert changes == []
+
+        qapp.processEvents()
+        assert changes == [(2, 2, []), (1, 1, [Qt.DecorationRole]), (3, 3, [Qt.DecorationRole]), (7, 8, [Qt.DecorationRole])]
+
+        del changes[:]
+        model.refresh()
+        assert changes == [(0, 19, [])]
+
+    def test_markDirtyIsFlushedBeforeRemoval(self, qapp):
+        from PySideLib.QCdtWidgets import QListModel
+
+        model = QListModel(None)
+        model.extend(list(range(5)))
+        changes = []
+        model.dataChanged.connect(lambda topLeft, bottomRight, roles: changes.append((topLeft.row(), bottomRight.row())))
+
+        model.markDirty(4)
+        model.removeRange(0, 1)
+        assert changes == [(4, 4)]
+        qapp.processEvents()
+        assert changes == [(4, 4)]
+
+    def test_fetchMoreFromGenerator(self, qapp):
+        from PySide2.QtCore import Qt
+        from PySide2.QtWidgets import QListView
+        from PySideLib.QCdtWidgets import QListModel
+
+        class _Model(QListModel):
+            def data(self, index, role=Qt.DisplayRole):
+                return self.itemFromIndex(index) if role == Qt.DisplayRole else None
+
+        model = _Model(None)
+        model.setSource((str(i) for i in range(10000)), chunkSize=100)
+        assert model.rowCount() == 100
+        assert model.canFetchMore()
+
+        view = QListView()
+        view.setModel(model)
+        view.resize(200, 200)
+        view.show()
+        qapp.processEvents()
+        view.scrollToBottom()
+        qapp.processEvents()
+        assert 100 < model.rowCount() < 10000
+
+        model.fetchAll()
+        assert model.rowCount() == 10000
+        assert model.items()[-1] == '9999'
+        assert not model.canFetchMore()
+
+    def test_fetchMoreFromPages(self, qapp):
+        from PySideLib.QCdtWidgets import QListModel
+
+        requests = []
+
+        def _page(offset, count):
+            requests.append((offset, count))
+            return list(range(offset, min(offset + count, 250)))
+
+        model = QListModel(None)
+        model.setSource(_page, chunkSize=100)
+        model.fetchAll()
+        assert model.items() == list(range(250))
+        assert requests == [(0, 100), (100, 100), (200, 100)]
+
+        model.reset([1])
+        assert not model.canFetchMore()
+
+
+class TestQColumnarListModel:
+    """
+    Group of tests for QColumnarListModel
+    """
+
+    def test_columns(self, qapp):
+        import pytest
+        from PySide2.QtCore import Qt
+        from PySideLib.QCdtWidgets import QColumnarListModel
+
+        model = QColumnarListModel(None)
+        model.addColumn('name', QColumnarListModel.StringColumn, Qt.DisplayRole)
+        model.addColumn('directory', QColumnarListModel.StringColumn)
+        model.addColumn('size', 'q', Qt.UserRole)
+
+        inserted = []
+        model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+        model.appendRows(('file_{}.exr'.format(i), '/render/shot{}'.format(i % 3), i * 1024) for i in range(100000))
+        assert inserted == [(0, 99999)]
+        assert model.rowCount() == 100000
+        assert model.stringCount() == 100000 + 3
+
+        assert model.data(model.index(42), Qt.DisplayRole) == 'file_42.exr'
+        assert model.data(model.index(42), Qt.UserRole) == 42 * 1024
+        assert model.data(model.index(42), Qt.DecorationRole) is None
+        assert model.value(43, 'directory') == '/render/shot1'
+
+        item = model.itemFromIndex(model.index(7))
+        assert (item.name, item.directory, item.size) == ('file_7.exr', '/render/shot1', 7 * 1024)
+
+        model.removeRange(0, 10)
+        assert model.rowCount() == 99990
+        assert model.value(0, 'name') == 'file_10.exr'
+
+        # rows of the wrong width are refused before anything is inserted
+        with pytest.raises(ValueError):
+            model.appendRows([('a.exr', '/render', 1), ('b.exr', '/render')])
+        with pytest.raises(ValueError):
+            model.appendRows([('c.exr', '/render', 1, 'extra')])
+        assert inserted == [(0, 99999)]
+        assert model.rowCount() == 99990
+        assert len(model.column('size')) == 99990
+
+
+class TestQSortedListModel:
+    """
+    Group of tests for QSortedListModel
+    """
+
+    def test_sortedInsertion(self, qapp, sample_list_str):
+        from PySideLib.QCdtWidgets import QSortedListModel
+
+        model = QSortedListModel(None, key=len)
+        inserted = []
+        model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+
+        for item in sample_list_str:
+            model.append(item)
+        assert model.items() == ['apple', 'grape', 'peach', 'banana', 'strawberry']
+        assert inserted == [(0, 0), (1, 1), (2, 2), (3, 3), (3, 3)]
+
+        del inserted[:]
+        model.extend(['fig', 'kiwi', 'cherry', 'plum'])
+        assert model.items() == ['fig', 'kiwi', 'plum', 'apple', 'grape', 'peach', 'banana', 'cherry', 'strawberry']
+        assert inserted == [(4, 4), (0, 2)]
+
+        model.remove('kiwi')
+        model.removeIf(lambda item: item.startswith('p'))
+        model.append('lime')
+        assert model.items() == ['fig', 'lime', 'apple', 'grape', 'banana', 'cherry', 'strawberry']
+        assert model.rowForKey(5) == 2
+
+    def test_mixedIntoImageFlowModel(self, qapp):
+        from PySideLib.QCdtWidgets import QSortedListModel, QImageFlowModel, QImageFlowItem
+
+        class _Model(QSortedListModel, QImageFlowModel):
+            def sortKey(self, item):
+                return item.name
+
+        model = _Model(None)
+        for name in ['c', 'a', 'b']:
+            item = QImageFlowItem()
+            item.name = name
+            model.append(item)
+        assert [item.name for item in model.items()] == ['a', 'b', 'c']
+        assert model.data(model.index(0)) is None
+
+
+class TestQListFilterProxyModel:
+    """
+    Group of tests for QListFilterProxyModel
+    """
+
+    @staticmethod
+    def _createModel(items):
+        from PySide2.QtCore import Qt
+        from PySideLib.QCdtWidgets import QListModel
+
+        class _Model(QListModel):
+
+            def data(self, index, role=Qt.DisplayRole):
+                if role == Qt.DisplayRole:
+                    return self.items()[index.row()]
+                return None
+
+        model = _Model(None)
+        model.extend(items)
+        return model
+
+    @staticmethod
+    def _proxyItems(proxy):
+        return [proxy.index(row, 0).data() for row in range(proxy.rowCount())]
+
+    def test_refine(self, qapp, sample_list_str):
+        from PySideLib.QCdtWidgets import QListFilterProxyModel
+
+        model = self._createModel(sample_list_str)
+        proxy = QListFilterProxyModel()
+        proxy.setSourceModel(model)
+        signals = TestQListModel._recordSignals(proxy)
+        keys = []
+        proxy.filterKey = lambda row: keys.append(row) or QListFilterProxyModel.filterKey(proxy, row)
+
+        proxy.setFilterText('A')
+        assert self._proxyItems(proxy) == ['apple', 'grape', 'peach', 'strawberry', 'banana']
+        proxy.setFilterText('ap')
+        assert self._proxyItems(proxy) == ['apple', 'grape']
+        assert signals == [('remove', 2, 4)]
+
+        del signals[:]
+        proxy.setFilterText('e')
+        assert self._proxyItems(proxy) == ['apple', 'grape', 'peach', 'strawberry']
+        assert signals == [('insert', 2, 3)]
+
+        del signals[:]
+        proxy.setFilterText('')
+        assert self._proxyItems(proxy) == sample_list_str
+        assert signals == [('insert', 4, 4)]
+        assert keys == []
+
+        proxy.setFilterText('an')
+        assert proxy.mapFromSource(model.index(4, 0)).row() == 0
+        assert not proxy.mapFromSource(model.index(0, 0)).isValid()
+        assert proxy.mapToSource(proxy.index(0, 0)).row() == 4
+
+    def test_sourceChanges(self, qapp, sample_list_str):
+        from PySideLib.QCdtWidgets import QListFilterProxyModel
+
+        model = self._createModel(sample_list_str)
+        proxy = QListFilterProxyModel()
+        proxy.setSourceModel(model)
+        proxy.setFilterText('p')
+        signals = TestQListModel._recordSignals(proxy)
+
+        model.insertItems(1, ['pear', 'fig', 'plum'])
+        assert self._proxyItems(proxy) == ['apple', 'pear', 'plum', 'grape', 'peach']
+        assert signals == [('insert', 1, 2)]
+
+        del signals[:]
+        model.removeRange(0, 3)
+        assert self._proxyItems(proxy) == ['plum', 'grape', 'peach']
+        assert signals == [('remove', 0, 1)]
+
+        del signals[:]
+        model.items()[-1] = 'pineapple'
+        model.items()[0] = 'lime'
+        model.dataChanged.emit(model.index(0, 0), model.index(len(model.items()) - 1, 0), [])
+        assert self._proxyItems(proxy) == ['grape', 'peach', 'pineapple']
+        assert signals == [('remove', 0, 0), ('insert', 2, 2), ('change', 0, 2)]
+
+        model.reset(['kiwi', 'papaya'])
+        assert self._proxyItems(proxy) == ['papaya']
+
+    def test_view(self, qapp, sample_list_str):
+        from PySide2.QtWidgets import QListView
+        from PySideLib.QCdtWidgets import QListFilterProxyModel
+
+        model = self._createModel(sample_list_str)
+        proxy = QListFilterProxyModel()
+        proxy.setSourceModel(model)
+        proxy.setFilterText('ap')
+        view = QListView()
+        view.setModel(proxy)
+        view.resize(200, 200)
+        view.show()
+        qapp.processEvents()
+
+        assert proxy.columnCount() == 1
+        assert view.visualRect(proxy.index(0, 0)).isValid()
+        assert view.visualRect(proxy.index(1, 0)).top() > view.visualRect(proxy.index(0, 0)).top()
+        assert view.indexAt(view.visualRect(proxy.index(1, 0)).center()).data() == 'grape'
+
+
+class TestQImageFlowDelegate:
+    """
+    Group of tests for QImageFlowDelegate
+    """
+
+    def test_pixmapCache(self, qapp):
+        from PySide2.QtCore import QRect, QSize, Qt
+        from PySide2.QtGui import QImage, QPainter, QPixmap, QColor
+        from PySide2.QtWidgets import QStyleOptionViewItem
+        from PySideLib.QCdtWidgets import QImageFlowWidget, QImageFlowItem, QImageFlowDelegate
+
+        widget = QImageFlowWidget(None)
+        delegate = widget.view().itemDelegate()
+        assert isinstance(delegate, QImageFlowDelegate)
+
+        image = QImage(64, 32, QImage.Format_ARGB32)
+        image.fill(Qt.red)
+        widget.appendImage(image)
+        widget.appendItem(QImageFlowItem())
+        model = widget.model()
+
+        option = QStyleOptionViewItem()
+        option.rect = QRect(0, 0, 32, 32)
+        option.decorationSize = QSize(16, 16)
+        delegate.setPlaceholderColor(QColor(Qt.blue))
+        assert delegate.sizeHint(option, model.index(0, 0)) == QSize(64, 32)
+        assert delegate.sizeHint(option, model.index(1, 0)) == QSize(16, 16)
+
+        target = QPixmap(32, 32)
+        target.fill(Qt.white)
+        painter = QPainter(target)
+        for _ in range(3):
+            delegate.paint(painter, option, model.index(0, 0))
+        option.rect = QRect(0, 0, 16, 16)
+        delegate.paint(painter, option, model.index(1, 0))
+        painter.end()
+
+        # the image is scaled down once to fit the rect and reused afterwards
+        assert delegate.cachedPixmapCount() == 1
+        result = target.toImage()
+        assert result.pixelColor(16, 12) == QColor(Qt.red)
+        assert result.pixelColor(8, 8) == QColor(Qt.blue)
+        assert result.pixelColor(16, 28) == QColor(Qt.white)
+
+        delegate.setCacheCost(1)
+        assert delegate.cachedPixmapCount() == 0
+
+    def test_displayText(self, qapp):
+        from PySide2.QtCore import QRect, QSize, Qt
+        from PySide2.QtGui import QImage, QPainter, QPixmap, QStandardItemModel, QStandardItem
+        from PySide2.QtWidgets import QStyleOptionViewItem
+        from PySideLib.QCdtWidgets import QImageFlowDelegate
+
+        texts = []
+
+        class _Delegate(QImageFlowDelegate):
+            def paintText(self, painter, option, text):
+                texts.append(text)
+                super(_Delegate, self).paintText(painter, option, text)
+
+        image = QImage(16, 16, QImage.Format_ARGB32)
+        image.fill(Qt.red)
+        model = QStandardItemModel()
+        model.appendRow(QStandardItem('caption'))
+        model.appendRow(QStandardItem())
+        model.item(1).setData(image, Qt.DecorationRole)
+
+        delegate = _Delegate(None)
+        option = QStyleOptionViewItem()
+        option.rect = QRect(0, 0, 32, 32)
+        option.decorationSize = QSize(16, 16)
+        target = QPixmap(32, 32)
+        painter = QPainter(target)
+        delegate.paint(painter, option, model.index(0, 0))
+        delegate.paint(painter, option, model.index(1, 0))
+        painter.end()
+
+        # text is drawn along with the placeholder or the image, items without any draw none
+        assert texts == ['caption']
+
+
+class TestQImageFlowWidget:
+    """
+    Group of tests for QImageFlowWidget
+    """
+
+    def test_appendFiles(self, qapp, tmp_path):
+        from PySide2.QtCore import QSize, Qt
+        from PySide2.QtGui import QImage
+        from PySideLib.QCdtWidgets import QImageFlowWidget
+
+        filePaths = []
+        for i in range(60):
+            image = QImage(32, 32, QImage.Format_RGB32)
+            image.fill(Qt.green)
+            filePath = tmp_path / '{:02}.png'.format(i)
+            image.save(str(filePath))
+            filePaths.append(filePath)
+
+        widget = QImageFlowWidget(None)
+        widget.view().setIconSize(QSize(32, 32))
+        widget.setLoadMargins(0, 0)
+        widget.resize(120, 120)
+        widget.setVisible(True)
+
+        items = widget.appendFiles(filePaths)
+        assert widget.model().rowCount() == 60
+        assert all(item.image() is None for item in items)
+
+        # only the rows in the visible part of the view are decoded
+        assert _waitUntil(qapp, lambda: items[0].image() is not None)
+        assert _waitUntil(qapp, lambda: any(item.image() is not None for item in items))
+        loaded = [item for item in items if item.image() is not None]
+        assert 0 < len(loaded) < 60
+        assert loaded[0].imageSize() == QSize(32, 32)
+
+        # scrolling to the end unloads the first rows and decodes the last ones
+        scrollBar = widget.view().verticalScrollBar()
+        scrollBar.setValue(scrollBar.maximum())
+        assert _waitUntil(qapp, lambda: items[-1].image() is not None)
+        assert _waitUntil(qapp, lambda: items[0].image() is None)
+        assert items[0].imageSize() == QSize(32, 32)
+
+    def test_loadImage(self, qapp, tmp_path):
+        from PySide2.QtCore import QSize, Qt
+        from PySide2.QtGui import QImage
+        from PySideLib.QCdtWidgets import QImageFlowWidget
+
+        image = QImage(32, 32, QImage.Format_RGB32)
+        image.fill(Qt.green)
+        image.save(str(tmp_path / 'image.png'))
+
+        class _Widget(QImageFlowWidget):
+            def loadImage(self, filePath):
+                return super(_Widget, self).loadImage(filePath).scaled(8, 8)
+
+        widget = _Widget(None)
+        widget.resize(120, 120)
+        widget.setVisible(True)
+
+        # files are decoded through loadImage
+        item, = widget.appendFiles([tmp_path / 'image.png'])
+        assert _waitUntil(qapp, lambda: item.image() is not None)
+        assert item.image().size() == QSize(8, 8)
+
+    def test_nativeScrollMode(self, qapp):
+        from PySide2.QtCore import Qt
+        from PySide2.QtWidgets import QListView, QScrollArea
+        from PySideLib.QCdtWidgets import QImageFlowWidget, QImageFlowScrollMode, QFlowDirection
+
+        widget = QImageFlowWidget(None)
+        view = widget.view()
+        assert isinstance(view.parentWidget().parentWidget(), QScrollArea)
+
+        widget.setScrollMode(QImageFlowScrollMode.Native)
+        widget.setBatchSize(500)
+        assert view.parentWidget() is widget
+        assert view.uniformItemSizes()
+        assert view.layoutMode() == QListView.Batched
+        assert widget.batchSize() == 500
+        assert view.horizontalScrollBarPolicy() == Qt.ScrollBarAlwaysOff
+
+        widget.setFlowDirection(QFlowDirection.TopToBottom)
+        assert widget.flowDirection() == QFlowDirection.TopToBottom
+        assert view.verticalScrollBarPolicy() == Qt.ScrollBarAlwaysOff
+
+        widget.setScrollMode(QImageFlowScrollMode.ScrollArea)
+        assert isinstance(view.parentWidget().parentWidget(), QScrollArea)
+        assert view.layoutMode() == QListView.SinglePass
+        assert view.verticalScrollBarPolicy() == Qt.ScrollBarAsNeeded
+
+    def test_thumbnailAtlas(self, qapp, tmp_path):
+        from PySide2.QtCore import QSize, QRect, Qt
+        from PySide2.QtGui import QImage, QPainter, QPixmap, QColor
+        from PySide2.QtWidgets import QStyleOptionViewItem
+        from PySideLib.QCdtUtils import ThumbnailAtlas
+        from PySideLib.QCdtWidgets import QImageFlowWidget
+
+        filePaths = []
+        for i in range(3):
+            image = QImage(64, 64, QImage.Format_RGB32)
+            image.fill(Qt.magenta)
+            filePath = tmp_path / '{:02}.png'.format(i)
+            image.save(str(filePath))
+            filePaths.append(filePath)
+
+        atlas = ThumbnailAtlas(QSize(32, 32), pageSize=QSize(256, 256))
+        widget = QImageFlowWidget(None)
+        widget.setThumbnailAtlas(atlas)
+        widget.resize(200, 200)
+        widget.setVisible(True)
+
+        items = widget.appendFiles(filePaths)
+        assert _waitUntil(qapp, lambda: all(item.thumbnail() is not None for item in items))
+        assert all(item.image() is None for item in items)
+        assert sorted(item.thumbnail() for item in items) == [0, 1, 2]
+        assert items[0].imageSize() == QSize(32, 32)
+
+        option = QStyleOptionViewItem()
+        option.rect = QRect(0, 0, 32, 32)
+        target = QPixmap(32, 32)
+        target.fill(Qt.white)
+        painter = QPainter(target)
+        widget.view().itemDelegate().paint(painter, option, widget.model().index(0, 0))
+        painter.end()
+        assert target.toImage().pixelColor(16, 16) == QColor(Qt.magenta)
+
+        # writes to a page already painted show up on the next paint
+        handle = items[0].thumbnail()
+        atlas.release(handle)
+        image = QImage(32, 32, QImage.Format_RGB32)
+        image.fill(Qt.green)
+        assert atlas.allocate(image) == handle
+        painter = QPainter(target)
+        widget.view().itemDelegate().paint(painter, option, widget.model().index(0, 0))
+        painter.end()
+        assert target.toImage().pixelColor(16, 16) == QColor(Qt.green)
+
+        # detaching the atlas releases every slot
+        widget.setThumbnailAtlas(None)
+        assert atlas.count() == 0
+        assert all(item.thumbnail() is None for item in items)
+
+    def test_thumbnailPyramid(self, qapp, tmp_path):
+        from PySide2.QtCore import QSize, Qt
+        from PySide2.QtGui import QImage
+        from PySideLib.QCdtWidgets import QImageFlowWidget
+
+        filePaths = []
+        for i in range(3):
+            image = QImage(256, 256, QImage.Format_RGB32)
+            image.fill(Qt.darkGreen)
+            filePath = tmp_path / '{:02}.png'.format(i)
+            image.save(str(filePath))
+            filePaths.append(filePath)
+
+        widget = QImageFlowWidget(None)
+        widget.view().setIconSize(QSize(64, 64))
+        widget.setPyramidLevels(3)
+        widget.resize(400, 400)
+        widget.setVisible(True)
+
+        items = widget.appendFiles(filePaths)
+        assert _waitUntil(qapp, lambda: all(item.pyramid() is not None for item in items))
+        pyramids = [item.pyramid() for item in items]
+        assert [pyramids[0].level(i).width() for i in range(pyramids[0].levelCount())] == [16, 32, 64]
+        assert items[0].image().width() == 64
+
+        # zooming out picks a smaller level without decoding again
+        widget.view().setIconSize(QSize(32, 32))
+        assert items[0].image().width() == 32
+        assert items[0].imageSize() == QSize(32, 32)
+
+        # zooming in past the top level refetches the visible items
+        widget.view().setIconSize(QSize(128, 128))
+        assert items[0].imageSize() == QSize(128, 128)
+        assert _waitUntil(qapp, lambda: all(item.pyramid() is not pyramid for item, pyramid in zip(items, pyramids)))
+        assert items[0].image().width() == 128
+
+    def test_handleItems(self, qapp, tmp_path):
+        from PySide2.QtCore import Qt
+        from PySide2.QtGui import QImage
+        from PySideLib.QCdtUtils import CostLruCache
+        from PySideLib.QCdtWidgets import QImageFlowWidget, QImageFlowHandleItem, QImageFlowItemState
+
+        filePaths = []
+        for i in range(4):
+            image = QImage(32, 32, QImage.Format_RGB32)
+            image.fill(Qt.darkBlue)
+            filePath = tmp_path / '{:02}.png'.format(i)
+            image.save(str(filePath))
+            filePaths.append(filePath)
+        (tmp_path / 'broken.png').write_bytes(b'not an image')
+        filePaths.append(tmp_path / 'broken.png')
+
+        class _Widget(QImageFlowWidget):
+
+            def createItem(self, filePath):
+                return QImageFlowHandleItem(filePath)
+
+        cache = CostLruCache(32 * 32 * 4 * 4)
+        defaultCache = QImageFlowHandleItem.imageCache()
+        QImageFlowHandleItem.setImageCache(cache)
+        try:
+            widget = _Widget(None)
+            widget.resize(300, 300)
+            widget.setVisible(True)
+
+            items = widget.appendFiles(filePaths)
+            assert not hasattr(items[0], '__dict__')
+            assert items[0].filePath() == filePaths[0]
+            assert all(item.state() == QImageFlowItemState.Unloaded for item in items)
+
+            assert _waitUntil(qapp, lambda: all(not item.needsImage() for item in items))
+            assert [item.state() for item in items] == [QImageFlowItemState.Loaded] * 4 + [QImageFlowItemState.Failed]
+            assert widget.model().index(0, 0).data(Qt.DecorationRole).cacheKey() == cache[items[0].cacheKey()].cacheKey()
+
+            # evicted images are decoded again once the view asks for them
+            cache.setMaxCost(0)
+            assert items[0].state() == QImageFlowItemState.Unloaded
+            assert widget.model().index(0, 0).data(Qt.DecorationRole) is None
+            cache.setMaxCost(32 * 32 * 4 * 4)
+            widget.resize(310, 310)
+            assert _waitUntil(qapp, lambda: items[0].state() == QImageFlowItemState.Loaded)
+        finally:
+            QImageFlowHandleItem.setImageCache(defaultCache)
+
+    def test_handleItemsWithSmallImageCache(self, qapp, tmp_path):
+        from PySide2.QtCore import Qt
+        from PySide2.QtGui import QImage
+        from PySideLib.QCdtUtils import CostLruCache
+        from PySideLib.QCdtWidgets import QImageFlowWidget, QImageFlowHandleItem, QImageFlowItemState
+
+        filePaths = []
+        for i in range(6):
+            image = QImage(32, 32, QImage.Format_RGB32)
+            image.fill(Qt.darkGreen)
+            filePath = tmp_path / '{:02}.png'.format(i)
+            image.save(str(filePath))
+            filePaths.append(filePath)
+
+        class _Widget(QImageFlowWidget):
+
+            def createItem(self, filePath):
+                return QImageFlowHandleItem(filePath)
+
+        class _Cache(CostLruCache):
+
+            def __init__(self, maxCost):
+                super(_Cache, self).__init__(maxCost)
+                self.stored = 0
+
+            def set(self, key, value, cost=1):
+                self.stored += 1
+                return super(_Cache, self).set(key, value, cost)
+
+        # the cache holds two of the six visible images
+        cache = _Cache(32 * 32 * 4 * 2)
+        defaultCache = QImageFlowHandleItem.imageCache()
+        QImageFlowHandleItem.setImageCache(cache)
+        try:
+            widget = _Widget(None)
+            widget.resize(300, 300)
+            widget.setVisible(True)
+
+            items = widget.appendFiles(filePaths)
+            _waitUntil(qapp, lambda: False, timeout=0.5)
+            assert cache.stored <= len(items)
+            assert len(cache) == 2
+            assert [item.state() for item in items].count(QImageFlowItemState.Loaded) == 2
+        finally:
+            QImageFlowHandleItem.setImageCache(defaultCache)
+
+    def test_handleItemsWithThumbnailAtlas(self, qapp, tmp_path):
+        from PySide2.QtCore import Qt, QSize
+        from PySide2.QtGui import QImage
+        from PySideLib.QCdtUtils import CostLruCache, ThumbnailAtlas
+        from PySideLib.QCdtWidgets import QImageFlowWidget, QImageFlowHandleItem, QImageFlowItemState
+
+        filePaths = []
+        for i in range(3):
+            image = QImage(32, 32, QImage.Format_RGB32)
+            image.fill(Qt.darkRed)
+            filePath = tmp_path / '{:02}.png'.format(i)
+            image.save(str(filePath))
+            filePaths.append(filePath)
+
+        class _Widget(QImageFlowWidget):
+
+            def createItem(self, filePath):
+                return QImageFlowHandleItem(filePath)
+
+        defaultCache = QImageFlowHandleItem.imageCache()
+        QImageFlowHandleItem.setImageCache(CostLruCache(32 * 32 * 4 * 4))
+        try:
+            atlas = ThumbnailAtlas(QSize(16, 16))
+            widget = _Widget(None)
+            widget.setThumbnailAtlas(atlas)
+            widget.resize(300, 300)
+            widget.setVisible(True)
+
+            # handle items keep their images in the shared cache, the atlas is left alone
+            items = widget.appendFiles(filePaths)
+            assert _waitUntil(qapp, lambda: all(not item.needsImage() for item in items))
+            assert [item.state() for item in items] == [QImageFlowItemState.Loaded] * 3
+            assert atlas.count() == 0
+        finally:
+            QImageFlowHandleItem.setImageCache(defaultCache)
+
+
+class TestQDirectoryTreeModel:
+    """
+    Group of tests for QDirectoryTreeModel
+    """
+
+    @staticmethod
+    def _childNames(model, index):
+        return [model.index(row, 0, index).data() for row in range(model.rowCount(index))]
+
+    def test_childDetection(self, qapp, tmp_path):
+        from PySideLib.QCdtWidgets import QDirectoryTreeModel
+
+        (tmp_path / 'a' / 'x').mkdir(parents=True)
+        (tmp_path / 'b').mkdir()
+        (tmp_path / 'b' / 'file.txt').write_text('')
+        (tmp_path / 'c.txt').write_text('')
+
+        model = QDirectoryTreeModel(None)
+        model.setRootDirectoryPaths([tmp_path])
+        root = model.index(0, 0)
+        model.expand(root)
+        assert _waitUntil(qapp, lambda: not model.isLoading(root))
+        assert self._childNames(model, root) == ['a', 'b']
+
+        # every directory starts with an expand arrow, corrected once its subdirectories were looked for
+        items = {item.name(): item for item in (model.itemFromIndex(model.index(row, 0, root)) for row in range(2))}
+        assert _waitUntil(qapp, lambda: not items['b'].hasPlaceholder())
+        assert items['b'].rowCount() == 0
+        assert items['a'].hasPlaceholder()
+        assert items['a'].hasChild()
+        assert not items['b'].hasChild()
+
+    def test_streamedExpand(self, qapp, tmp_path):
+        from PySideLib.QCdtWidgets import QDirectoryTreeModel
+
+        names = ['dir{:03}'.format(i) for i in range(300)]
+        for name in reversed(names):
+            (tmp_path / name).mkdir()
+        (tmp_path / 'file.txt').write_text('')
+
+        model = QDirectoryTreeModel(None)
+        model.setListingChunkSize(16)
+        model.setRootDirectoryPaths([tmp_path])
+        root = model.index(0, 0)
+        inserted = []
+        model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+
+        model.expand(root)
+        assert model.isLoading(root)
+        assert self._childNames(model, root) == ['Loading...']
+        assert _waitUntil(qapp, lambda: not model.isLoading(root))
+        assert self._childNames(model, root) == names
+        assert len(inserted) > 2
+
+        # collapsing while listing drops the partial result and restores the expand arrow
+        model.collapse(root)
+        model.listingCache().clear()
+        model.expand(root)
+        assert model.isLoading(root)
+        model.collapse(root)
+        assert not model.isLoading(root)
+        assert model.itemFromIndex(root).hasPlaceholder()
+        _waitUntil(qapp, lambda: False, timeout=0.2)
+        assert model.itemFromIndex(root).hasPlaceholder()
+
+    def test_listingCacheAndWatcher(self, qapp, tmp_path):
+        from PySideLib.QCdtWidgets import QDirectoryTreeModel
+
+        for name in ('a', 'c'):
+            (tmp_path / name).mkdir()
+
+        model = QDirectoryTreeModel(None)
+        model.setRootDirectoryPaths([tmp_path])
+        root = model.index(0, 0)
+        model.expand(root)
+        assert _waitUntil(qapp, lambda: not model.isLoading(root))
+        assert self._childNames(model, root) == ['a', 'c']
+        assert model.listingCache().get(tmp_path) is not None
+
+        # expanding again is served from the cache without touching the rows
+        signals = []
+        model.rowsInserted.connect(lambda parent, first, last: parent == root and signals.append(('insert', first, last)))
+        model.rowsRemoved.connect(lambda parent, first, last: parent == root and signals.append(('remove', first, last)))
+        model.collapse(root)
+        model.expand(root)
+        assert not model.isLoading(root)
+        assert signals == []
+
+        # changes on disk are applied as single row insertions and removals
+        (tmp_path / 'b').mkdir()
+        assert _waitUntil(qapp, lambda: self._childNames(model, root) == ['a', 'b', 'c'])
+        (tmp_path / 'c').rename(tmp_path / 'd')
+        assert _waitUntil(qapp, lambda: self._childNames(model, root) == ['a', 'b', 'd'])
+        assert signals == [('insert', 1, 1), ('remove', 2, 2), ('insert', 2, 2)]
+
+        # collapsed nodes are not watched, their stale listing is dropped on the next expand
+        model.collapse(root)
+        (tmp_path / 'a').rmdir()
+        _waitUntil(qapp, lambda: False, timeout=0.2)
+        assert self._childNames(model, root) == ['a', 'b', 'd']
+        model.expand(root)
+        assert _waitUntil(qapp, lambda: self._childNames(model, root) == ['b', 'd'])
+
+        # a listing refreshed in the cache meanwhile is applied to the rows on expand
+        model.collapse(root)
+        (tmp_path / 'e').mkdir()
+        model.listingCache().list(tmp_path)
+        model.expand(root)
+        assert not model.isLoading(root)
+        assert self._childNames(model, root) == ['b', 'd', 'e']
+
+    def test_prefetch(self, qapp, tmp_path):
+        from PySideLib.QCdtWidgets import QDirectoryTreeWidget
+
+        for name in ('a', 'b'):
+            (tmp_path / name / 'x').mkdir(parents=True)
+
+        widget = QDirectoryTreeWidget(None)
+        model = widget.model()
+        cache = model.listingCache()
+        widget.setRootDirectoryPaths([tmp_path])
+        root = model.index(0, 0)
+        model.expand(root)
+        assert _waitUntil(qapp, lambda: not model.isLoading(root))
+
+        # nothing is listed ahead until prefetching is enabled
+        widget.view().setCurrentIndex(root)
+        _waitUntil(qapp, lambda: False, timeout=0.2)
+        assert (tmp_path / 'a') not in cache
+
+        widget.setPrefetchEnabled(True, budget=2)
+        assert widget.isPrefetchEnabled()
+        widget.view().clearSelection()
+        widget.view().setCurrentIndex(root)
+        assert _waitUntil(qapp, lambda: (tmp_path / 'a') in cache)
+        _waitUntil(qapp, lambda: False, timeout=0.2)
+        assert (tmp_path / 'b') not in cache
+
+        # a prefetched directory expands without listing
+        index = model.index(0, 0, root)
+        model.expand(index)
+        assert not model.isLoading(index)
+        assert self._childNames(model, index) == ['x']
+
+        widget.setPrefetchEnabled(False)
+        assert not widget.isPrefetchEnabled()
+
+    def test_pathIndexAndJumpTo(self, qapp, tmp_path):
+        from PySide2.QtCore import QSortFilterProxyModel
+        from PySideLib.QCdtWidgets import QDirectoryTreeWidget
+
+        for path in ('a/deep/target', 'a/other', 'b/target'):
+            (tmp_path / path).mkdir(parents=True)
+
+        widget = QDirectoryTreeWidget(None)
+        model = widget.model()
+        widget.setRootDirectoryPaths([tmp_path])
+        assert widget.searchPaths('target') == []
+        widget.setPathIndexEnabled(True, workers=2)
+        assert _waitUntil(qapp, lambda: not widget.pathIndex().isBuilding())
+        assert widget.searchPaths('target') == [tmp_path / 'a' / 'deep' / 'target', tmp_path / 'b' / 'target']
+        assert widget.searchPaths('target', root=tmp_path / 'a') == [tmp_path / 'a' / 'deep' / 'target']
+
+        # only the ancestors are expanded, the target is selected once it is listed
+        target = tmp_path / 'a' / 'deep' / 'target'
+        assert widget.jumpTo(target)
+        assert _waitUntil(qapp, lambda: widget.currentItem() is not None and widget.currentItem().path() == target)
+        root = model.index(0, 0)
+        assert self._childNames(model, root) == ['a', 'b']
+        assert widget.view().isExpanded(root)
+        assert widget.view().isExpanded(model.index(0, 0, root))
+        assert not widget.view().isExpanded(model.index(1, 0, root))
+        assert model.itemFromIndex(model.index(1, 0, root)).hasPlaceholder()
+
+        # directories listed by the model update the index
+        (tmp_path / 'a' / 'deep' / 'target2').mkdir()
+        assert _waitUntil(qapp, lambda: len(widget.searchPaths('target2')) == 1)
+
+        assert not widget.jumpTo(tmp_path.parent)
+        widget.jumpTo(tmp_path / 'a' / 'missing')
+        assert _waitUntil(qapp, lambda: not widget.jumpTo(tmp_path / 'a' / 'missing'))
+
+        # indexes are mapped through a proxy model installed on the view
+        proxy = QSortFilterProxyModel(widget)
+        proxy.setSourceModel(model)
+        widget.view().setModel(proxy)
+        target = tmp_path / 'b' / 'target'
+        assert widget.jumpTo(target)
+        assert _waitUntil(qapp, lambda: widget.currentItem() is not None and widget.currentItem().path() == target)
+        assert widget.view().isExpanded(proxy.mapFromSource(model.index(1, 0, root)))
@@ -1,6 +1,8 @@
 # coding: utf-8
 import pytest
 import os
+import time
+import shutil
 import filecmp
 
 from PySide2.QtGui import (
@@ -11,6 +13,14 @@ from PySideLib.QCdtUtils import (
     BatchImageLoader,
     ImageLoadingCallback,
     LruCache,
+    CostLruCache,
+    ThumbnailAtlas,
+    ThumbnailPyramid,
+    DirectoryListingCache,
+    PathIndex,
+    PriorityRequestQueue,
+    TrigramIndex,
+    FuzzyMatcher,
 )
 
 
@@ -121,3 +131,258 @@ class TestLruCache(object):
         assert cache.get('key2') == 2
         assert cache.get('key4') == 4
         assert cache.get('key5') == 5
+
+
+class TestCostLruCache(object):
+
+    def test_evictByCost(self):
+        cache = CostLruCache(maxCost=10)
+        assert cache.set('key1', 1, cost=4) == []
+        assert cache.set('key2', 2, cost=4) == []
+        assert cache.totalCost() == 8
+
+        # touch key1, so key2 is evicted first
+        assert cache.get('key1') == 1
+        assert cache.set('key3', 3, cost=5) == [('key2', 2)]
+        assert cache.totalCost() == 9
+        assert 'key2' not in cache
+
+        # replacing an entry releases its old cost
+        assert cache.set('key3', 3, cost=6) == []
+        assert cache.totalCost() == 10
+
+        # entries heavier than the whole cache are rejected
+        assert cache.set('key4', 4, cost=11) == [('key4', 4)]
+        assert len(cache) == 2
+
+        assert cache.setMaxCost(6) == [('key1', 1)]
+        assert cache.remove('key3') == 3
+        assert cache.totalCost() == 0
+
+
+class TestThumbnailAtlas(object):
+
+    def test_allocate(self, qapp):
+        from PySide2.QtCore import QSize, Qt
+        from PySide2.QtGui import QImage, QColor
+
+        atlas = ThumbnailAtlas(QSize(32, 32), pageSize=QSize(64, 64))
+        images = []
+        for color in (Qt.red, Qt.green, Qt.blue, Qt.yellow, Qt.cyan):
+            image = QImage(64, 32, QImage.Format_ARGB32)
+            image.fill(color)
+            images.append(image)
+
+        handles = [atlas.allocate(image) for image in images]
+        assert handles == [0, 1, 2, 3, 4]
+        assert atlas.pageCount() == 2
+        assert atlas.count() == 5
+
+        # thumbnails are scaled to fit the cell
+        pageIndex, rect = atlas.location(3)
+        assert pageIndex == 0
+        assert rect.size() == QSize(32, 16)
+        assert atlas.image(3).pixelColor(4, 4) == QColor(Qt.yellow)
+
+        # freed slots are reused before the atlas grows, lowest first
+        atlas.release(2)
+        atlas.release(1)
+        assert atlas.allocate(images[4]) == 1
+        assert atlas.image(1).pixelColor(4, 4) == QColor(Qt.cyan)
+        assert atlas.allocate(images[0]) == 2
+        assert atlas.allocate(images[0]) == 5
+        assert atlas.pageCount() == 2
+        assert atlas.count() == 6
+
+
+class TestThumbnailPyramid(object):
+
+    def test_levels(self, qapp):
+        from PySide2.QtCore import QSize
+
+        image = QImage(400, 200, QImage.Format_RGB32)
+        pyramid = ThumbnailPyramid.build(image, QSize(128, 128), 4)
+        assert [pyramid.level(i).size() for i in range(pyramid.levelCount())] == [
+            QSize(32, 16), QSize(64, 32), QSize(128, 64)]
+
+        assert pyramid.displaySize(QSize(50, 50)) == QSize(50, 25)
+        assert pyramid.nearest(QSize(50, 50)).size() == QSize(64, 32)
+        assert pyramid.covers(QSize(128, 128))
+        assert not pyramid.covers(QSize(256, 256))
+        assert pyramid.nearest(QSize(256, 256)).size() == QSize(128, 64)
+
+        # small sources are never scaled up
+        small = ThumbnailPyramid.build(QImage(40, 40, QImage.Format_RGB32), QSize(128, 128), 4)
+        assert small.levelCount() == 2
+        assert small.covers(QSize(512, 512))
+
+
+class TestDirectoryListingCache(object):
+
+    def test_mtimeValidation(self, tmp_path):
+        (tmp_path / 'a').mkdir()
+        os.utime(str(tmp_path), ns=(1000000000, 1000000000))
+
+        cache = DirectoryListingCache(maxEntries=2)
+        mtime = DirectoryListingCache.modificationTime(tmp_path)
+        cache.set(tmp_path, ['a'], mtime)
+        assert cache.get(tmp_path) == ['a']
+        assert tmp_path in cache
+
+        # a changed directory drops its listing
+        os.utime(str(tmp_path), ns=(2000000000, 2000000000))
+        assert cache.get(tmp_path) is None
+        assert tmp_path not in cache
+
+        # missing directories and the least recently used listings are not kept
+        cache.set(tmp_path / 'missing', [], DirectoryListingCache.modificationTime(tmp_path / 'missing'))
+        assert len(cache) == 0
+        for name in ('x', 'y', 'z'):
+            cache.set(tmp_path / name, [name], 0)
+        assert len(cache) == 2
+        assert (tmp_path / 'x') not in cache
+
+    def test_list(self, tmp_path):
+        (tmp_path / 'a').mkdir()
+        (tmp_path / 'b.txt').write_text('')
+
+        cache = DirectoryListingCache()
+        assert cache.list(tmp_path) == ['a']
+        assert tmp_path in cache
+        assert cache.list(tmp_path / 'missing') == []
+        assert (tmp_path / 'missing') not in cache
+
+
+class TestPriorityRequestQueue(object):
+
+    def test_ownership(self, qapp):
+        import gc
+        import weakref
+        from PySide2.QtCore import QObject
+
+        class _Owner(QObject):
+            def __init__(self):
+                super(_Owner, self).__init__()
+                self.results = []
+                self.queue = PriorityRequestQueue(self.handle, self.handled, parent=self)
+
+            def handle(self, key):
+                return key * 10
+
+            def handled(self, key, result):
+                self.results.append(result)
+
+        owner = _Owner()
+        owner.queue.request([1])
+        deadline = time.monotonic() + 5.0
+        while len(owner.results) == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert owner.results == [10]
+
+        # the queue does not keep its owner alive and is closed with it
+        queue = owner.queue
+        ref = weakref.ref(owner)
+        del owner
+        gc.collect()
+        assert ref() is None
+        assert queue.isClosed()
+        queue.request([2])
+        assert queue.pendingCount() == 0
+
+
+class TestPathIndex(object):
+
+    @staticmethod
+    def _waitUntilBuilt(index, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while index.isBuilding() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not index.isBuilding()
+
+    def test_buildAndUpdate(self, qapp, tmp_path):
+        for path in ('src/lib/core', 'src/app', 'docs/core'):
+            (tmp_path / path).mkdir(parents=True)
+        (tmp_path / 'src' / 'core.txt').write_text('')
+
+        index = PathIndex(workers=2)
+        index.build([tmp_path])
+        assert self._waitUntilBuilt(index)
+        assert len(index) == 7
+        assert tmp_path / 'src' / 'lib' in index
+        assert index.search('core') == [tmp_path / 'docs' / 'core', tmp_path / 'src' / 'lib' / 'core']
+        assert index.search('CORE', root=tmp_path / 'src') == [tmp_path / 'src' / 'lib' / 'core']
+        assert index.search('core', limit=1) == [tmp_path / 'docs' / 'core']
+        assert index.search('core', root=tmp_path / 'missing') == []
+
+        # listed names replace the children, new directories are walked
+        (tmp_path / 'src' / 'tests' / 'core').mkdir(parents=True)
+        shutil.rmtree(str(tmp_path / 'src' / 'lib'))
+        index.update(tmp_path / 'src', ['app', 'tests'])
+        assert self._waitUntilBuilt(index)
+        assert index.search('core', root=tmp_path / 'src') == [tmp_path / 'src' / 'tests' / 'core']
+        assert tmp_path / 'src' / 'lib' not in index
+
+        # refresh lists the directories whose mtime changed
+        (tmp_path / 'docs' / 'core').rename(tmp_path / 'docs' / 'guide')
+        index.refresh()
+        assert self._waitUntilBuilt(index)
+        assert index.search('core') == [tmp_path / 'src' / 'tests' / 'core']
+        assert index.search('guide') == [tmp_path / 'docs' / 'guide']
+        assert len(index) == 7
+
+    def test_linksAndCompaction(self, qapp, tmp_path, monkeypatch):
+        monkeypatch.setattr(PathIndex, 'COMPACT_THRESHOLD', 0)
+        for path in ['a/x', 'b/y'] + ['c/z{}'.format(i) for i in range(6)]:
+            (tmp_path / path).mkdir(parents=True)
+        # links are followed, a link to a directory above is indexed without its children
+        (tmp_path / 'b' / 'link').symlink_to(tmp_path / 'a')
+        (tmp_path / 'b' / 'loop').symlink_to(tmp_path)
+
+        index = PathIndex(workers=2)
+        index.build([tmp_path])
+        assert self._waitUntilBuilt(index)
+        assert index.search('x') == [tmp_path / 'a' / 'x', tmp_path / 'b' / 'link' / 'x']
+        assert tmp_path / 'b' / 'loop' in index
+        assert len(index.search('z')) == 6
+        assert len(index) == 15
+
+        # removed nodes are compacted away, the remaining ones are still found
+        shutil.rmtree(str(tmp_path / 'a'))
+        shutil.rmtree(str(tmp_path / 'c'))
+        index.update(tmp_path, ['b'])
+        assert len(index) == 6
+        assert index.search('z') == []
+        assert index.search('x') == [tmp_path / 'b' / 'link' / 'x']
+        assert index.search('y', root=tmp_path / 'b') == [tmp_path / 'b' / 'y']
+        (tmp_path / 'b' / 'y' / 'w').mkdir()
+        index.update(tmp_path / 'b' / 'y')
+        assert self._waitUntilBuilt(index)
+        assert index.search('w') == [tmp_path / 'b' / 'y' / 'w']
+
+
+class TestTrigramIndex(object):
+
+    def test_search(self, sample_list_str):
+        index = TrigramIndex(sample_list_str)
+        assert index.search('') == [0, 1, 2, 3, 4]
+        assert index.search('a') == [0, 1, 2, 3, 4]
+        assert index.search('AP') == [0, 1]
+        assert index.search('Berr') == [3]
+        assert index.search('xyz') == []
+
+    def test_narrow(self, sample_list_str):
+        index = TrigramIndex(sample_list_str)
+        rows = index.search('an')
+        assert rows == [4]
+        assert index.search('ana', rows) == [4]
+        assert index.search('ap', [1]) == [1]
+
+    def test_sharedKeys(self):
+        index = TrigramIndex(['Apple', 'Grape'])
+        matcher = FuzzyMatcher(index)
+        assert matcher.key(0) is index.key(0)
+        assert matcher.match('APE') == [0, 1]
+
+        index.append('Papaya')
+        assert len(matcher) == 3
+        assert matcher.match('pay') == [2]